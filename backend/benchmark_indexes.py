@@ -0,0 +1,156 @@
+"""
+Benchmark the hot-path indexes
+Fills a scratch database with a large health_metrics table (1M rows by default)
+plus work sessions, then prints query plans and timings with and without the
+indexes declared in models.py.
+
+Usage: python benchmark_indexes.py [rows] [database_url]
+Defaults to a temporary SQLite file; pass a PostgreSQL URL to use EXPLAIN ANALYZE.
+The database must be a scratch one: both tables are dropped and recreated.
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, text
+import models
+
+N_WORKERS = 500
+CHUNK = 50_000
+REPEAT = 200
+
+QUERIES = {
+    "latest metric for a worker": (
+        "SELECT * FROM health_metrics WHERE worker_id = :worker_id "
+        "ORDER BY recorded_at DESC, id DESC LIMIT 1"
+    ),
+    "last 24h metrics for a worker": (
+        "SELECT * FROM health_metrics WHERE worker_id = :worker_id "
+        "AND recorded_at >= :since ORDER BY recorded_at DESC"
+    ),
+    "open session for a worker": (
+        "SELECT * FROM work_sessions WHERE worker_id = :worker_id AND clock_out IS NULL"
+    ),
+    "today's sessions for a worker": (
+        "SELECT * FROM work_sessions WHERE worker_id = :worker_id AND clock_in >= :since"
+    ),
+}
+
+TABLES = [models.HealthMetric.__table__, models.WorkSession.__table__]
+
+def populate(engine, n_rows: int):
+    """Insert n_rows health metrics (one every 30s per worker) and ~100 sessions per worker"""
+    print(f"📥 Inserting {n_rows:,} health metrics for {N_WORKERS} workers...")
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    health = models.HealthMetric.__table__
+    sessions = models.WorkSession.__table__
+    start = time.perf_counter()
+    
+    with engine.begin() as conn:
+        for offset in range(0, n_rows, CHUNK):
+            rows = []
+            for i in range(offset, min(offset + CHUNK, n_rows)):
+                rows.append({
+                    "worker_id": i % N_WORKERS + 1,
+                    "heart_rate": rng.randint(60, 130),
+                    "oxygen_level": rng.uniform(92, 100),
+                    "stress_level": rng.uniform(0, 100),
+                    "fatigue_score": rng.uniform(0, 100),
+                    "recorded_at": now - timedelta(seconds=30 * ((n_rows - i) // N_WORKERS)),
+                })
+            conn.execute(health.insert(), rows)
+        
+        rows = []
+        for worker_id in range(1, N_WORKERS + 1):
+            for day in range(100, 0, -1):
+                clock_in = now - timedelta(days=day)
+                rows.append({
+                    "worker_id": worker_id,
+                    "clock_in": clock_in,
+                    "clock_out": clock_in + timedelta(hours=8),
+                    "total_hours": 8.0,
+                })
+            rows.append({"worker_id": worker_id, "clock_in": now - timedelta(hours=2), "clock_out": None, "total_hours": None})
+        conn.execute(sessions.insert(), rows)
+    
+    print(f"   done in {time.perf_counter() - start:.1f}s\n")
+
+def explain(conn, sql: str, params: dict) -> str:
+    if conn.dialect.name == "sqlite":
+        rows = conn.execute(text("EXPLAIN QUERY PLAN " + sql), params).fetchall()
+        return "\n".join(f"      {row[-1]}" for row in rows)
+    rows = conn.execute(text("EXPLAIN ANALYZE " + sql), params).fetchall()
+    return "\n".join(f"      {row[0]}" for row in rows)
+
+def run_queries(engine, label: str) -> dict:
+    print(f"==================== {label} ====================\n")
+    since = datetime.utcnow() - timedelta(hours=24)
+    rng = random.Random(7)
+    timings = {}
+    
+    with engine.connect() as conn:
+        for name, sql in QUERIES.items():
+            params = {"worker_id": N_WORKERS // 2, "since": since}
+            print(f"🔎 {name}")
+            print(explain(conn, sql, params))
+            
+            start = time.perf_counter()
+            for _ in range(REPEAT):
+                params["worker_id"] = rng.randint(1, N_WORKERS)
+                conn.execute(text(sql), params).fetchall()
+            timings[name] = (time.perf_counter() - start) / REPEAT * 1000
+            print(f"   {timings[name]:.3f} ms/query\n")
+    
+    return timings
+
+def drop_indexes(engine):
+    with engine.begin() as conn:
+        for table in TABLES:
+            for index in table.indexes:
+                index.drop(bind=conn, checkfirst=True)
+
+def create_indexes(engine):
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        for table in TABLES:
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+    print(f"🔧 Built indexes in {time.perf_counter() - start:.1f}s\n")
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    database_url = sys.argv[2] if len(sys.argv) > 2 else None
+    tmp_path = None
+    
+    if database_url is None:
+        fd, tmp_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        database_url = f"sqlite:///{tmp_path}"
+    
+    engine = create_engine(database_url)
+    try:
+        for table in TABLES:
+            table.drop(bind=engine, checkfirst=True)
+            table.create(bind=engine)
+        drop_indexes(engine)
+        populate(engine, n_rows)
+        
+        before = run_queries(engine, "WITHOUT INDEXES")
+        create_indexes(engine)
+        after = run_queries(engine, "WITH INDEXES")
+        
+        print("==================== SUMMARY ====================\n")
+        for name in QUERIES:
+            speedup = before[name] / after[name] if after[name] else float("inf")
+            print(f"   {name:32s} {before[name]:9.3f} ms -> {after[name]:7.3f} ms  ({speedup:,.0f}x)")
+        print()
+    finally:
+        engine.dispose()
+        if tmp_path:
+            os.remove(tmp_path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark model loading at startup
+Compares the legacy joblib pickle of the XGBRegressor (joblib.load +
+XGBRegressor.predict) with the native format written by
+SkillAssignmentModel.save (UBJSON booster + JSON sidecar, xgb.Booster +
+inplace_predict): file size, cold load time, first prediction latency and the
+memory the loaded model adds. Every run is a fresh Python process, like a
+uvicorn worker starting up.
+
+Usage: python benchmark_model_format.py [training rows] [repeat]
+Defaults to 20,000 rows and the median of 7 runs per format.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+N_FEATURES = 27  # 7 base features + 20 one-hot skills
+N_WORKERS = 500  # rows in the first prediction (one roster)
+
+def rss_kb() -> int:
+    """Current resident set size (Linux)"""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+
+def child(fmt: str, path: str):
+    """One cold start: load the model and score one roster, print timings as JSON"""
+    import numpy as np
+    import joblib
+    import xgboost as xgb
+    X = np.random.default_rng(0).random((N_WORKERS, N_FEATURES))
+    rss_before = rss_kb()
+    
+    start = time.perf_counter()
+    if fmt == "pickle":
+        model = joblib.load(path)['model']
+        loaded = time.perf_counter()
+        model.predict(X)
+    else:
+        with open(os.path.splitext(path)[0] + ".meta.json") as f:
+            json.load(f)
+        model = xgb.Booster(model_file=path)
+        loaded = time.perf_counter()
+        model.inplace_predict(X)
+    predicted = time.perf_counter()
+    
+    print(json.dumps({
+        "load_ms": (loaded - start) * 1000,
+        "predict_ms": (predicted - loaded) * 1000,
+        "rss_kb": rss_kb() - rss_before
+    }))
+
+def cold_start(fmt: str, path: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, __file__, "--child", fmt, path],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 7
+    
+    import numpy as np
+    import joblib
+    import xgboost as xgb
+    from ml_model import SkillAssignmentModel, XGB_PARAMS
+    from training_data import FeatureSchema
+    
+    rng = np.random.default_rng(42)
+    X = rng.random((n_rows, N_FEATURES))
+    y = np.clip(0.5 * X[:, 6] + 0.3 * X[:, 2] + rng.normal(0, 0.1, n_rows), 0, 1)
+    regressor = xgb.XGBRegressor(**XGB_PARAMS).fit(X, y)
+    
+    model = SkillAssignmentModel()
+    model.model = regressor.get_booster()
+    model._set_schema(FeatureSchema([f"Skill {i}" for i in range(N_FEATURES - 7)]))
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = {
+            "pickle": os.path.join(tmp_dir, "fit_model.pkl"),
+            "native": os.path.join(tmp_dir, "fit_model.ubj"),
+        }
+        joblib.dump({'model': regressor, 'all_skills': model.feature_schema.skill_columns}, paths["pickle"])
+        model.save(paths["native"])
+        
+        results = {}
+        for fmt, path in paths.items():
+            runs = [cold_start(fmt, path) for _ in range(repeat)]
+            size = os.path.getsize(path)
+            if fmt == "native":
+                size += os.path.getsize(os.path.splitext(path)[0] + ".meta.json")
+            results[fmt] = (
+                size,
+                statistics.median(run["load_ms"] for run in runs),
+                statistics.median(run["predict_ms"] for run in runs),
+                statistics.median(run["rss_kb"] for run in runs),
+            )
+    
+    print(f"==================== MODEL COLD START ({n_rows:,} training rows, median of {repeat}) ====================\n")
+    print(f"   {'format':8s} {'bytes':>10s} {'load':>11s} {'1st predict':>13s} {'+RSS':>10s}")
+    for fmt, (size, load_ms, predict_ms, rss_kb) in results.items():
+        print(f"   {fmt:8s} {size:10,d} {load_ms:8.2f} ms {predict_ms:10.2f} ms {rss_kb / 1024:7.1f} MB")
+    
+    pickle_size, pickle_load, pickle_predict, _ = results["pickle"]
+    native_size, native_load, native_predict, _ = results["native"]
+    print(f"\n   native / pickle time: load {native_load / pickle_load:.2f}x, first prediction "
+          f"{native_predict / pickle_predict:.2f}x, load + predict "
+          f"{(native_load + native_predict) / (pickle_load + pickle_predict):.2f}x; "
+          f"size {native_size / pickle_size:.2f}x\n")
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3])
+    else:
+        main()
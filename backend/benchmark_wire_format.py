@@ -0,0 +1,121 @@
+"""
+Benchmark the health metric wire formats
+Compares the JSON body of /health/metrics/bulk (json.loads + HealthMetricCreate
+validation) with the packed binary format of /health/metrics/binary
+(health_wire.decode) for batches of wearable samples: bytes on the wire, decode
+CPU, and decode + insert CPU into a scratch SQLite database.
+
+Usage: python benchmark_wire_format.py [samples] [repeat]
+Defaults to 10,000 samples, best of 5 runs.
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import List
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+import models
+import schemas
+import health_wire
+from health_ingest import HealthIngestPipeline
+
+N_WORKERS = 500
+
+def make_samples(n: int) -> List[dict]:
+    """n samples shaped like a wearable upload"""
+    rng = random.Random(42)
+    return [{
+        "worker_id": i % N_WORKERS + 1,
+        "heart_rate": rng.randint(60, 130),
+        "blood_pressure_systolic": rng.randint(105, 140),
+        "blood_pressure_diastolic": rng.randint(65, 90),
+        "oxygen_level": round(rng.uniform(92, 100), 1),
+        "body_temperature": round(rng.uniform(36.1, 37.6), 1),
+        "stress_level": round(rng.uniform(0, 100), 1),
+        "fatigue_score": round(rng.uniform(0, 100), 1),
+        "steps_count": rng.randint(0, 15000),
+        "calories_burned": round(rng.uniform(0, 900), 1),
+        "hours_worked_today": round(rng.uniform(0, 9), 2),
+        "device_id": f"WATCH-{i % N_WORKERS + 1:04d}",
+    } for i in range(n)]
+
+def decode_json(payload: bytes, adapter: TypeAdapter) -> List[dict]:
+    return [metric.dict() for metric in adapter.validate_python(json.loads(payload))]
+
+def decode_binary(payload: bytes) -> List[dict]:
+    rows, _ = health_wire.decode(payload)
+    return rows
+
+def cpu_time(func, repeat: int, setup=None) -> float:
+    """Best-of-repeat process CPU time of func() in ms (setup() runs untimed before each call)"""
+    best = float("inf")
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.process_time()
+        func()
+        best = min(best, time.process_time() - start)
+    return best * 1000
+
+def main():
+    n_samples = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    samples = make_samples(n_samples)
+    adapter = TypeAdapter(List[schemas.HealthMetricCreate])
+    
+    json_payload = json.dumps(samples).encode()
+    binary_payload = health_wire.encode(samples)
+    assert decode_binary(binary_payload) == decode_json(json_payload, adapter), "formats decode differently"
+    
+    fd, tmp_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{tmp_path}")
+    models.HealthMetric.__table__.create(bind=engine)
+    Session = sessionmaker(bind=engine)
+    pipeline = HealthIngestPipeline()  # no listeners: only the multi-row INSERT
+    
+    def ingest(rows):
+        db = Session()
+        try:
+            pipeline.ingest(db, rows)
+        finally:
+            db.close()
+    
+    def empty_table():
+        """Every insert run starts from the same (empty) table"""
+        with engine.begin() as conn:
+            conn.execute(models.HealthMetric.__table__.delete())
+    
+    try:
+        timings = {
+            "JSON": (
+                len(json_payload),
+                cpu_time(lambda: decode_json(json_payload, adapter), repeat),
+                cpu_time(lambda: ingest(decode_json(json_payload, adapter)), repeat, empty_table),
+            ),
+            "binary": (
+                len(binary_payload),
+                cpu_time(lambda: decode_binary(binary_payload), repeat),
+                cpu_time(lambda: ingest(decode_binary(binary_payload)), repeat, empty_table),
+            ),
+        }
+    finally:
+        engine.dispose()
+        os.remove(tmp_path)
+    
+    print(f"==================== {n_samples:,} SAMPLES (best of {repeat}) ====================\n")
+    print(f"   {'format':8s} {'bytes':>12s} {'decode CPU':>14s} {'decode+insert CPU':>20s}")
+    for name, (size, decode_ms, ingest_ms) in timings.items():
+        print(f"   {name:8s} {size:12,d} {decode_ms:11.1f} ms {ingest_ms:17.1f} ms")
+    
+    json_size, json_decode, json_ingest = timings["JSON"]
+    binary_size, binary_decode, binary_ingest = timings["binary"]
+    print(f"\n   wire size {json_size / binary_size:.1f}x smaller, decode {json_decode / binary_decode:.1f}x faster, "
+          f"decode+insert {json_ingest / binary_ingest:.1f}x faster\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Change log for delta sync
+Every flush that inserts, updates or deletes a Task or Assignment appends one
+change_log row per entity in the same transaction, so the log can never disagree
+with the tables. seq is monotonic: clients keep the last cursor they saw and ask
+/task/changes?since=<cursor> (or /assignment/changes) for what changed since,
+getting the current rows plus tombstones for deletes instead of whole lists.
+Reassigning a row also logs a delete under its previous worker_id, so that
+worker's filtered feed drops it.
+
+On PostgreSQL the writers take a transaction-level advisory lock before
+appending, so seq order is commit order and a reader can never skip a change
+that commits late. Only sessions bound through track() are logged; scripts that
+write tasks directly are picked up for inserts by backfill() (migrate.py).
+"""
+from typing import Dict, Optional, Tuple
+from sqlalchemy import event, func, inspect, text
+from sqlalchemy.orm import Session
+import models
+
+TRACKED = {models.Task: 'task', models.Assignment: 'assignment'}
+ADVISORY_LOCK_ID = 7_204_201  # arbitrary, identifies the change_log writer lock
+
+def _after_flush(session: Session, flush_context):
+    """Append a change_log row for every tracked object written by this flush"""
+    rows = []
+    for op, objects in (('insert', session.new), ('update', session.dirty), ('delete', session.deleted)):
+        for obj in objects:
+            entity = TRACKED.get(type(obj))
+            if entity is None:
+                continue
+            if op == 'update' and not session.is_modified(obj, include_collections=False):
+                continue
+            rows.append({'entity': entity, 'entity_id': obj.id, 'worker_id': obj.worker_id, 'op': op})
+            if op == 'update':
+                # Reassigned: the previous owner's feed gets a tombstone (history is still unflushed here)
+                for previous in inspect(obj).attrs.worker_id.history.deleted:
+                    if previous is not None and previous != obj.worker_id:
+                        rows.append({'entity': entity, 'entity_id': obj.id, 'worker_id': previous, 'op': 'delete'})
+    if not rows:
+        return
+    
+    conn = session.connection()
+    if conn.dialect.name == 'postgresql':
+        conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {'id': ADVISORY_LOCK_ID})
+    conn.execute(models.ChangeLog.__table__.insert(), rows)
+
+def track(session_factory):
+    """Log Task / Assignment writes of every session made by session_factory"""
+    event.listen(session_factory, 'after_flush', _after_flush)
+
+def changes(db: Session, entity: str, since: int, limit: int,
+            worker_id: Optional[int] = None) -> Tuple[Dict[int, int], int, bool, bool]:
+    """
+    Entities changed after cursor since (oldest change first, at most limit log rows)
+    Returns ({entity_id: latest seq}, next cursor, has_more, reset). reset means since
+    is ahead of the log (e.g. the database was recreated) and the client must start over.
+    """
+    query = db.query(models.ChangeLog.seq, models.ChangeLog.entity_id).filter(
+        models.ChangeLog.entity == entity,
+        models.ChangeLog.seq > since
+    )
+    if worker_id is not None:
+        query = query.filter(models.ChangeLog.worker_id == worker_id)
+    rows = query.order_by(models.ChangeLog.seq).limit(limit).all()
+    
+    if not rows:
+        last_seq = db.query(func.max(models.ChangeLog.seq)).scalar() or 0
+        return {}, since, False, since > last_seq
+    
+    latest = {}
+    for seq, entity_id in rows:
+        latest.pop(entity_id, None)  # keep dict order = order of each entity's latest change
+        latest[entity_id] = seq
+    return latest, rows[-1].seq, len(rows) == limit, False
+
+def backfill(db: Session) -> int:
+    """Log an insert for every task / assignment that has no change_log row yet. Returns rows added"""
+    added = 0
+    for model, entity in TRACKED.items():
+        logged = db.query(models.ChangeLog.entity_id).filter(models.ChangeLog.entity == entity)
+        missing = db.query(model.id, model.worker_id).filter(model.id.notin_(logged)).order_by(model.id).all()
+        if missing:
+            db.execute(models.ChangeLog.__table__.insert(), [
+                {'entity': entity, 'entity_id': row.id, 'worker_id': row.worker_id, 'op': 'insert'}
+                for row in missing
+            ])
+            added += len(missing)
+    db.commit()
+    return added
@@ -7,6 +7,7 @@ import torch
 from typing import List, Dict
 from sqlalchemy.orm import Session
 import models
+from feature_store import feature_store
 
 class SupervisorChatbot:
     def __init__(self):
@@ -39,7 +40,7 @@ class SupervisorChatbot:
         """Get comprehensive system context with full descriptions"""
         try:
             # Get all data
-            workers = db.query(models.Worker).all()
+            workers = feature_store.workers(db)
             roles = db.query(models.Role).all()
             assignments = db.query(models.Assignment).all()
             tasks = db.query(models.Task).all()
@@ -188,7 +189,7 @@ When answering questions, use the specific data provided above. Reference actual
         
         try:
             # Specific worker info (check for worker names FIRST - highest priority)
-            workers = db.query(models.Worker).all()
+            workers = feature_store.workers(db)
             matched_worker = None
             for worker in workers:
                 if worker.name.lower() in message_lower:
@@ -217,7 +218,7 @@ When answering questions, use the specific data provided above. Reference actual
             
             # Health/Fatigue queries (check first before general worker queries)
             if any(word in message_lower for word in ['health', 'fatigue', 'tired', 'stress', 'low fatigue', 'high fatigue']):
-                workers = db.query(models.Worker).all()
+                workers = feature_store.workers(db)
                 low_fatigue = [w for w in workers if w.fatigue_level < 0.3]
                 medium_fatigue = [w for w in workers if 0.3 <= w.fatigue_level < 0.7]
                 high_fatigue = [w for w in workers if w.fatigue_level >= 0.7]
@@ -244,7 +245,7 @@ When answering questions, use the specific data provided above. Reference actual
             
             # Skill-based queries (check for specific skills)
             elif any(word in message_lower for word in ['skill', 'iso', 'welding', 'cnc', 'quality', 'assembly', 'testing', 'inspection']):
-                workers = db.query(models.Worker).all()
+                workers = feature_store.workers(db)
                 
                 # Extract skill query
                 skill_query = None
@@ -262,11 +263,8 @@ When answering questions, use the specific data provided above. Reference actual
                     skill_query = 'Testing'
                 
                 if skill_query:
-                    # Find workers with this skill (case-insensitive partial match)
-                    matching_workers = [
-                        w for w in workers 
-                        if any(skill_query.lower() in skill.lower() for skill in w.skills)
-                    ]
+                    # Find workers with this skill (case-insensitive partial match) via the skill index
+                    matching_workers = feature_store.workers_with_skill(db, skill_query)
                     
                     if matching_workers:
                         response = f"Workers with {skill_query} skill: {len(matching_workers)} total\n\n"
@@ -299,7 +297,7 @@ When answering questions, use the specific data provided above. Reference actual
             
             # Performance/Top Performers (check before general worker queries)
             elif any(phrase in message_lower for phrase in ['top perform', 'best perform', 'high perform', 'top worker']):
-                workers = db.query(models.Worker).all()
+                workers = feature_store.workers(db)
                 top_workers = sorted(workers, key=lambda w: w.performance_score, reverse=True)[:5]
                 response = "Top Performing Workers:\n\n"
                 for i, w in enumerate(top_workers, 1):
@@ -309,7 +307,7 @@ When answering questions, use the specific data provided above. Reference actual
             
             # Worker queries
             elif any(word in message_lower for word in ['worker', 'workers', 'employee', 'employees']):
-                workers = db.query(models.Worker).all()
+                workers = feature_store.workers(db)
                 if 'how many' in message_lower or 'total' in message_lower:
                     return f"We currently have {len(workers)} workers in the system."
                 elif 'available' in message_lower:
@@ -352,7 +350,7 @@ When answering questions, use the specific data provided above. Reference actual
             
             # Performance queries
             elif 'performance' in message_lower:
-                workers = db.query(models.Worker).all()
+                workers = feature_store.workers(db)
                 avg_performance = sum(w.performance_score for w in workers) / len(workers) if workers else 0
                 high_performers = sum(1 for w in workers if w.performance_score > 0.8)
                 
@@ -10,3 +10,41 @@ ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
 USE_SQLITE_FALLBACK = os.getenv("USE_SQLITE_FALLBACK", "false").lower() == "true"
 if USE_SQLITE_FALLBACK:
     DATABASE_URL = "sqlite:///./skill_assign.db"
+
+# Health metric ingestion: "sync" commits inside each request, "buffered" queues rows
+# in memory and a background thread writes them in batches (write-behind)
+HEALTH_INGEST_MODE = os.getenv("HEALTH_INGEST_MODE", "sync").lower()
+HEALTH_BUFFER_MAX_ROWS = int(os.getenv("HEALTH_BUFFER_MAX_ROWS", "10000"))  # queue bound, then 429
+HEALTH_BUFFER_BATCH_SIZE = int(os.getenv("HEALTH_BUFFER_BATCH_SIZE", "500"))  # flush when this many rows wait
+HEALTH_BUFFER_FLUSH_SECONDS = float(os.getenv("HEALTH_BUFFER_FLUSH_SECONDS", "1.0"))  # ...or after this long
+
+# Health alert rules: optional JSON file with a list of rules replacing the defaults in health_rules.py
+HEALTH_RULES_FILE = os.getenv("HEALTH_RULES_FILE")
+
+# Health metric retention: raw rows older than this many days are moved to Parquet files
+# (partitioned by day and worker) under HEALTH_ARCHIVE_DIR; rollups stay in the DB
+HEALTH_RETENTION_DAYS = int(os.getenv("HEALTH_RETENTION_DAYS", "90"))
+HEALTH_ARCHIVE_DIR = os.getenv("HEALTH_ARCHIVE_DIR", "archive/health_metrics")
+
+# Online fatigue estimator: vitals are exponentially weighted with this half-life, closed work
+# sessions with this weight; the blend is written back to workers.fatigue_level
+FATIGUE_VITALS_HALF_LIFE_MINUTES = float(os.getenv("FATIGUE_VITALS_HALF_LIFE_MINUTES", "60"))
+FATIGUE_HOURS_ALPHA = float(os.getenv("FATIGUE_HOURS_ALPHA", "0.3"))
+# Smaller moves of the estimate are kept in worker_fatigue_state but not written to workers
+FATIGUE_WRITEBACK_DELTA = float(os.getenv("FATIGUE_WRITEBACK_DELTA", "0.02"))
+# Nothing is written to workers until this many health metrics (or one closed session) were folded
+FATIGUE_MIN_SAMPLES = int(os.getenv("FATIGUE_MIN_SAMPLES", "5"))
+
+# Server push: "memory" fans change events out inside one process, "postgres" uses NOTIFY/LISTEN
+# on DATABASE_URL so every uvicorn worker sees every event
+EVENT_BROKER = os.getenv("EVENT_BROKER", "memory").lower()
+
+# Model training runs in a process pool (spawned workers) so requests never wait on XGBoost;
+# finished models are hot-swapped into the serving process
+ML_TRAINING_WORKERS = int(os.getenv("ML_TRAINING_WORKERS", "1"))
+
+# Trained models are kept as numbered versions in a registry directory; CURRENT.json names the one
+# served. With ML_AUTO_PROMOTE=false a new version waits for POST /ml/models/{version}/promote
+MODEL_REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR", "models/registry")
+MODEL_REGISTRY_KEEP = int(os.getenv("MODEL_REGISTRY_KEEP", "20"))  # newest versions kept, plus the current one (0 keeps all)
+ML_AUTO_PROMOTE = os.getenv("ML_AUTO_PROMOTE", "true").lower() == "true"
@@ -0,0 +1,175 @@
+"""
+Change-event hub for server push
+Endpoints publish task / assignment change events to channels ("worker:{id}",
+"supervisor"); WebSocket connections subscribe to the channels they care about,
+so mobile and web clients stop polling for unchanged lists.
+
+Publishing goes through a broker:
+  - LocalBroker (EVENT_BROKER=memory, default): in-process fan-out, enough for a
+    single uvicorn worker.
+  - PostgresBroker (EVENT_BROKER=postgres): NOTIFY / LISTEN on the application
+    database, so every uvicorn worker (or host) sees every event.
+
+Subscribers get a bounded queue; a client that falls behind loses its oldest
+events and should reload (the stream says so with a "resync" event).
+"""
+import asyncio
+import json
+import select
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List
+from config import DATABASE_URL, EVENT_BROKER
+
+Deliver = Callable[[str, str], None]
+SUPERVISOR_CHANNEL = "supervisor"
+
+def worker_channel(worker_id: int) -> str:
+    return f"worker:{worker_id}"
+
+class LocalBroker:
+    """Single-process broker: published messages go straight back to the hub"""
+    def start(self, deliver: Deliver):
+        self._deliver = deliver
+    
+    def publish(self, channel: str, message: str):
+        self._deliver(channel, message)
+    
+    def stop(self):
+        pass
+
+class PostgresBroker:
+    """Fan-out across processes with PostgreSQL NOTIFY / LISTEN (payloads must stay under 8000 bytes)"""
+    PG_CHANNEL = "skill_assign_events"
+    
+    def __init__(self, database_url: str):
+        self.database_url = database_url
+        self._publish_conn = None
+        self._publish_lock = threading.Lock()
+        self._thread = None
+        self._stopping = threading.Event()
+    
+    def _connect(self):
+        import psycopg2
+        conn = psycopg2.connect(self.database_url)
+        conn.autocommit = True
+        return conn
+    
+    def start(self, deliver: Deliver):
+        self._deliver = deliver
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._listen, name="event-broker", daemon=True)
+        self._thread.start()
+    
+    def _listen(self):
+        while not self._stopping.is_set():
+            try:
+                conn = self._connect()
+                conn.cursor().execute(f"LISTEN {self.PG_CHANNEL}")
+                print(f"[EVENTS] Listening on PostgreSQL channel {self.PG_CHANNEL}")
+                while not self._stopping.is_set():
+                    if select.select([conn], [], [], 1.0)[0]:
+                        conn.poll()
+                        while conn.notifies:
+                            notify = conn.notifies.pop(0)
+                            envelope = json.loads(notify.payload)
+                            self._deliver(envelope["channel"], envelope["message"])
+                conn.close()
+            except Exception as e:
+                print(f"[EVENTS] Broker connection lost: {e}; reconnecting")
+                self._stopping.wait(2.0)
+    
+    def publish(self, channel: str, message: str):
+        payload = json.dumps({"channel": channel, "message": message})
+        with self._publish_lock:
+            try:
+                if self._publish_conn is None or self._publish_conn.closed:
+                    self._publish_conn = self._connect()
+                self._publish_conn.cursor().execute("SELECT pg_notify(%s, %s)", (self.PG_CHANNEL, payload))
+            except Exception:
+                self._publish_conn = None
+                raise
+    
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(5.0)
+        with self._publish_lock:
+            if self._publish_conn is not None:
+                self._publish_conn.close()
+                self._publish_conn = None
+
+class EventHub:
+    def __init__(self, broker, queue_size: int = 256):
+        self.broker = broker
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)  # channel -> {(event loop, queue)}
+        self._started = False
+    
+    def start(self):
+        if not self._started:
+            self.broker.start(self._deliver)
+            self._started = True
+    
+    def stop(self):
+        if self._started:
+            self.broker.stop()
+            self._started = False
+    
+    def publish(self, channels: Iterable[str], event: Dict):
+        """Send an event to every subscriber of the given channels (safe from any thread; never raises)"""
+        if not self._started:
+            return
+        message = json.dumps(event, default=str)
+        for channel in channels:
+            try:
+                self.broker.publish(channel, message)
+            except Exception as e:
+                print(f"[EVENTS] Failed to publish {event.get('type')} to {channel}: {e}")
+    
+    def _deliver(self, channel: str, message: str):
+        """Broker callback (any thread): hand the message to each subscriber's event loop"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, message)
+            except RuntimeError:
+                pass  # loop already closed, the subscription is going away
+    
+    @staticmethod
+    def _offer(queue: asyncio.Queue, message: str):
+        if queue.full():
+            queue.get_nowait()  # drop the oldest, the client resyncs
+            message = json.dumps({"type": "resync"})
+        queue.put_nowait(message)
+    
+    @contextmanager
+    def subscribe(self, channels: List[str]):
+        """Queue of JSON messages for the given channels (use inside a coroutine)"""
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(self.queue_size))
+        with self._lock:
+            for channel in channels:
+                self._subscribers[channel].add(subscriber)
+        try:
+            yield subscriber[1]
+        finally:
+            with self._lock:
+                for channel in channels:
+                    self._subscribers[channel].discard(subscriber)
+                    if not self._subscribers[channel]:
+                        del self._subscribers[channel]
+    
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len({subscriber for subscribers in self._subscribers.values() for subscriber in subscribers})
+
+def _make_broker():
+    if EVENT_BROKER == "postgres":
+        return PostgresBroker(DATABASE_URL)
+    return LocalBroker()
+
+# Global event hub (started on app startup)
+event_hub = EventHub(_make_broker())
@@ -0,0 +1,179 @@
+"""
+Online fatigue estimator
+Keeps exponentially weighted heart rate, stress and shift hours per worker and
+blends them into workers.fatigue_level, so recommendations and analytics follow
+the current shift instead of the value set when the worker was created.
+
+Each health metric (ingest listener) and each closed work session updates one
+worker's state in O(1). Vitals decay with a half-life in time
+(FATIGUE_VITALS_HALF_LIFE_MINUTES), shift hours with a fixed weight per session
+(FATIGUE_HOURS_ALPHA). State is persisted to worker_fatigue_state; the estimate
+is written to workers.fatigue_level (and the feature store) only when it moves
+by FATIGUE_WRITEBACK_DELTA or more, and only once FATIGUE_MIN_SAMPLES metrics or
+a closed session were folded, so one stray reading never replaces a stored or
+manually set fatigue_level.
+"""
+import threading
+from typing import Dict, List, Optional
+from sqlalchemy import insert, update, delete
+from sqlalchemy.orm import Session
+import models
+from config import (
+    FATIGUE_VITALS_HALF_LIFE_MINUTES, FATIGUE_HOURS_ALPHA, FATIGUE_WRITEBACK_DELTA, FATIGUE_MIN_SAMPLES
+)
+from feature_store import feature_store
+from vitals_cache import CachedHealthMetric
+
+# component -> (value mapped to 0, value mapped to 1, weight)
+COMPONENTS = {
+    'heart_rate': (60.0, 120.0, 0.3),
+    'stress_level': (0.0, 100.0, 0.4),
+    'shift_hours': (0.0, 12.0, 0.3),
+}
+
+def _ewma(previous: Optional[float], value: float, alpha: float) -> float:
+    return value if previous is None else previous + alpha * (value - previous)
+
+class FatigueState:
+    """Estimator state of one worker (mirrors a worker_fatigue_state row; fatigue_level is the last value written back)"""
+    __slots__ = (
+        'worker_id', 'heart_rate', 'stress_level', 'shift_hours', 'metric_at', 'session_at', 'fatigue_level',
+        'sample_count'
+    )
+    
+    def __init__(self, worker_id: int, heart_rate: float = None, stress_level: float = None, shift_hours: float = None,
+                 metric_at=None, session_at=None, fatigue_level: float = None, sample_count: int = 0):
+        self.worker_id = worker_id
+        self.heart_rate = heart_rate
+        self.stress_level = stress_level
+        self.shift_hours = shift_hours
+        self.metric_at = metric_at
+        self.session_at = session_at
+        self.fatigue_level = fatigue_level
+        self.sample_count = sample_count or 0
+    
+    def to_row(self) -> Dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+    
+    def estimate(self) -> Optional[float]:
+        """Weighted blend of the normalized components that have data (0-1), or None"""
+        total = weights = 0.0
+        for component, (low, high, weight) in COMPONENTS.items():
+            value = getattr(self, component)
+            if value is None:
+                continue
+            total += weight * min(max((value - low) / (high - low), 0.0), 1.0)
+            weights += weight
+        return round(total / weights, 3) if weights else None
+
+class FatigueEstimator:
+    def __init__(self, half_life_minutes: float, hours_alpha: float, writeback_delta: float = 0.0,
+                 min_samples: int = 1):
+        self.half_life_seconds = half_life_minutes * 60
+        self.hours_alpha = hours_alpha
+        self.writeback_delta = writeback_delta
+        self.min_samples = min_samples
+        self._lock = threading.Lock()  # serializes updates + persistence
+        self._states = None  # worker_id -> FatigueState, None until loaded
+    
+    def load(self, db: Session):
+        """Load persisted estimator state"""
+        rows = db.query(models.WorkerFatigueState).all()
+        with self._lock:
+            self._states = {
+                row.worker_id: FatigueState(**{field: getattr(row, field) for field in FatigueState.__slots__})
+                for row in rows
+            }
+        print(f"[FATIGUE] Loaded fatigue state for {len(rows)} workers")
+    
+    def _fold_metric(self, state: FatigueState, metric) -> bool:
+        """Fold one health metric into state; False for samples not newer than the last one"""
+        if state.metric_at is not None and metric.recorded_at <= state.metric_at:
+            return False
+        alpha = 1.0
+        if state.metric_at is not None:
+            elapsed = (metric.recorded_at - state.metric_at).total_seconds()
+            alpha = 1.0 - 0.5 ** (elapsed / self.half_life_seconds)
+        if metric.heart_rate:  # 0 means no reading
+            state.heart_rate = _ewma(state.heart_rate, metric.heart_rate, alpha)
+        if metric.stress_level is not None:
+            state.stress_level = _ewma(state.stress_level, metric.stress_level, alpha)
+        state.metric_at = metric.recorded_at
+        state.sample_count += 1
+        return True
+    
+    def _save(self, db: Session, changed: Dict[int, FatigueState]):
+        """Persist changed states and write estimates that moved enough back to the workers, then commit"""
+        written = {}
+        for state in changed.values():
+            if state.sample_count < self.min_samples and state.session_at is None:
+                continue
+            estimate = state.estimate()
+            if estimate is None or estimate == state.fatigue_level:
+                continue
+            if state.fatigue_level is None or abs(estimate - state.fatigue_level) >= self.writeback_delta:
+                state.fatigue_level = estimate
+                written[state.worker_id] = estimate
+        
+        new_rows = [s.to_row() for w, s in changed.items() if w not in self._states]
+        updated_rows = [s.to_row() for w, s in changed.items() if w in self._states]
+        if new_rows:
+            db.execute(insert(models.WorkerFatigueState), new_rows)
+        if updated_rows:
+            db.execute(update(models.WorkerFatigueState), updated_rows)
+        if written:
+            db.execute(update(models.Worker), [
+                {'id': worker_id, 'fatigue_level': level} for worker_id, level in written.items()
+            ])
+        db.commit()
+        
+        self._states.update(changed)  # only touched under self._lock
+        if written:
+            feature_store.update_fatigue(written)
+    
+    def _copy(self, worker_id: int) -> FatigueState:
+        state = self._states.get(worker_id)
+        if state is None:
+            return FatigueState(worker_id)
+        return FatigueState(**state.to_row())
+    
+    def on_ingest(self, db: Session, stored: List[Dict]):
+        """Health ingest listener"""
+        if self._states is None:
+            self.load(db)
+        
+        metrics = sorted((CachedHealthMetric(row) for row in stored), key=lambda m: (m.recorded_at, m.id))
+        with self._lock:
+            changed = {}
+            for metric in metrics:
+                state = changed.get(metric.worker_id) or self._copy(metric.worker_id)
+                if self._fold_metric(state, metric):
+                    changed[metric.worker_id] = state
+            if changed:
+                self._save(db, changed)
+    
+    def on_session_closed(self, db: Session, session: models.WorkSession):
+        """Fold the hours of a closed work session"""
+        if session.total_hours is None:
+            return
+        if self._states is None:
+            self.load(db)
+        
+        with self._lock:
+            state = self._copy(session.worker_id)
+            state.shift_hours = _ewma(state.shift_hours, max(session.total_hours, 0.0), self.hours_alpha)
+            state.session_at = session.clock_out
+            self._save(db, {session.worker_id: state})
+    
+    def remove(self, db: Session, worker_id: int):
+        """Forget a deleted worker"""
+        with self._lock:
+            db.execute(delete(models.WorkerFatigueState).where(models.WorkerFatigueState.worker_id == worker_id))
+            db.commit()
+            if self._states is not None:
+                self._states.pop(worker_id, None)
+
+# Global fatigue estimator
+fatigue_estimator = FatigueEstimator(
+    FATIGUE_VITALS_HALF_LIFE_MINUTES, FATIGUE_HOURS_ALPHA, FATIGUE_WRITEBACK_DELTA, FATIGUE_MIN_SAMPLES
+)
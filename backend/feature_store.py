@@ -0,0 +1,239 @@
+"""
+In-memory worker feature store
+Keeps a dense NumPy view of the roster so read paths (predictions, analytics,
+chatbot) never re-query the workers table or re-parse the skills JSON column.
+
+The store is loaded lazily from the DB on first use and is patched by the
+worker write endpoints. It is per-process: scripts that write the DB directly
+(populate_*.py) or other uvicorn workers require a restart or invalidate().
+"""
+import threading
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.orm import Session
+import models
+from skill_index import skill_vocab, mask_matrix, SkillInvertedIndex
+
+WORKER_FIELDS = (
+    'id', 'name', 'age', 'experience', 'skills', 'fatigue_level', 'hours_per_day',
+    'hours_per_week', 'current_role', 'performance_score', 'created_at'
+)
+
+class CachedWorker:
+    """Detached copy of a Worker row (same attribute names as models.Worker)"""
+    __slots__ = WORKER_FIELDS + ('skill_mask',)
+    
+    def __init__(self, worker):
+        for field in WORKER_FIELDS:
+            setattr(self, field, getattr(worker, field))
+        self.skills = list(self.skills or [])
+        self.skill_mask = skill_vocab.mask(self.skills)
+
+class WorkerSnapshot:
+    """
+    Row-aligned arrays for every cached worker (ordered by id), never changed once
+    built: writes replace the store's snapshot (with_fatigue copies only what changes)
+    features columns: experience, fatigue level, performance score, age (normalized)
+    skill_bits columns: skill ids from skill_vocab
+    """
+    def __init__(self, workers: List[CachedWorker]):
+        self.workers = workers
+        self.ids = np.array([w.id for w in workers], dtype=int)
+        self.features = np.array([
+            [w.experience, w.fatigue_level, w.performance_score, w.age / 100.0]
+            for w in workers
+        ], dtype=float).reshape(-1, 4)
+        self.hours_per_day = np.array([w.hours_per_day for w in workers], dtype=float)
+        self.hours_per_week = np.array([w.hours_per_week for w in workers], dtype=float)
+        self.skill_bits = mask_matrix([w.skill_mask for w in workers])
+        self._onehot_cache = {}
+    
+    def with_fatigue(self, rows: List[int], workers: List[CachedWorker]) -> 'WorkerSnapshot':
+        """Copy with new fatigue levels for the given rows; skill arrays and caches are shared"""
+        snapshot = object.__new__(WorkerSnapshot)
+        snapshot.__dict__.update(self.__dict__)
+        snapshot.workers = list(self.workers)
+        snapshot.features = self.features.copy()
+        for row, worker in zip(rows, workers):
+            snapshot.workers[row] = worker
+            snapshot.features[row, 1] = worker.fatigue_level
+        return snapshot
+    
+    @property
+    def experience(self) -> np.ndarray:
+        return self.features[:, 0]
+    
+    @property
+    def fatigue_level(self) -> np.ndarray:
+        return self.features[:, 1]
+    
+    @property
+    def performance_score(self) -> np.ndarray:
+        return self.features[:, 2]
+    
+    def rows_for(self, worker_ids: np.ndarray) -> np.ndarray:
+        """Row indices of the given worker ids (ids missing from this snapshot are skipped)"""
+        rows = np.searchsorted(self.ids, worker_ids)
+        rows = rows[rows < len(self.ids)]
+        return rows[np.isin(self.ids[rows], worker_ids)]
+    
+    def _columns(self, skills: Iterable[str]) -> np.ndarray:
+        """skill_bits columns of the given skills (unknown skills have no column)"""
+        skill_ids = skill_vocab.ids(skills)
+        return skill_ids[skill_ids < self.skill_bits.shape[1]]
+    
+    def skill_onehot(self, skill_columns: Iterable[str]) -> np.ndarray:
+        """One-hot skill matrix over the given (model) skill columns, in sorted order"""
+        key = tuple(sorted(skill_columns))
+        onehot = self._onehot_cache.get(key)
+        if onehot is None:
+            onehot = np.zeros((len(self.workers), len(key)))
+            width = self.skill_bits.shape[1]
+            for col, skill in enumerate(key):
+                skill_id = skill_vocab.id(skill)
+                if skill_id is not None and skill_id < width:
+                    onehot[:, col] = self.skill_bits[:, skill_id]
+            self._onehot_cache[key] = onehot
+        return onehot
+    
+    def skill_match(self, required_skills: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Skill match count and match fraction (0-1) of every worker against a role"""
+        match_counts, match_fractions = self.skill_match_matrix([required_skills])
+        return match_counts[:, 0], match_fractions[:, 0]
+    
+    def skill_match_matrix(self, roles_required_skills: List[List[str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Skill match counts and fractions as (n_workers, n_roles) matrices"""
+        required_bits = np.zeros((len(roles_required_skills), self.skill_bits.shape[1]), dtype=np.int32)
+        required_counts = np.zeros(len(roles_required_skills))
+        for j, required_skills in enumerate(roles_required_skills):
+            required_bits[j, self._columns(required_skills)] = 1
+            required_counts[j] = len(set(required_skills or []))
+        
+        # AND + popcount for every worker/role pair at once
+        match_counts = (self.skill_bits.astype(np.int32) @ required_bits.T).astype(float)
+        match_fractions = np.divide(
+            match_counts, required_counts,
+            out=np.zeros_like(match_counts), where=required_counts > 0
+        )
+        return match_counts, match_fractions
+
+class WorkerFeatureStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._workers = None  # worker_id -> CachedWorker, None until loaded
+        self._snapshot = None  # rebuilt lazily after writes
+        self._skill_index = SkillInvertedIndex()
+    
+    def load(self, db: Session):
+        """(Re)load every worker from the DB"""
+        workers = db.query(models.Worker).all()
+        with self._lock:
+            self._workers = {w.id: CachedWorker(w) for w in workers}
+            self._snapshot = None
+            self._skill_index.build({w.id: w.skill_mask for w in self._workers.values()})
+        print(f"[STORE] Loaded {len(workers)} workers into feature store")
+    
+    def invalidate(self):
+        """Drop everything; the next read reloads from the DB"""
+        with self._lock:
+            self._workers = None
+            self._snapshot = None
+    
+    def upsert(self, worker: models.Worker):
+        """Patch the store after a worker is added or updated"""
+        with self._lock:
+            if self._workers is None:
+                return  # not loaded yet, the first read will see the new row
+            old = self._workers.get(worker.id)
+            cached = CachedWorker(worker)
+            self._workers[worker.id] = cached
+            self._snapshot = None
+            self._skill_index.update(worker.id, old.skill_mask if old else 0, cached.skill_mask)
+    
+    def patch(self, worker_id: int, **fields):
+        """Update scalar fields of a cached worker without re-reading the row"""
+        with self._lock:
+            if self._workers is None or worker_id not in self._workers:
+                return
+            worker = CachedWorker(self._workers[worker_id])  # copy, snapshots stay untouched
+            for field, value in fields.items():
+                setattr(worker, field, value)
+            self._workers[worker_id] = worker
+            self._snapshot = None
+    
+    def update_fatigue(self, levels: Dict[int, float]):
+        """
+        Set fatigue_level of cached workers; the current snapshot is swapped for a copy
+        with the new levels instead of being rebuilt (requests keep the one they took)
+        """
+        with self._lock:
+            if self._workers is None:
+                return
+            snapshot = self._snapshot
+            rows, workers = [], []
+            for worker_id, level in levels.items():
+                if worker_id not in self._workers:
+                    continue
+                worker = CachedWorker(self._workers[worker_id])
+                worker.fatigue_level = level
+                self._workers[worker_id] = worker
+                if snapshot is not None:
+                    row = np.searchsorted(snapshot.ids, worker_id)
+                    if row < len(snapshot.ids) and snapshot.ids[row] == worker_id:
+                        rows.append(row)
+                        workers.append(worker)
+            if rows:
+                self._snapshot = snapshot.with_fatigue(rows, workers)
+    
+    def remove(self, worker_id: int):
+        """Patch the store after a worker is deleted"""
+        with self._lock:
+            if self._workers is None:
+                return
+            old = self._workers.pop(worker_id, None)
+            self._snapshot = None
+            if old is not None:
+                self._skill_index.update(worker_id, old.skill_mask, 0)
+    
+    def snapshot(self, db: Session) -> WorkerSnapshot:
+        """Current roster arrays"""
+        if self._workers is None:
+            self.load(db)
+        
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None:
+                workers = [self._workers[worker_id] for worker_id in sorted(self._workers)]
+                snapshot = WorkerSnapshot(workers)
+                self._snapshot = snapshot
+        return snapshot
+    
+    def workers_with_skill(self, db: Session, text: str) -> List[CachedWorker]:
+        """Workers holding any skill whose name contains text (case-insensitive), by id"""
+        if self._workers is None:
+            self.load(db)
+        with self._lock:
+            ids = self._skill_index.workers_with(skill_vocab.search(text))
+            return [self._workers[worker_id] for worker_id in ids]
+    
+    def candidate_ids(self, db: Session, required_skills: List[str], min_match: int) -> np.ndarray:
+        """Sorted ids of workers holding at least min_match of the required skills"""
+        if self._workers is None:
+            self.load(db)
+        with self._lock:
+            return self._skill_index.candidates(skill_vocab.ids(required_skills), min_match)
+    
+    def workers(self, db: Session) -> List[CachedWorker]:
+        """All cached workers ordered by id"""
+        return self.snapshot(db).workers
+    
+    def get(self, db: Session, worker_id: int) -> Optional[CachedWorker]:
+        """Cached worker by id, or None"""
+        workers = self._workers
+        if workers is None:
+            self.load(db)
+            workers = self._workers
+        return workers.get(worker_id)
+
+# Global feature store instance
+feature_store = WorkerFeatureStore()
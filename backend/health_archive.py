@@ -0,0 +1,197 @@
+"""
+Health metric retention and archive
+Raw health_metrics rows older than HEALTH_RETENTION_DAYS are moved, in id-ordered
+chunks, to zstd-compressed Parquet files under HEALTH_ARCHIVE_DIR:
+
+    day=YYYY-MM-DD/worker_id=N/part-{first_id}-{last_id}.parquet
+
+and then deleted from the DB. Rollups (health_rollups.py) are not touched, so
+trend charts keep their full history, and the latest metric of every worker stays
+in the DB so current vitals survive a restart. read() is the historical read path:
+it scans only the partitions of one worker inside the requested day range.
+
+Usage: python health_archive.py [retention_days]
+pyarrow is only needed once something is archived (pip install pyarrow).
+"""
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import select, delete, Integer, Float, DateTime
+from sqlalchemy.orm import Session
+import models
+from config import HEALTH_RETENTION_DAYS, HEALTH_ARCHIVE_DIR
+from vitals_cache import latest_vitals
+
+# worker_id comes from the partition path, not the file
+FILE_COLUMNS = [c for c in models.HealthMetric.__table__.columns if c.name != 'worker_id']
+
+def _pyarrow():
+    """Import pyarrow on first use (it is only required once rows are archived)"""
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError(
+            "The health metric archive needs pyarrow: pip install pyarrow (see requirements.txt)"
+        )
+    return pyarrow
+
+def _file_schema(pa):
+    types = []
+    for column in FILE_COLUMNS:
+        if isinstance(column.type, Integer):
+            types.append((column.name, pa.int64()))
+        elif isinstance(column.type, Float):
+            types.append((column.name, pa.float64()))
+        elif isinstance(column.type, DateTime):
+            types.append((column.name, pa.timestamp('us')))
+        else:
+            types.append((column.name, pa.string()))
+    return pa.schema(types)
+
+def utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """Naive UTC datetime (archive files store UTC); aware values, e.g. PostgreSQL timestamptz, are converted first"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def retention_cutoff(retention_days: int = HEALTH_RETENTION_DAYS) -> datetime:
+    """Rows recorded before this (midnight UTC, so day partitions are written whole) are archived"""
+    today = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    return today - timedelta(days=retention_days)
+
+class HealthArchive:
+    def __init__(self, root: str, retention_days: int):
+        self.root = root
+        self.retention_days = retention_days
+        self._lock = threading.Lock()  # one archive run at a time per process
+    
+    def _write_chunk(self, pa, schema, rows: List[Dict]) -> int:
+        """Write one chunk as one Parquet file per day / worker. Returns files written"""
+        partitions = defaultdict(list)
+        for row in rows:
+            row['recorded_at'] = utc_naive(row['recorded_at'])
+            partitions[(row['recorded_at'].date().isoformat(), row['worker_id'])].append(row)
+        
+        for (day, worker_id), part in partitions.items():
+            directory = os.path.join(self.root, f"day={day}", f"worker_id={worker_id}")
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"part-{part[0]['id']}-{part[-1]['id']}.parquet")
+            table = pa.Table.from_pylist(part, schema=schema)
+            pa.parquet.write_table(table, path + ".tmp", compression="zstd")
+            os.replace(path + ".tmp", path)  # a crashed run never leaves a partial file behind
+        return len(partitions)
+    
+    def run(self, db: Session, retention_days: int = None, chunk_size: int = 50_000) -> Dict:
+        """
+        Archive and delete raw rows older than the retention cutoff
+        Files are written before their rows are deleted, so an interrupted run only
+        leaves duplicates (read() drops them) and the next run picks up where it stopped.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A health archive run is already in progress")
+        try:
+            start = time.perf_counter()
+            cutoff = retention_cutoff(self.retention_days if retention_days is None else retention_days)
+            table = models.HealthMetric.__table__
+            keep = {metric.id for metric in latest_vitals.all(db).values()}
+            pa = schema = None
+            archived = kept = files = 0
+            last_id = 0
+            
+            while True:
+                rows = [dict(row) for row in db.execute(
+                    select(table).where(table.c.recorded_at < cutoff, table.c.id > last_id)
+                    .order_by(table.c.id).limit(chunk_size)
+                ).mappings()]
+                if not rows:
+                    break
+                first_id, last_id = rows[0]['id'], rows[-1]['id']
+                chunk_keep = [row['id'] for row in rows if row['id'] in keep]
+                rows = [row for row in rows if row['id'] not in keep]
+                kept += len(chunk_keep)
+                
+                if rows:
+                    if pa is None:
+                        pa = _pyarrow()
+                        schema = _file_schema(pa)
+                    files += self._write_chunk(pa, schema, rows)
+                    
+                    # Same predicate as the select, bounded to this chunk's id range
+                    stmt = delete(table).where(
+                        table.c.id >= first_id, table.c.id <= last_id, table.c.recorded_at < cutoff
+                    )
+                    if chunk_keep:
+                        stmt = stmt.where(table.c.id.notin_(chunk_keep))
+                    db.execute(stmt)
+                    db.commit()
+                    archived += len(rows)
+                    print(f"[ARCHIVE] Archived {archived} health metrics")
+            
+            result = {
+                "cutoff": cutoff,
+                "archived": archived,
+                "kept_latest": kept,
+                "files_written": files,
+                "elapsed_ms": round((time.perf_counter() - start) * 1000, 2)
+            }
+            print(f"[ARCHIVE] Done: {archived} rows before {cutoff.date()} in {files} files "
+                  f"({kept} latest rows kept)")
+            return result
+        finally:
+            self._lock.release()
+    
+    def read(self, worker_id: int, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[Dict]:
+        """Archived rows of one worker with start <= recorded_at < end (unordered, may contain duplicates)"""
+        if not os.path.isdir(self.root):
+            return []
+        start, end = utc_naive(start), utc_naive(end)
+        first_day = start.date().isoformat() if start else None
+        last_day = end.date().isoformat() if end else None
+        
+        paths = []
+        for name in os.listdir(self.root):
+            if not name.startswith("day="):
+                continue
+            day = name[len("day="):]
+            if (first_day and day < first_day) or (last_day and day > last_day):
+                continue
+            directory = os.path.join(self.root, name, f"worker_id={worker_id}")
+            if os.path.isdir(directory):
+                paths.extend(
+                    os.path.join(directory, f) for f in os.listdir(directory) if f.endswith(".parquet")
+                )
+        if not paths:
+            return []
+        
+        pa = _pyarrow()
+        dataset = pa.dataset.dataset(paths, schema=_file_schema(pa), format="parquet")
+        recorded_at = pa.dataset.field('recorded_at')
+        condition = None
+        if start:
+            condition = recorded_at >= pa.scalar(start, pa.timestamp('us'))
+        if end:
+            before_end = recorded_at < pa.scalar(end, pa.timestamp('us'))
+            condition = before_end if condition is None else condition & before_end
+        
+        rows = dataset.to_table(filter=condition).to_pylist()
+        for row in rows:
+            row['worker_id'] = worker_id
+        return rows
+
+# Global archive (HEALTH_ARCHIVE_DIR, HEALTH_RETENTION_DAYS)
+health_archive = HealthArchive(HEALTH_ARCHIVE_DIR, HEALTH_RETENTION_DAYS)
+
+if __name__ == "__main__":
+    from database import SessionLocal
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else HEALTH_RETENTION_DAYS
+    db = SessionLocal()
+    try:
+        health_archive.run(db, retention_days=days)
+    finally:
+        db.close()
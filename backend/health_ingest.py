@@ -0,0 +1,174 @@
+"""
+Health metric ingestion pipeline
+Every path that stores wearable samples (single, bulk, write-behind) goes
+through here so rows are written with one multi-row INSERT per batch and
+post-ingest listeners (caches, alerts, aggregates) see exactly what was stored.
+"""
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Set
+from sqlalchemy import insert, Float
+from sqlalchemy.orm import Session
+import models
+from database import SessionLocal
+from config import HEALTH_BUFFER_MAX_ROWS, HEALTH_BUFFER_BATCH_SIZE, HEALTH_BUFFER_FLUSH_SECONDS
+
+# SQLite hands back integral REAL values from RETURNING as ints
+FLOAT_FIELDS = [c.name for c in models.HealthMetric.__table__.columns if isinstance(c.type, Float)]
+
+class HealthIngestPipeline:
+    def __init__(self):
+        self._listeners = []
+    
+    def on_ingest(self, listener: Callable[[Session, List[Dict]], None]):
+        """Register a callback run after every committed batch with the stored rows"""
+        self._listeners.append(listener)
+        return listener
+    
+    def known_worker_ids(self, db: Session, worker_ids: Iterable[int]) -> Set[int]:
+        """Subset of worker_ids that exist (one IN query)"""
+        worker_ids = set(worker_ids)
+        if not worker_ids:
+            return set()
+        rows = db.query(models.Worker.id).filter(models.Worker.id.in_(worker_ids)).all()
+        return {row.id for row in rows}
+    
+    def ingest(self, db: Session, rows: List[Dict]) -> List[Dict]:
+        """
+        Insert health metric rows in a single statement and commit
+        Returns the stored rows (every column, including the generated id and recorded_at) in input order.
+        """
+        if not rows:
+            return []
+        
+        # RETURNING every column so listeners also see server-side defaults (id, recorded_at, ...)
+        stmt = insert(models.HealthMetric).returning(
+            *models.HealthMetric.__table__.columns,
+            sort_by_parameter_order=True
+        )
+        stored = [dict(row._mapping) for row in db.execute(stmt, rows)]
+        db.commit()
+        
+        for row in stored:
+            for field in FLOAT_FIELDS:
+                if row[field] is not None:
+                    row[field] = float(row[field])
+        
+        self.after_ingest(db, stored)
+        return stored
+    
+    def after_ingest(self, db: Session, stored: List[Dict]):
+        """
+        Notify listeners; a failing listener never fails the ingest
+        The rows are already committed and listeners commit their own writes, so a
+        failure rolls back only that listener's work and the next one gets a clean session.
+        """
+        for listener in self._listeners:
+            try:
+                listener(db, stored)
+            except Exception as e:
+                db.rollback()
+                print(f"[INGEST] Listener {listener.__name__} failed, rolled back its changes: {e}")
+
+class HealthWriteBuffer:
+    """
+    Bounded write-behind queue in front of the pipeline
+    Requests only enqueue; a background thread flushes batches of batch_size rows,
+    or whatever is waiting every flush_seconds. Rows are stamped on arrival so a
+    delayed flush keeps the time the sample was received.
+    """
+    def __init__(self, pipeline: HealthIngestPipeline, max_rows: int, batch_size: int, flush_seconds: float):
+        self.pipeline = pipeline
+        self.max_rows = max_rows
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._rows = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self._counters = {
+            'queued': 0, 'flushed': 0, 'dropped': 0, 'failed': 0, 'batches': 0, 'last_flush_ms': 0.0
+        }
+    
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+    
+    def submit(self, rows: List[Dict]) -> bool:
+        """Queue rows (all or none); False when the queue has no room for them"""
+        received_at = datetime.utcnow()
+        with self._cond:
+            if self._stopping or len(self._rows) + len(rows) > self.max_rows:
+                self._counters['dropped'] += len(rows)
+                return False
+            self._rows.extend({**row, 'recorded_at': received_at} for row in rows)
+            self._counters['queued'] += len(rows)
+            if len(self._rows) >= self.batch_size:
+                self._cond.notify()
+        return True
+    
+    def start(self):
+        if self.running:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="health-write-buffer", daemon=True)
+        self._thread.start()
+        print(f"[INGEST] Write-behind buffer started (max {self.max_rows} rows, "
+              f"batch {self.batch_size}, every {self.flush_seconds}s)")
+    
+    def stop(self, timeout: float = 30.0):
+        """Stop accepting rows and flush everything still queued"""
+        if not self.running:
+            return
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        self._thread.join(timeout)
+        print(f"[INGEST] Write-behind buffer drained ({self.stats()['pending']} rows left)")
+    
+    def stats(self) -> Dict:
+        with self._cond:
+            return {**self._counters, 'pending': len(self._rows), 'max_rows': self.max_rows}
+    
+    def _take_batch(self) -> List[Dict]:
+        """Wait for a full batch, the flush interval or shutdown, then dequeue up to batch_size rows"""
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._stopping or len(self._rows) >= self.batch_size,
+                timeout=self.flush_seconds
+            )
+            count = min(len(self._rows), self.batch_size)
+            return [self._rows.popleft() for _ in range(count)]
+    
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if batch:
+                self._flush(batch)
+            elif self._stopping:
+                return
+    
+    def _flush(self, batch: List[Dict]):
+        start = time.perf_counter()
+        db = SessionLocal()
+        try:
+            self.pipeline.ingest(db, batch)
+            with self._cond:
+                self._counters['flushed'] += len(batch)
+                self._counters['batches'] += 1
+                self._counters['last_flush_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        except Exception as e:
+            db.rollback()
+            with self._cond:
+                self._counters['failed'] += len(batch)
+            print(f"[INGEST] Failed to flush {len(batch)} health metrics: {e}")
+        finally:
+            db.close()
+
+# Global ingestion pipeline and write-behind buffer (started only in buffered mode)
+health_ingest = HealthIngestPipeline()
+health_buffer = HealthWriteBuffer(
+    health_ingest, HEALTH_BUFFER_MAX_ROWS, HEALTH_BUFFER_BATCH_SIZE, HEALTH_BUFFER_FLUSH_SECONDS
+)
@@ -0,0 +1,207 @@
+"""
+Time-bucketed health metric rollups
+Per worker and per 1-minute / 1-hour / 1-day bucket: min, max, sum and count of
+every vital, plus the latest steps and calories. Maintained incrementally as an
+ingest listener with INSERT ... ON CONFLICT DO UPDATE, so trend charts read a few
+hundred rollup rows instead of scanning health_metrics. Databases without ON
+CONFLICT get a select-then-update merge (one select, one bulk insert, one bulk
+update per batch), which assumes a single writing process.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import case, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+import models
+from vitals_cache import CachedHealthMetric
+from health_archive import utc_naive
+
+VITALS = ('heart_rate', 'oxygen_level', 'stress_level', 'fatigue_score', 'body_temperature')
+BUCKETS = {
+    '1m': timedelta(minutes=1),
+    '1h': timedelta(hours=1),
+    '1d': timedelta(days=1),
+}
+DEFAULT_SPAN = {  # series window when no from= is given
+    '1m': timedelta(hours=6),
+    '1h': timedelta(days=7),
+    '1d': timedelta(days=90),
+}
+
+def bucket_start(recorded_at: datetime, bucket: str) -> datetime:
+    """Start of the bucket containing recorded_at"""
+    if bucket == '1m':
+        return recorded_at.replace(second=0, microsecond=0)
+    if bucket == '1h':
+        return recorded_at.replace(minute=0, second=0, microsecond=0)
+    return recorded_at.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def _aggregate(metrics: Iterable) -> List[Dict]:
+    """Rollup rows (one per worker / bucket / bucket start) for a batch of metrics"""
+    rows = {}
+    for metric in metrics:
+        for bucket in BUCKETS:
+            key = (metric.worker_id, bucket, bucket_start(metric.recorded_at, bucket))
+            row = rows.get(key)
+            if row is None:
+                row = {'worker_id': key[0], 'bucket': bucket, 'bucket_start': key[2], 'sample_count': 0,
+                       'steps_count_last': None, 'calories_burned_last': None, 'last_recorded_at': None}
+                for vital in VITALS:
+                    row.update({f'{vital}_min': None, f'{vital}_max': None, f'{vital}_sum': 0.0, f'{vital}_count': 0})
+                rows[key] = row
+            
+            row['sample_count'] += 1
+            for vital in VITALS:
+                value = getattr(metric, vital)
+                if value is None:
+                    continue
+                row[f'{vital}_min'] = value if row[f'{vital}_min'] is None else min(row[f'{vital}_min'], value)
+                row[f'{vital}_max'] = value if row[f'{vital}_max'] is None else max(row[f'{vital}_max'], value)
+                row[f'{vital}_sum'] += value
+                row[f'{vital}_count'] += 1
+            if row['last_recorded_at'] is None or metric.recorded_at >= row['last_recorded_at']:
+                row['steps_count_last'] = metric.steps_count
+                row['calories_burned_last'] = metric.calories_burned
+                row['last_recorded_at'] = metric.recorded_at
+    return list(rows.values())
+
+def _merge_row(old: Dict, new: Dict) -> Dict:
+    """Stored rollup row merged with a batch rollup row (same rules as the ON CONFLICT update)"""
+    merged = dict(new)
+    merged['sample_count'] = old['sample_count'] + new['sample_count']
+    if old['last_recorded_at'] is not None and utc_naive(new['last_recorded_at']) < utc_naive(old['last_recorded_at']):
+        for field in ('steps_count_last', 'calories_burned_last', 'last_recorded_at'):
+            merged[field] = old[field]
+    for vital in VITALS:
+        mins = [v for v in (old[f'{vital}_min'], new[f'{vital}_min']) if v is not None]
+        maxs = [v for v in (old[f'{vital}_max'], new[f'{vital}_max']) if v is not None]
+        merged[f'{vital}_min'] = min(mins) if mins else None
+        merged[f'{vital}_max'] = max(maxs) if maxs else None
+        merged[f'{vital}_sum'] = (old[f'{vital}_sum'] or 0.0) + new[f'{vital}_sum']
+        merged[f'{vital}_count'] = (old[f'{vital}_count'] or 0) + new[f'{vital}_count']
+    return merged
+
+def _upsert_statement(dialect_name: str):
+    """INSERT ... ON CONFLICT DO UPDATE that merges a batch rollup into the stored one (None if unsupported)"""
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    
+    table = models.HealthMetricRollup.__table__
+    stmt = dialect_insert(table)
+    new = stmt.excluded
+    merged = {
+        'sample_count': table.c.sample_count + new.sample_count,
+        'steps_count_last': case(
+            (new.last_recorded_at >= table.c.last_recorded_at, new.steps_count_last), else_=table.c.steps_count_last
+        ),
+        'calories_burned_last': case(
+            (new.last_recorded_at >= table.c.last_recorded_at, new.calories_burned_last), else_=table.c.calories_burned_last
+        ),
+        'last_recorded_at': case(
+            (new.last_recorded_at >= table.c.last_recorded_at, new.last_recorded_at), else_=table.c.last_recorded_at
+        ),
+    }
+    for vital in VITALS:
+        old_min, new_min = table.c[f'{vital}_min'], new[f'{vital}_min']
+        old_max, new_max = table.c[f'{vital}_max'], new[f'{vital}_max']
+        merged[f'{vital}_min'] = case(
+            (old_min.is_(None), new_min), (new_min.is_(None), old_min), (new_min < old_min, new_min), else_=old_min
+        )
+        merged[f'{vital}_max'] = case(
+            (old_max.is_(None), new_max), (new_max.is_(None), old_max), (new_max > old_max, new_max), else_=old_max
+        )
+        merged[f'{vital}_sum'] = table.c[f'{vital}_sum'] + new[f'{vital}_sum']
+        merged[f'{vital}_count'] = table.c[f'{vital}_count'] + new[f'{vital}_count']
+    
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.worker_id, table.c.bucket, table.c.bucket_start],
+        set_=merged
+    )
+
+class HealthRollups:
+    def __init__(self):
+        self._statements = {}  # dialect name -> upsert statement, None for the select-then-update merge
+    
+    def prepare(self, dialect_name: str) -> Optional[object]:
+        """Upsert statement for a dialect, built once (startup logs when the portable merge is used)"""
+        if dialect_name not in self._statements:
+            self._statements[dialect_name] = _upsert_statement(dialect_name)
+            if self._statements[dialect_name] is None:
+                print(f"[ROLLUPS] {dialect_name} has no ON CONFLICT upsert; merging rollups with "
+                      f"select-then-update (safe with one writing process only)")
+        return self._statements[dialect_name]
+    
+    def _select_then_update(self, db: Session, rows: List[Dict]):
+        """Portable merge: read the stored rows of the batch's buckets, then bulk insert / update"""
+        Rollup = models.HealthMetricRollup
+        table = Rollup.__table__
+        starts = [row['bucket_start'] for row in rows]
+        stored = db.execute(select(table).where(  # plain rows, the session's identity map is not touched
+            table.c.worker_id.in_({row['worker_id'] for row in rows}),
+            table.c.bucket_start >= min(starts),
+            table.c.bucket_start <= max(starts)
+        )).mappings()
+        existing = {(r['worker_id'], r['bucket'], utc_naive(r['bucket_start'])): r for r in stored}
+        new_rows, updated_rows = [], []
+        for row in rows:
+            old = existing.get((row['worker_id'], row['bucket'], utc_naive(row['bucket_start'])))
+            if old is None:
+                new_rows.append(row)
+            else:
+                updated_rows.append({**_merge_row(old, row), 'bucket_start': old['bucket_start']})
+        if new_rows:
+            db.execute(insert(Rollup), new_rows)
+        if updated_rows:
+            db.execute(update(Rollup), updated_rows)
+    
+    def apply(self, db: Session, metrics: Iterable):
+        """Fold metrics (HealthMetric rows or lookalikes) into the rollups and commit"""
+        rows = _aggregate(metrics)
+        if not rows:
+            return
+        stmt = self.prepare(db.get_bind().dialect.name)
+        if stmt is not None:
+            db.execute(stmt, rows)
+        else:
+            try:
+                self._select_then_update(db, rows)
+            except IntegrityError:
+                db.rollback()  # a bucket was inserted meanwhile: read again and merge into it
+                self._select_then_update(db, rows)
+        db.commit()
+    
+    def on_ingest(self, db: Session, stored: List[Dict]):
+        """Health ingest listener"""
+        self.apply(db, (CachedHealthMetric(row) for row in stored))
+    
+    def backfill(self, db: Session, chunk_size: int = 50_000) -> int:
+        """Build rollups from every raw row (run once, on an empty rollup table). Returns rows read"""
+        total = 0
+        last_id = 0
+        while True:
+            metrics = db.query(models.HealthMetric).filter(
+                models.HealthMetric.id > last_id
+            ).order_by(models.HealthMetric.id).limit(chunk_size).all()
+            if not metrics:
+                return total
+            self.apply(db, metrics)
+            last_id = metrics[-1].id
+            total += len(metrics)
+            db.expunge_all()
+            print(f"   rolled up {total} health metrics")
+    
+    def series(self, db: Session, worker_id: int, bucket: str, start: datetime, end: datetime) -> List[models.HealthMetricRollup]:
+        """Rollup rows of one worker for buckets overlapping [start, end), oldest first"""
+        return db.query(models.HealthMetricRollup).filter(
+            models.HealthMetricRollup.worker_id == worker_id,
+            models.HealthMetricRollup.bucket == bucket,
+            models.HealthMetricRollup.bucket_start >= bucket_start(start, bucket),
+            models.HealthMetricRollup.bucket_start < end
+        ).order_by(models.HealthMetricRollup.bucket_start).all()
+
+# Global rollup maintainer
+health_rollups = HealthRollups()
@@ -0,0 +1,197 @@
+"""
+Health alert rule engine
+Every stored health metric is evaluated once, at ingest, against threshold rules.
+The resulting status and active alerts are kept in memory and persisted to
+worker_health_status, so summaries, the dashboard and /health/alerts/active
+only read them.
+
+A rule breaches when its metric is above `max` or below `min`. With
+sustained_seconds > 0 the breach must hold across consecutive samples for that
+long before the alert becomes active. Rules come from DEFAULT_HEALTH_RULES or
+the JSON file named by HEALTH_RULES_FILE.
+"""
+import json
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import insert, update, delete
+from sqlalchemy.orm import Session
+import models
+from config import HEALTH_RULES_FILE
+from vitals_cache import latest_vitals, CachedHealthMetric
+
+SEVERITY_RANK = {"Good": 0, "Warning": 1, "Critical": 2}
+
+DEFAULT_HEALTH_RULES = [
+    {"name": "elevated_heart_rate", "field": "heart_rate", "max": 100, "severity": "Warning",
+     "message": "Elevated heart rate: {value} bpm"},
+    {"name": "low_oxygen", "field": "oxygen_level", "min": 95, "severity": "Warning",
+     "message": "Low oxygen level: {value}%"},
+    {"name": "high_stress", "field": "stress_level", "max": 70, "severity": "Warning",
+     "message": "High stress level: {value}%"},
+    {"name": "high_fatigue", "field": "fatigue_score", "max": 70, "severity": "Warning",
+     "message": "High fatigue: {value}%"},
+    {"name": "abnormal_temperature", "field": "body_temperature", "min": 36.0, "max": 38.0, "severity": "Critical",
+     "message": "Abnormal temperature: {value}°C"},
+]
+
+class HealthRule:
+    def __init__(self, name: str, field: str, severity: str, message: str,
+                 min: float = None, max: float = None, sustained_seconds: float = 0):
+        if field not in models.HealthMetric.__table__.columns:
+            raise ValueError(f"Health rule {name}: unknown metric field {field}")
+        if severity not in SEVERITY_RANK or severity == "Good":
+            raise ValueError(f"Health rule {name}: severity must be Warning or Critical")
+        self.name = name
+        self.field = field
+        self.severity = severity
+        self.message = message
+        self.min = min
+        self.max = max
+        self.sustained_seconds = sustained_seconds
+    
+    def breached(self, value) -> bool:
+        """Missing (or zero) readings never breach"""
+        if not value:
+            return False
+        return (self.max is not None and value > self.max) or (self.min is not None and value < self.min)
+
+def load_rules() -> List[HealthRule]:
+    """Rules from HEALTH_RULES_FILE if set, otherwise the defaults"""
+    rules = DEFAULT_HEALTH_RULES
+    if HEALTH_RULES_FILE:
+        with open(HEALTH_RULES_FILE) as f:
+            rules = json.load(f)
+        print(f"[RULES] Loaded {len(rules)} health rules from {HEALTH_RULES_FILE}")
+    return [HealthRule(**rule) for rule in rules]
+
+class WorkerHealthState:
+    """Current evaluation result of one worker (mirrors a worker_health_status row)"""
+    __slots__ = ('worker_id', 'health_status', 'alerts', 'rule_state', 'metric_id', 'evaluated_at')
+    
+    def __init__(self, worker_id: int, health_status: str = "Good", alerts: List[Dict] = None,
+                 rule_state: Dict[str, str] = None, metric_id: int = None, evaluated_at: datetime = None):
+        self.worker_id = worker_id
+        self.health_status = health_status
+        self.alerts = alerts or []
+        self.rule_state = rule_state or {}
+        self.metric_id = metric_id
+        self.evaluated_at = evaluated_at
+    
+    def to_row(self) -> Dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+class HealthRuleEngine:
+    def __init__(self, rules: List[HealthRule]):
+        self.rules = rules
+        self._lock = threading.Lock()  # serializes evaluation + persistence
+        self._states_lock = threading.Lock()  # guards the _states dict; held briefly, never across DB calls
+        self._states = None  # worker_id -> WorkerHealthState, None until loaded
+    
+    def load(self, db: Session):
+        """Load persisted statuses; workers with vitals but no status yet are evaluated from their latest metric"""
+        with self._lock:
+            states = {
+                row.worker_id: WorkerHealthState(
+                    row.worker_id, row.health_status, row.alerts, row.rule_state, row.metric_id, row.evaluated_at
+                )
+                for row in db.query(models.WorkerHealthStatus).all()
+            }
+            
+            backfill = [
+                metric for worker_id, metric in latest_vitals.all(db).items() if worker_id not in states
+            ]
+            new_states = {}
+            for metric in backfill:
+                new_states[metric.worker_id] = self._evaluate(WorkerHealthState(metric.worker_id), metric)
+            if new_states:
+                db.execute(insert(models.WorkerHealthStatus), [s.to_row() for s in new_states.values()])
+                db.commit()
+            
+            states.update(new_states)
+            self._states = states
+        print(f"[RULES] Loaded health status for {len(states)} workers ({len(new_states)} evaluated)")
+    
+    def _evaluate(self, state: WorkerHealthState, metric) -> WorkerHealthState:
+        """New state after one metric (older or already seen metrics leave the state unchanged)"""
+        if state.evaluated_at is not None and (metric.recorded_at, metric.id) <= (state.evaluated_at, state.metric_id):
+            return state
+        
+        rule_state = {}
+        alerts = []
+        for rule in self.rules:
+            value = getattr(metric, rule.field)
+            if not rule.breached(value):
+                continue
+            since = state.rule_state.get(rule.name) or metric.recorded_at.isoformat()
+            rule_state[rule.name] = since
+            if (metric.recorded_at - datetime.fromisoformat(since)).total_seconds() >= rule.sustained_seconds:
+                alerts.append({
+                    "rule": rule.name,
+                    "severity": rule.severity,
+                    "message": rule.message.format(value=value),
+                    "since": since
+                })
+        
+        health_status = max((a["severity"] for a in alerts), key=SEVERITY_RANK.get, default="Good")
+        return WorkerHealthState(state.worker_id, health_status, alerts, rule_state, metric.id, metric.recorded_at)
+    
+    def on_ingest(self, db: Session, stored: List[Dict]):
+        """Health ingest listener: evaluate new metrics and persist changed statuses"""
+        if self._states is None:
+            self.load(db)
+        
+        metrics = sorted(
+            (CachedHealthMetric(row) for row in stored),
+            key=lambda m: (m.recorded_at, m.id)
+        )
+        with self._lock:
+            changed = {}  # applied to self._states only after the commit
+            for metric in metrics:
+                state = (changed.get(metric.worker_id) or self._states.get(metric.worker_id)
+                         or WorkerHealthState(metric.worker_id))
+                new_state = self._evaluate(state, metric)
+                if new_state is not state:
+                    changed[metric.worker_id] = new_state
+            if not changed:
+                return
+            
+            new_rows = [s.to_row() for w, s in changed.items() if w not in self._states]
+            updated_rows = [s.to_row() for w, s in changed.items() if w in self._states]
+            if new_rows:
+                db.execute(insert(models.WorkerHealthStatus), new_rows)
+            if updated_rows:
+                db.execute(update(models.WorkerHealthStatus), updated_rows)
+            db.commit()
+            with self._states_lock:
+                self._states.update(changed)
+    
+    def remove(self, db: Session, worker_id: int):
+        """Forget a deleted worker"""
+        with self._lock:
+            db.execute(delete(models.WorkerHealthStatus).where(models.WorkerHealthStatus.worker_id == worker_id))
+            db.commit()
+            if self._states is not None:
+                with self._states_lock:
+                    self._states.pop(worker_id, None)
+    
+    def all(self, db: Session) -> Dict[int, WorkerHealthState]:
+        """Current status of every evaluated worker, keyed by worker_id (a copy)"""
+        if self._states is None:
+            self.load(db)
+        with self._states_lock:
+            return dict(self._states)
+    
+    def get(self, db: Session, worker_id: int) -> Optional[WorkerHealthState]:
+        if self._states is None:
+            self.load(db)
+        with self._states_lock:
+            return self._states.get(worker_id)
+    
+    def active(self, db: Session) -> List[WorkerHealthState]:
+        """Workers with at least one active alert, most severe first"""
+        states = [s for s in self.all(db).values() if s.alerts]
+        return sorted(states, key=lambda s: (-SEVERITY_RANK[s.health_status], s.worker_id))
+
+# Global rule engine
+health_rules = HealthRuleEngine(load_rules())
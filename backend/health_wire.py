@@ -0,0 +1,105 @@
+"""
+Packed binary wire format for wearable uploads
+Alternative to the JSON body of /health/metrics/bulk for gateways that forward
+many samples at once. A payload is an 8-byte header followed by fixed-size
+little-endian records, decoded with one NumPy view instead of parsing and
+validating a JSON object per sample.
+
+    header:  magic b"SKHM" | version uint16 | record size uint16
+    record:  see RECORD_DTYPE (54 bytes, no padding)
+
+Missing readings are 0xFFFF for the uint16 vitals and NaN for the float32 ones;
+an empty device_id means none. Floats are rounded to 3 decimals on decode so
+float32 noise (97.3 -> 97.30000305) never reaches the database.
+"""
+import struct
+from typing import Dict, List, Tuple
+import numpy as np
+
+CONTENT_TYPE = "application/x-health-metrics"
+MAGIC = b"SKHM"
+VERSION = 1
+HEADER = struct.Struct("<4sHH")
+MISSING_U16 = 0xFFFF
+
+RECORD_DTYPE = np.dtype([
+    ('worker_id', '<u4'),
+    ('heart_rate', '<u2'),
+    ('blood_pressure_systolic', '<u2'),
+    ('blood_pressure_diastolic', '<u2'),
+    ('oxygen_level', '<f4'),
+    ('body_temperature', '<f4'),
+    ('stress_level', '<f4'),
+    ('fatigue_score', '<f4'),
+    ('steps_count', '<u4'),
+    ('calories_burned', '<f4'),
+    ('hours_worked_today', '<f4'),
+    ('device_id', 'S16'),
+])
+
+OPTIONAL_INTS = ('heart_rate', 'blood_pressure_systolic', 'blood_pressure_diastolic')
+OPTIONAL_FLOATS = ('oxygen_level', 'body_temperature', 'stress_level', 'fatigue_score')
+PERCENT_FIELDS = ('stress_level', 'fatigue_score')  # same 0-100 bounds as HealthMetricCreate
+
+def encode(samples: List[Dict]) -> bytes:
+    """Pack HealthMetricCreate-shaped dicts into a payload (device simulators, tests, benchmarks)"""
+    records = np.zeros(len(samples), dtype=RECORD_DTYPE)
+    for i, sample in enumerate(samples):
+        records[i]['worker_id'] = sample['worker_id']
+        for field in OPTIONAL_INTS:
+            value = sample.get(field)
+            records[i][field] = MISSING_U16 if value is None else value
+        for field in OPTIONAL_FLOATS:
+            value = sample.get(field)
+            records[i][field] = np.nan if value is None else value
+        records[i]['steps_count'] = sample.get('steps_count') or 0
+        records[i]['calories_burned'] = sample.get('calories_burned') or 0.0
+        records[i]['hours_worked_today'] = sample.get('hours_worked_today') or 0.0
+        records[i]['device_id'] = (sample.get('device_id') or '').encode()
+    return HEADER.pack(MAGIC, VERSION, RECORD_DTYPE.itemsize) + records.tobytes()
+
+def _nullable(values: np.ndarray, missing: np.ndarray) -> List:
+    column = values.astype(object)
+    column[missing] = None
+    return column.tolist()
+
+def decode(payload: bytes) -> Tuple[List[Dict], Dict[int, str]]:
+    """
+    Decode a payload into health metric rows (input order) plus {index: error} for
+    rows that fail validation. Raises ValueError for a malformed payload.
+    """
+    if len(payload) < HEADER.size:
+        raise ValueError("Payload shorter than the header")
+    magic, version, record_size = HEADER.unpack_from(payload)
+    if magic != MAGIC:
+        raise ValueError("Not a health metric payload (bad magic)")
+    if version != VERSION or record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"Unsupported payload version {version} / record size {record_size}")
+    body_size = len(payload) - HEADER.size
+    if body_size % record_size:
+        raise ValueError(f"Payload body is not a whole number of {record_size}-byte records")
+    
+    records = np.frombuffer(payload, dtype=RECORD_DTYPE, offset=HEADER.size)
+    
+    columns = {'worker_id': records['worker_id'].tolist()}
+    for field in OPTIONAL_INTS:
+        values = records[field]
+        columns[field] = _nullable(values, values == MISSING_U16)
+    for field in OPTIONAL_FLOATS:
+        values = records[field].astype(np.float64)
+        columns[field] = _nullable(np.round(values, 3), np.isnan(values))
+    columns['steps_count'] = records['steps_count'].tolist()
+    columns['calories_burned'] = np.round(records['calories_burned'].astype(np.float64), 3).tolist()
+    columns['hours_worked_today'] = np.round(records['hours_worked_today'].astype(np.float64), 3).tolist()
+    device_ids = np.char.decode(records['device_id'], 'ascii', 'replace')
+    columns['device_id'] = _nullable(device_ids, device_ids == '')
+    
+    errors = {}
+    for field in PERCENT_FIELDS:
+        values = records[field]
+        for index in np.flatnonzero((values < 0) | (values > 100)).tolist():
+            errors.setdefault(index, f"{field} must be between 0 and 100")
+    
+    names = list(columns)
+    rows = [dict(zip(names, values)) for values in zip(*columns.values())]
+    return rows, errors
@@ -1,19 +1,47 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Query, Header, Request, WebSocket, WebSocketDisconnect, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 import models
 import schemas
-from database import engine, get_db
-from ml_model import ml_model
+from database import engine, get_db, SessionLocal
+from config import HEALTH_INGEST_MODE
+from ml_model import ml_model, top_k_indices
+from training_jobs import training_jobs
+from model_registry import model_registry
+from feature_store import feature_store
+from skill_index import skill_vocab
+from health_ingest import health_ingest, health_buffer
+import health_wire
+from vitals_cache import latest_vitals, CachedHealthMetric
+from health_rules import health_rules
+from health_rollups import health_rollups, DEFAULT_SPAN, VITALS
+from health_archive import health_archive, retention_cutoff, utc_naive
+from fatigue_estimator import fatigue_estimator
+from event_hub import event_hub, worker_channel, SUPERVISOR_CHANNEL
+import change_log
 from chatbot import chatbot
 import random
+import time
+import asyncio
 from datetime import datetime, timedelta
-from sqlalchemy import func
+from sqlalchemy import func, case
+import numpy as np
+from scipy.optimize import linear_sum_assignment
 
 # Create tables
 models.Base.metadata.create_all(bind=engine)
 
+# Task / assignment writes are recorded for the /task/changes and /assignment/changes delta feeds
+change_log.track(SessionLocal)
+
+# Stored health metrics keep the latest-vitals cache, alert statuses, rollups and fatigue estimates current
+health_ingest.on_ingest(latest_vitals.on_ingest)
+health_ingest.on_ingest(health_rules.on_ingest)
+health_ingest.on_ingest(health_rollups.on_ingest)
+health_ingest.on_ingest(fatigue_estimator.on_ingest)
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Skill-Based Role Assignment API",
@@ -33,12 +61,34 @@ app.add_middleware(
 # Load ML model and chatbot on startup
 @app.on_event("startup")
 async def startup_event():
-    ml_model.load()
-    print("ML model loaded (if available)")
+    version = model_registry.load_current()
+    print(f"ML model v{version} loaded" if version else "No trained ML model yet")
     
     # Load chatbot (optional, can be lazy-loaded)
     # chatbot.load_model()  # Uncomment to load on startup
     print("Chatbot ready (will load on first use)")
+    
+    # Warm the latest-vitals cache, alert statuses and fatigue state; ingest keeps them current from here on
+    db = SessionLocal()
+    try:
+        latest_vitals.load(db)
+        health_rules.load(db)
+        fatigue_estimator.load(db)
+    finally:
+        db.close()
+    
+    health_rollups.prepare(engine.dialect.name)
+    
+    if HEALTH_INGEST_MODE == "buffered":
+        health_buffer.start()
+    event_hub.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Flush queued health metrics before the process exits
+    health_buffer.stop()
+    event_hub.stop()
+    training_jobs.shutdown()
 
 # ==================== WORKER ENDPOINTS ====================
 
@@ -49,6 +99,7 @@ def add_worker(worker: schemas.WorkerCreate, db: Session = Depends(get_db)):
     db.add(db_worker)
     db.commit()
     db.refresh(db_worker)
+    feature_store.upsert(db_worker)
     return db_worker
 
 @app.get("/worker/all", response_model=List[schemas.WorkerResponse])
@@ -78,6 +129,7 @@ def update_worker(worker_id: int, worker_update: schemas.WorkerUpdate, db: Sessi
     
     db.commit()
     db.refresh(worker)
+    feature_store.upsert(worker)
     return worker
 
 @app.delete("/worker/{worker_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -89,6 +141,10 @@ def delete_worker(worker_id: int, db: Session = Depends(get_db)):
     
     db.delete(worker)
     db.commit()
+    feature_store.remove(worker_id)
+    latest_vitals.remove(worker_id)
+    health_rules.remove(db, worker_id)
+    fatigue_estimator.remove(db, worker_id)
     return None
 
 # ==================== ROLE ENDPOINTS ====================
@@ -155,118 +211,199 @@ def predict_fit(request: schemas.PredictFitRequest, db: Session = Depends(get_db
     if not role:
         raise HTTPException(status_code=404, detail="Role not found")
     
-    workers = db.query(models.Worker).all()
+    snapshot = feature_store.snapshot(db)
+    workers = snapshot.workers
     if not workers:
         raise HTTPException(status_code=404, detail="No workers available")
     
-    recommendations = []
+    role_data = {
+        'id': role.id,
+        'name': role.name,
+        'required_skills': role.required_skills,
+        'difficulty_level': role.difficulty_level
+    }
     
-    for worker in workers:
-        worker_data = {
-            'id': worker.id,
-            'name': worker.name,
-            'age': worker.age,
-            'experience': worker.experience,
-            'skills': worker.skills,
-            'fatigue_level': worker.fatigue_level,
-            'performance_score': worker.performance_score
-        }
-        
-        role_data = {
-            'id': role.id,
-            'name': role.name,
-            'required_skills': role.required_skills,
-            'difficulty_level': role.difficulty_level
-        }
-        
-        fit_score, confidence = ml_model.predict(worker_data, role_data)
-        
-        worker_skills = set(worker.skills)
-        required_skills = set(role.required_skills)
-        skill_match_percentage = len(worker_skills.intersection(required_skills)) / len(required_skills) * 100 if required_skills else 0
-        
-        recommendations.append(schemas.WorkerRecommendation(
+    # One model for the whole request, even if a training job swaps in a new one meanwhile
+    model = ml_model.get()
+    match_count, match_fraction = snapshot.skill_match(role.required_skills)
+    skill_onehot = snapshot.skill_onehot(model.all_skills)
+    features = snapshot.features
+    
+    if request.min_skill_match:
+        # Prune to workers holding enough required skills before ML scoring
+        rows = snapshot.rows_for(
+            feature_store.candidate_ids(db, role.required_skills, request.min_skill_match)
+        )
+        workers = [workers[i] for i in rows]
+        match_count, match_fraction = match_count[rows], match_fraction[rows]
+        skill_onehot, features = skill_onehot[rows], features[rows]
+    
+    # Score the whole roster in one batch from the cached feature matrix
+    fit_scores, confidences = model.score_batch(
+        features, match_count, match_fraction, role_data, skill_onehot
+    )
+    skill_match_percentages = match_fraction * 100
+    
+    # Only the top_n winners are turned into response objects
+    top_recommendations = []
+    
+    for i in top_k_indices(fit_scores, request.top_n):
+        worker = workers[i]
+        top_recommendations.append(schemas.WorkerRecommendation(
             worker_id=worker.id,
             worker_name=worker.name,
-            fit_score=fit_score,
-            confidence=confidence,
+            fit_score=float(fit_scores[i]),
+            confidence=float(confidences[i]),
             skills=worker.skills,
             fatigue_level=worker.fatigue_level,
             hours_per_day=worker.hours_per_day,
             hours_per_week=worker.hours_per_week,
             performance_score=worker.performance_score,
-            skill_match_percentage=skill_match_percentage
+            skill_match_percentage=float(skill_match_percentages[i])
         ))
     
-    recommendations.sort(key=lambda x: x.fit_score, reverse=True)
-    top_recommendations = recommendations[:request.top_n]
-    
     return schemas.PredictFitResponse(
         role_id=role.id,
         role_name=role.name,
         recommendations=top_recommendations
     )
 
-@app.post("/train-model")
-def train_model(db: Session = Depends(get_db)):
-    """Train/Update ML model with historical assignment data"""
-    assignments = db.query(models.Assignment).filter(models.Assignment.success.isnot(None)).all()
-    
-    if len(assignments) < 10:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"Insufficient training data. Need at least 10 labeled assignments, found {len(assignments)}"
-        )
-    
-    workers = db.query(models.Worker).all()
-    roles = db.query(models.Role).all()
+@app.post("/assign/optimize", response_model=schemas.OptimizeAssignmentResponse)
+def optimize_assignments(request: schemas.OptimizeAssignmentRequest, db: Session = Depends(get_db)):
+    """Plant-wide plan: at most one role per worker, maximizing total fit score"""
+    query = db.query(models.Role)
+    if request.role_ids:
+        query = query.filter(models.Role.id.in_(request.role_ids))
+    roles = query.order_by(models.Role.id).all()
+    if not roles:
+        raise HTTPException(status_code=404, detail="No roles found")
+    
+    snapshot = feature_store.snapshot(db)
+    if not snapshot.workers:
+        raise HTTPException(status_code=404, detail="No workers available")
     
-    assignments_data = [
+    roles_data = [
         {
-            'worker_id': a.worker_id,
-            'role_id': a.role_id,
-            'success': a.success
+            'id': role.id,
+            'name': role.name,
+            'required_skills': role.required_skills,
+            'difficulty_level': role.difficulty_level
         }
-        for a in assignments
+        for role in roles
     ]
     
-    workers_data = [
-        {
-            'id': w.id,
-            'age': w.age,
-            'experience': w.experience,
-            'skills': w.skills,
-            'fatigue_level': w.fatigue_level,
-            'performance_score': w.performance_score
-        }
-        for w in workers
-    ]
+    # Score the full worker x role fit matrix in one batch
+    model = ml_model.get()
+    match_counts, match_fractions = snapshot.skill_match_matrix([r.required_skills for r in roles])
+    fit_scores, confidences = model.score_roles(
+        snapshot.features, match_counts, match_fractions, roles_data, snapshot.skill_onehot(model.all_skills)
+    )
     
-    roles_data = [
-        {
-            'id': r.id,
-            'required_skills': r.required_skills,
-            'difficulty_level': r.difficulty_level
-        }
-        for r in roles
-    ]
+    # Fatigue and hours caps decide who may take a role at all
+    eligible = np.flatnonzero(
+        (snapshot.fatigue_level < request.max_fatigue)
+        & (snapshot.hours_per_day < request.max_hours_per_day)
+        & (snapshot.hours_per_week < request.max_hours_per_week)
+    )
     
-    try:
-        X, y = ml_model.prepare_training_data(assignments_data, workers_data, roles_data)
-        metrics = ml_model.train(X, y)
-        ml_model.save()
+    plan = []
+    if len(eligible) > 0:
+        scores = fit_scores[eligible]
+        # Pairs below the minimum fit can still be picked by the solver, drop them afterwards
+        worker_rows, role_cols = linear_sum_assignment(scores, maximize=True)
+        plan = [
+            (eligible[i], j) for i, j in zip(worker_rows, role_cols)
+            if scores[i, j] >= request.min_fit_score
+        ]
+    
+    assignments = []
+    assigned_roles = set()
+    for i, j in plan:
+        worker = snapshot.workers[i]
+        role = roles[j]
+        assigned_roles.add(role.id)
+        assignments.append(schemas.OptimizedAssignment(
+            role_id=role.id,
+            role_name=role.name,
+            worker_id=worker.id,
+            worker_name=worker.name,
+            fit_score=float(fit_scores[i, j]),
+            confidence=float(confidences[i, j]),
+            skill_match_percentage=float(match_fractions[i, j] * 100),
+            fatigue_level=worker.fatigue_level,
+            hours_per_day=worker.hours_per_day,
+            hours_per_week=worker.hours_per_week
+        ))
+    
+    if request.create_assignments and assignments:
+        db_assignments = [
+            models.Assignment(worker_id=item.worker_id, role_id=item.role_id, fit_score=item.fit_score)
+            for item in assignments
+        ]
+        db.add_all(db_assignments)
         
-        return {
-            "status": "success",
-            "message": "Model trained successfully",
-            "metrics": metrics,
-            "training_samples": len(assignments)
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Training failed: {str(e)}")
+        for item, (_, j) in zip(assignments, plan):
+            roles[j].current_assignee_id = item.worker_id
+            db.query(models.Worker).filter(models.Worker.id == item.worker_id).update(
+                {models.Worker.current_role: item.role_name}, synchronize_session=False
+            )
+        
+        db.flush()
+        for item, db_assignment in zip(assignments, db_assignments):
+            item.assignment_id = db_assignment.id
+        db.commit()
+        
+        for item in assignments:
+            feature_store.patch(item.worker_id, current_role=item.role_name)
+        
+        # Reload the committed rows in one query (not one refresh each), then push them like /assignment/create
+        created = db.query(models.Assignment).filter(
+            models.Assignment.id.in_([item.assignment_id for item in assignments])
+        ).order_by(models.Assignment.id).all()
+        for db_assignment in created:
+            _publish_assignment_event("assignment.created", db_assignment)
+    
+    assignments.sort(key=lambda a: a.role_id)
+    
+    return schemas.OptimizeAssignmentResponse(
+        assignments=assignments,
+        unassigned_role_ids=[role.id for role in roles if role.id not in assigned_roles],
+        eligible_workers=len(eligible),
+        total_fit_score=sum(a.fit_score for a in assignments)
+    )
+
+def _labeled_assignment_count(db: Session) -> int:
+    return db.query(models.Assignment).filter(models.Assignment.success.isnot(None)).count()
+
+@app.post("/train-model", status_code=status.HTTP_202_ACCEPTED)
+def train_model(db: Session = Depends(get_db)):
+    """Train/Update ML model with historical assignment data (background job, poll /ml/jobs/{job_id})"""
+    labeled = _labeled_assignment_count(db)
+    
+    if labeled < 10:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Insufficient training data. Need at least 10 labeled assignments, found {labeled}"
+        )
+    
+    job = training_jobs.submit("train-model", incremental=False, min_samples=10)
+    return {
+        "status": "queued",
+        "message": "Model training started",
+        "job_id": job.id,
+        "status_url": f"/ml/jobs/{job.id}"
+    }
 
 # ==================== ASSIGNMENT ENDPOINTS ====================
 
+def _publish_assignment_event(event_type: str, assignment: models.Assignment):
+    """Push an assignment change to its worker and to supervisors"""
+    event_hub.publish([worker_channel(assignment.worker_id), SUPERVISOR_CHANNEL], {
+        "type": event_type,
+        "worker_id": assignment.worker_id,
+        "assignment": schemas.AssignmentResponse.model_validate(assignment).model_dump(mode="json")
+    })
+
 @app.post("/assignment/create", response_model=schemas.AssignmentResponse, status_code=status.HTTP_201_CREATED)
 def create_assignment(assignment: schemas.AssignmentCreate, db: Session = Depends(get_db)):
     """Create a new assignment"""
@@ -286,6 +423,8 @@ def create_assignment(assignment: schemas.AssignmentCreate, db: Session = Depend
     
     db.commit()
     db.refresh(db_assignment)
+    feature_store.upsert(worker)
+    _publish_assignment_event("assignment.created", db_assignment)
     return db_assignment
 
 @app.put("/assignment/{assignment_id}/feedback")
@@ -300,9 +439,35 @@ def add_assignment_feedback(assignment_id: int, feedback: schemas.AssignmentFeed
     assignment.completed_at = datetime.utcnow()
     
     db.commit()
+    _publish_assignment_event("assignment.updated", assignment)
     
     return {"status": "success", "message": "Feedback recorded"}
 
+@app.get("/assignment/changes", response_model=schemas.AssignmentChangesResponse)
+def get_assignment_changes(
+    since: int = Query(0, ge=0),
+    worker_id: Optional[int] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db)
+):
+    """Assignments created, updated or deleted after the since cursor (delta sync; since=0 is a full sync)"""
+    latest, cursor, has_more, reset = change_log.changes(db, 'assignment', since, limit, worker_id)
+    assignments = {}
+    if latest:
+        query = db.query(models.Assignment).filter(models.Assignment.id.in_(list(latest)))
+        if worker_id is not None:
+            query = query.filter(models.Assignment.worker_id == worker_id)  # reassigned away: tombstone
+        assignments = {a.id: a for a in query.all()}
+    changes = [
+        schemas.AssignmentChange(
+            seq=seq, id=assignment_id,
+            op="upsert" if assignment_id in assignments else "delete",
+            assignment=assignments.get(assignment_id)
+        )
+        for assignment_id, seq in latest.items()
+    ]
+    return schemas.AssignmentChangesResponse(changes=changes, cursor=cursor, has_more=has_more, reset=reset)
+
 @app.get("/assignment/all", response_model=List[schemas.AssignmentResponse])
 def get_all_assignments(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     """Get all assignments"""
@@ -314,7 +479,9 @@ def get_all_assignments(skip: int = 0, limit: int = 100, db: Session = Depends(g
 @app.get("/analytics/overview", response_model=schemas.AnalyticsOverview)
 def get_analytics_overview(db: Session = Depends(get_db)):
     """Get overall analytics and metrics"""
-    total_workers = db.query(models.Worker).count()
+    snapshot = feature_store.snapshot(db)
+    workers = snapshot.workers
+    total_workers = len(workers)
     total_roles = db.query(models.Role).count()
     total_assignments = db.query(models.Assignment).count()
     
@@ -328,14 +495,14 @@ def get_analytics_overview(db: Session = Depends(get_db)):
         avg_fit_score = 0
         success_rate = 0
     
-    workers = db.query(models.Worker).all()
+    fatigue = snapshot.fatigue_level
     workers_by_fatigue = {
-        "low": sum(1 for w in workers if w.fatigue_level < 0.3),
-        "medium": sum(1 for w in workers if 0.3 <= w.fatigue_level < 0.7),
-        "high": sum(1 for w in workers if w.fatigue_level >= 0.7)
+        "low": int(np.count_nonzero(fatigue < 0.3)),
+        "medium": int(np.count_nonzero((fatigue >= 0.3) & (fatigue < 0.7))),
+        "high": int(np.count_nonzero(fatigue >= 0.7))
     }
     
-    top_performers = sorted(workers, key=lambda w: w.performance_score, reverse=True)[:5]
+    top_performers = [workers[i] for i in top_k_indices(snapshot.performance_score, 5)]
     top_performers_list = [
         {"id": w.id, "name": w.name, "performance_score": w.performance_score}
         for w in top_performers
@@ -368,24 +535,24 @@ def get_analytics_overview(db: Session = Depends(get_db)):
 @app.get("/analytics/skill-gap", response_model=schemas.SkillGapAnalysis)
 def get_skill_gap_analysis(db: Session = Depends(get_db)):
     """Analyze skill gaps and recommend training"""
-    workers = db.query(models.Worker).all()
+    workers = feature_store.workers(db)
     roles = db.query(models.Role).all()
     
     # Collect all required skills across roles
-    all_required_skills = set()
     skill_demand = {}
     for role in roles:
         for skill in role.required_skills:
-            all_required_skills.add(skill)
             skill_demand[skill] = skill_demand.get(skill, 0) + 1
+    required_mask = skill_vocab.mask(skill_demand)
     
     # Find workers who need training
     workers_needing_training = []
     for worker in workers:
-        worker_skills = set(worker.skills)
-        missing_skills = all_required_skills - worker_skills
+        missing_mask = required_mask & ~worker.skill_mask
         
-        if missing_skills:
+        if missing_mask:
+            missing_skills = skill_vocab.skills_in(missing_mask)
+            
             # Prioritize based on performance and current workload
             if worker.performance_score > 0.7 and worker.hours_per_week < 48:
                 priority = "High"
@@ -463,6 +630,15 @@ def health_check():
 
 # ==================== TASK ENDPOINTS ====================
 
+def _publish_task_event(event_type: str, task: models.Task):
+    """Push a task change to its worker and to supervisors"""
+    event = {"type": event_type, "worker_id": task.worker_id}
+    if event_type == "task.deleted":
+        event["task_id"] = task.id
+    else:
+        event["task"] = schemas.TaskResponse.model_validate(task).model_dump(mode="json")
+    event_hub.publish([worker_channel(task.worker_id), SUPERVISOR_CHANNEL], event)
+
 @app.post("/task/create", response_model=schemas.TaskResponse, status_code=status.HTTP_201_CREATED)
 def create_task(task: schemas.TaskCreate, db: Session = Depends(get_db)):
     """Create a new task and assign it to a worker"""
@@ -475,6 +651,7 @@ def create_task(task: schemas.TaskCreate, db: Session = Depends(get_db)):
     db.add(db_task)
     db.commit()
     db.refresh(db_task)
+    _publish_task_event("task.created", db_task)
     return db_task
 
 @app.get("/task/worker/{worker_id}", response_model=List[schemas.TaskResponse])
@@ -491,27 +668,26 @@ def get_worker_tasks(worker_id: int, status: str = None, db: Session = Depends(g
 @app.get("/task/worker/{worker_id}/notifications")
 def get_worker_task_notifications(worker_id: int, db: Session = Depends(get_db)):
     """Get task notifications with worker and role details for mobile app"""
-    tasks = db.query(models.Task).filter(
+    # All tasks belong to the same worker, so load it once
+    worker = db.query(models.Worker).filter(models.Worker.id == worker_id).first()
+    worker_name = worker.name if worker else f"Worker {worker_id}"
+    
+    # Tasks and their role names in a single joined query
+    rows = db.query(models.Task, models.Role.name).outerjoin(
+        models.Role, models.Role.id == models.Task.role_id
+    ).filter(
         models.Task.worker_id == worker_id,
         models.Task.status.in_(['pending', 'in_progress'])
     ).order_by(models.Task.created_at.desc()).all()
     
+    now = datetime.utcnow()
     notifications = []
-    for task in tasks:
-        # Get worker details
-        worker = db.query(models.Worker).filter(models.Worker.id == task.worker_id).first()
-        
-        # Get role details if role_id exists
-        role_name = None
-        if task.role_id:
-            role = db.query(models.Role).filter(models.Role.id == task.role_id).first()
-            role_name = role.name if role else None
-        
+    for task, role_name in rows:
         notification = {
             "id": task.id,
             "task_id": task.id,
             "worker_id": task.worker_id,
-            "worker_name": worker.name if worker else f"Worker {task.worker_id}",
+            "worker_name": worker_name,
             "role_id": task.role_id,
             "role_name": role_name or "No specific role",
             "title": task.title,
@@ -521,7 +697,7 @@ def get_worker_task_notifications(worker_id: int, db: Session = Depends(get_db))
             "assigned_by": task.assigned_by,
             "due_date": task.due_date,
             "created_at": task.created_at,
-            "is_new": (datetime.utcnow() - task.created_at).total_seconds() < 3600  # New if less than 1 hour old
+            "is_new": (now - task.created_at).total_seconds() < 3600  # New if less than 1 hour old
         }
         notifications.append(notification)
     
@@ -533,6 +709,31 @@ def get_all_tasks(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)
     tasks = db.query(models.Task).order_by(models.Task.created_at.desc()).offset(skip).limit(limit).all()
     return tasks
 
+@app.get("/task/changes", response_model=schemas.TaskChangesResponse)
+def get_task_changes(
+    since: int = Query(0, ge=0),
+    worker_id: Optional[int] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db)
+):
+    """Tasks created, updated or deleted after the since cursor (delta sync; since=0 is a full sync)"""
+    latest, cursor, has_more, reset = change_log.changes(db, 'task', since, limit, worker_id)
+    tasks = {}
+    if latest:
+        query = db.query(models.Task).filter(models.Task.id.in_(list(latest)))
+        if worker_id is not None:
+            query = query.filter(models.Task.worker_id == worker_id)  # reassigned away: tombstone
+        tasks = {t.id: t for t in query.all()}
+    changes = [
+        schemas.TaskChange(
+            seq=seq, id=task_id,
+            op="upsert" if task_id in tasks else "delete",
+            task=tasks.get(task_id)
+        )
+        for task_id, seq in latest.items()
+    ]
+    return schemas.TaskChangesResponse(changes=changes, cursor=cursor, has_more=has_more, reset=reset)
+
 @app.get("/task/{task_id}", response_model=schemas.TaskResponse)
 def get_task(task_id: int, db: Session = Depends(get_db)):
     """Get a specific task by ID"""
@@ -559,6 +760,7 @@ def update_task(task_id: int, task_update: schemas.TaskUpdate, db: Session = Dep
     
     db.commit()
     db.refresh(task)
+    _publish_task_event("task.updated", task)
     return task
 
 @app.delete("/task/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -570,96 +772,307 @@ def delete_task(task_id: int, db: Session = Depends(get_db)):
     
     db.delete(task)
     db.commit()
+    _publish_task_event("task.deleted", task)
     return None
 
+# ==================== REAL-TIME EVENTS (WEBSOCKET) ====================
+
+async def _stream_events(websocket: WebSocket, channels: List[str]):
+    """Forward hub events on channels to the socket until the client goes away (pings every 30s when idle)"""
+    await websocket.accept()
+    with event_hub.subscribe(channels) as queue:
+        await websocket.send_json({"type": "subscribed", "channels": channels})
+        # Clients never need to send anything; reading only notices the disconnect
+        receiver = asyncio.ensure_future(websocket.receive())
+        try:
+            while True:
+                getter = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait({receiver, getter}, timeout=30, return_when=asyncio.FIRST_COMPLETED)
+                if receiver in done:
+                    getter.cancel()
+                    message = receiver.result()
+                    if message["type"] == "websocket.disconnect":
+                        return
+                    receiver = asyncio.ensure_future(websocket.receive())
+                if getter in done:
+                    await websocket.send_text(getter.result())
+                elif not done:
+                    getter.cancel()
+                    await websocket.send_json({"type": "ping"})
+        except (WebSocketDisconnect, RuntimeError):
+            pass
+        finally:
+            receiver.cancel()
+
+@app.websocket("/ws/worker/{worker_id}")
+async def worker_events(websocket: WebSocket, worker_id: int):
+    """Task and assignment changes of one worker (mobile app)"""
+    await _stream_events(websocket, [worker_channel(worker_id)])
+
+@app.websocket("/ws/supervisor")
+async def supervisor_events(websocket: WebSocket):
+    """Task and assignment changes of every worker (supervisor dashboard)"""
+    await _stream_events(websocket, [SUPERVISOR_CHANNEL])
+
 # ==================== WEARABLE DEVICE / HEALTH ENDPOINTS ====================
 
 @app.post("/health/metric", response_model=schemas.HealthMetricResponse, status_code=status.HTTP_201_CREATED)
 def create_health_metric(metric: schemas.HealthMetricCreate, db: Session = Depends(get_db)):
     """Receive health data from wearable device"""
+    if HEALTH_INGEST_MODE == "buffered":
+        if feature_store.get(db, metric.worker_id) is None:
+            raise HTTPException(status_code=404, detail="Worker not found")
+        _queue_health_metrics([metric.dict()])
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={"status": "queued", "worker_id": metric.worker_id}
+        )
+    
     # Verify worker exists
     worker = db.query(models.Worker).filter(models.Worker.id == metric.worker_id).first()
     if not worker:
         raise HTTPException(status_code=404, detail="Worker not found")
     
-    db_metric = models.HealthMetric(**metric.dict())
-    db.add(db_metric)
-    db.commit()
-    db.refresh(db_metric)
-    return db_metric
+    return health_ingest.ingest(db, [metric.dict()])[0]
+
+def _queue_health_metrics(rows: List[dict]):
+    """Hand rows to the write-behind buffer, or 429 when it is full"""
+    if not health_buffer.submit(rows):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Health metric queue is full, retry later",
+            headers={"Retry-After": str(max(1, round(health_buffer.flush_seconds)))}
+        )
+
+def _ingest_health_batch(db: Session, rows: List[dict], start: float, invalid: dict = None):
+    """
+    Shared body of the bulk endpoints: store (or queue) rows of known workers and report every row
+    invalid maps row index -> error for rows the decoder already rejected
+    """
+    invalid = invalid or {}
+    buffered = HEALTH_INGEST_MODE == "buffered"
+    
+    # One IN query for every worker referenced by the batch (buffered mode checks the feature store)
+    worker_ids = {row['worker_id'] for row in rows}
+    if buffered:
+        known_ids = {worker_id for worker_id in worker_ids if feature_store.get(db, worker_id) is not None}
+    else:
+        known_ids = health_ingest.known_worker_ids(db, worker_ids)
+    
+    results = []
+    accepted = []
+    for index, row in enumerate(rows):
+        error = invalid.get(index)
+        if error is None and row['worker_id'] not in known_ids:
+            error = "Worker not found"
+        if error is None:
+            accepted.append(row)
+            results.append(schemas.HealthMetricBulkResult(
+                index=index, worker_id=row['worker_id'], status="queued" if buffered else "created"
+            ))
+        else:
+            results.append(schemas.HealthMetricBulkResult(
+                index=index, worker_id=row['worker_id'], status="rejected", error=error
+            ))
+    
+    if buffered:
+        if accepted:
+            _queue_health_metrics(accepted)
+    else:
+        stored = iter(health_ingest.ingest(db, accepted))
+        for result in results:
+            if result.status == "created":
+                result.id = next(stored)['id']
+    
+    elapsed = time.perf_counter() - start
+    response = schemas.HealthMetricBulkResponse(
+        received=len(rows),
+        inserted=len(accepted),
+        rejected=len(rows) - len(accepted),
+        elapsed_ms=round(elapsed * 1000, 2),
+        rows_per_second=round(len(accepted) / elapsed, 1) if elapsed > 0 else 0.0,
+        results=results
+    )
+    if buffered:
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=response.model_dump())
+    return response
+
+@app.post("/health/metrics/bulk", response_model=schemas.HealthMetricBulkResponse, status_code=status.HTTP_201_CREATED)
+def create_health_metrics_bulk(metrics: List[schemas.HealthMetricCreate], db: Session = Depends(get_db)):
+    """Receive a batch of health samples (possibly from many devices) in one transaction"""
+    start = time.perf_counter()
+    return _ingest_health_batch(db, [metric.dict() for metric in metrics], start)
+
+async def _raw_body(request: Request) -> bytes:
+    """Request body as-is (FastAPI would try to parse a JSON-labelled body before the content type is checked)"""
+    return await request.body()
+
+@app.post(
+    "/health/metrics/binary",
+    response_model=schemas.HealthMetricBulkResponse,
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra={"requestBody": {"required": True, "content": {
+        health_wire.CONTENT_TYPE: {"schema": {"type": "string", "format": "binary"}}
+    }}}
+)
+def create_health_metrics_binary(
+    payload: bytes = Depends(_raw_body),
+    content_type: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Same as /health/metrics/bulk for packed binary records (see health_wire.py)"""
+    start = time.perf_counter()
+    if (content_type or "").split(";")[0].strip() != health_wire.CONTENT_TYPE:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Content-Type must be {health_wire.CONTENT_TYPE}"
+        )
+    try:
+        rows, invalid = health_wire.decode(payload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _ingest_health_batch(db, rows, start, invalid)
+
+@app.get("/health/ingest/stats")
+def get_health_ingest_stats():
+    """Ingestion mode and write-behind buffer counters (queued, flushed, dropped, failed, pending)"""
+    return {"mode": HEALTH_INGEST_MODE, "buffer_running": health_buffer.running, **health_buffer.stats()}
+
+@app.post("/health/archive/run")
+def run_health_archive(
+    older_than_days: Optional[int] = Query(None, ge=0),
+    db: Session = Depends(get_db)
+):
+    """Move raw health metrics older than the retention period to the Parquet archive (rollups are kept)"""
+    try:
+        return health_archive.run(db, retention_days=older_than_days)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
 
 @app.get("/health/worker/{worker_id}", response_model=List[schemas.HealthMetricResponse])
-def get_worker_health_metrics(worker_id: int, limit: int = 10, db: Session = Depends(get_db)):
-    """Get recent health metrics for a specific worker"""
-    metrics = db.query(models.HealthMetric).filter(
-        models.HealthMetric.worker_id == worker_id
-    ).order_by(models.HealthMetric.recorded_at.desc()).limit(limit).all()
+def get_worker_health_metrics(
+    worker_id: int,
+    limit: int = 10,
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    db: Session = Depends(get_db)
+):
+    """Get recent health metrics for a specific worker, newest first (archived rows included when 'from' is past retention)"""
+    start, end = utc_naive(start), utc_naive(end)
+    query = db.query(models.HealthMetric).filter(models.HealthMetric.worker_id == worker_id)
+    if start:
+        query = query.filter(models.HealthMetric.recorded_at >= start)
+    if end:
+        query = query.filter(models.HealthMetric.recorded_at < end)
+    metrics = query.order_by(models.HealthMetric.recorded_at.desc()).limit(limit).all()
+    
+    # Only an explicit historical range reads the archive; "latest N" never touches the files
+    if len(metrics) < limit and start is not None and start < retention_cutoff():
+        try:
+            archived = health_archive.read(worker_id, start, end)
+        except RuntimeError as e:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+        if archived:
+            merged = {row["id"]: CachedHealthMetric(row) for row in archived}
+            merged.update((m.id, m) for m in metrics)
+            metrics = sorted(
+                merged.values(), key=lambda m: (utc_naive(m.recorded_at), m.id), reverse=True
+            )[:limit]
     return metrics
 
 @app.get("/health/worker/{worker_id}/latest", response_model=schemas.HealthMetricResponse)
 def get_worker_latest_health(worker_id: int, db: Session = Depends(get_db)):
-    """Get latest health metric for a worker"""
-    metric = db.query(models.HealthMetric).filter(
-        models.HealthMetric.worker_id == worker_id
-    ).order_by(models.HealthMetric.recorded_at.desc()).first()
+    """Get latest health metric for a worker (served from the latest-vitals cache)"""
+    metric = latest_vitals.get(db, worker_id)
     
     if not metric:
         raise HTTPException(status_code=404, detail="No health data found for this worker")
     return metric
 
-@app.get("/health/worker/{worker_id}/summary", response_model=schemas.WorkerHealthSummary)
-def get_worker_health_summary(worker_id: int, db: Session = Depends(get_db)):
-    """Get comprehensive health summary for a worker"""
-    worker = db.query(models.Worker).filter(models.Worker.id == worker_id).first()
-    if not worker:
-        raise HTTPException(status_code=404, detail="Worker not found")
+def _session_hours(db: Session, worker_id: int = None) -> dict:
+    """
+    Hours worked per worker in one grouped query, keyed by worker_id
+    Returns today/week/month hour totals plus today's closed session count and longest shift
+    """
+    today_start = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    tomorrow_start = today_start + timedelta(days=1)
+    week_start = today_start - timedelta(days=today_start.weekday())
+    month_start = today_start.replace(day=1)
+    
+    # Range predicates on clock_in (instead of func.date) so the (worker_id, clock_in) index applies
+    clock_in = models.WorkSession.clock_in
+    hours = func.coalesce(models.WorkSession.total_hours, 0)
+    is_today = (clock_in >= today_start) & (clock_in < tomorrow_start)
+    is_closed_today = is_today & models.WorkSession.clock_out.isnot(None)
+    
+    query = db.query(
+        models.WorkSession.worker_id,
+        func.sum(case((is_today, hours), else_=0)).label('today'),
+        func.sum(case((clock_in >= week_start, hours), else_=0)).label('week'),
+        func.sum(case((clock_in >= month_start, hours), else_=0)).label('month'),
+        func.sum(case((is_closed_today, 1), else_=0)).label('sessions_today'),
+        func.max(case((is_closed_today, models.WorkSession.total_hours), else_=None)).label('longest_today')
+    ).filter(clock_in >= min(week_start, month_start))
+    if worker_id is not None:
+        query = query.filter(models.WorkSession.worker_id == worker_id)
     
-    # Get latest health metric
-    latest_metric = db.query(models.HealthMetric).filter(
-        models.HealthMetric.worker_id == worker_id
-    ).order_by(models.HealthMetric.recorded_at.desc()).first()
-    
-    # Calculate hours worked today and this week
-    today = datetime.utcnow().date()
-    week_start = today - timedelta(days=today.weekday())
-    
-    today_sessions = db.query(models.WorkSession).filter(
-        models.WorkSession.worker_id == worker_id,
-        func.date(models.WorkSession.clock_in) == today
-    ).all()
-    
-    week_sessions = db.query(models.WorkSession).filter(
-        models.WorkSession.worker_id == worker_id,
-        func.date(models.WorkSession.clock_in) >= week_start
-    ).all()
-    
-    hours_today = sum(s.total_hours or 0 for s in today_sessions)
-    hours_week = sum(s.total_hours or 0 for s in week_sessions)
+    return {
+        row.worker_id: {
+            'today': float(row.today or 0),
+            'week': float(row.week or 0),
+            'month': float(row.month or 0),
+            'sessions_today': int(row.sessions_today or 0),
+            'longest_today': float(row.longest_today or 0)
+        }
+        for row in query.group_by(models.WorkSession.worker_id).all()
+    }
+
+@app.get("/health/worker/{worker_id}/series", response_model=schemas.HealthSeriesResponse)
+def get_worker_health_series(
+    worker_id: int,
+    bucket: str = Query("1h", pattern="^(1m|1h|1d)$"),
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    db: Session = Depends(get_db)
+):
+    """Vitals time series from the rollup tables (min/max/mean per bucket), oldest first"""
+    if feature_store.get(db, worker_id) is None:
+        raise HTTPException(status_code=404, detail="Worker not found")
     
-    # Determine health status and alerts
-    health_status = "Good"
-    alerts = []
+    # Rollup buckets are naive UTC; a "Z" or offset in the query string must not mix with utcnow()
+    end = utc_naive(end) or datetime.utcnow()
+    start = utc_naive(start) or end - DEFAULT_SPAN[bucket]
+    if start >= end:
+        raise HTTPException(status_code=400, detail="'from' must be before 'to'")
+    
+    points = []
+    for rollup in health_rollups.series(db, worker_id, bucket, start, end):
+        vitals = {}
+        for vital in VITALS:
+            count = getattr(rollup, f'{vital}_count')
+            vitals[vital] = schemas.VitalStats(
+                min=getattr(rollup, f'{vital}_min'),
+                max=getattr(rollup, f'{vital}_max'),
+                mean=round(getattr(rollup, f'{vital}_sum') / count, 2) if count else None,
+                count=count
+            )
+        points.append(schemas.HealthSeriesPoint(
+            bucket_start=rollup.bucket_start,
+            samples=rollup.sample_count,
+            steps_count=rollup.steps_count_last,
+            calories_burned=rollup.calories_burned_last,
+            **vitals
+        ))
     
-    if latest_metric:
-        if latest_metric.heart_rate and latest_metric.heart_rate > 100:
-            health_status = "Warning"
-            alerts.append(f"Elevated heart rate: {latest_metric.heart_rate} bpm")
-        
-        if latest_metric.oxygen_level and latest_metric.oxygen_level < 95:
-            health_status = "Warning"
-            alerts.append(f"Low oxygen level: {latest_metric.oxygen_level}%")
-        
-        if latest_metric.stress_level and latest_metric.stress_level > 70:
-            health_status = "Warning"
-            alerts.append(f"High stress level: {latest_metric.stress_level}%")
-        
-        if latest_metric.fatigue_score and latest_metric.fatigue_score > 70:
-            health_status = "Warning"
-            alerts.append(f"High fatigue: {latest_metric.fatigue_score}%")
-        
-        if latest_metric.body_temperature and (latest_metric.body_temperature > 38.0 or latest_metric.body_temperature < 36.0):
-            health_status = "Critical"
-            alerts.append(f"Abnormal temperature: {latest_metric.body_temperature}°C")
+    return schemas.HealthSeriesResponse(worker_id=worker_id, bucket=bucket, start=start, end=end, points=points)
+
+def _evaluate_health_alerts(worker_state, hours_today: float, hours_week: float):
+    """
+    Combine the ingest-time rule status of one worker with its hours alerts. Returns (health_status, alerts)
+    Metric rules are evaluated once per sample by health_rules; only the hours checks run on read.
+    """
+    health_status = worker_state.health_status if worker_state else "Good"
+    alerts = [alert["message"] for alert in worker_state.alerts] if worker_state else []
     
     if hours_today > 8:
         alerts.append(f"Overtime today: {hours_today:.1f} hours")
@@ -667,9 +1080,16 @@ def get_worker_health_summary(worker_id: int, db: Session = Depends(get_db)):
     if hours_week > 45:
         alerts.append(f"High weekly hours: {hours_week:.1f} hours")
     
+    return health_status, alerts
+
+def _build_health_summary(worker_id: int, worker_name: str, latest_metric, worker_state, hours: dict) -> schemas.WorkerHealthSummary:
+    hours_today = hours.get('today', 0)
+    hours_week = hours.get('week', 0)
+    health_status, alerts = _evaluate_health_alerts(worker_state, hours_today, hours_week)
+    
     return schemas.WorkerHealthSummary(
         worker_id=worker_id,
-        worker_name=worker.name,
+        worker_name=worker_name,
         latest_heart_rate=latest_metric.heart_rate if latest_metric else None,
         latest_oxygen_level=latest_metric.oxygen_level if latest_metric else None,
         latest_stress_level=latest_metric.stress_level if latest_metric else None,
@@ -682,19 +1102,38 @@ def get_worker_health_summary(worker_id: int, db: Session = Depends(get_db)):
         last_updated=latest_metric.recorded_at if latest_metric else datetime.utcnow()
     )
 
+@app.get("/health/worker/{worker_id}/summary", response_model=schemas.WorkerHealthSummary)
+def get_worker_health_summary(worker_id: int, db: Session = Depends(get_db)):
+    """Get comprehensive health summary for a worker"""
+    worker = db.query(models.Worker).filter(models.Worker.id == worker_id).first()
+    if not worker:
+        raise HTTPException(status_code=404, detail="Worker not found")
+    
+    # Get latest health metric
+    latest_metric = latest_vitals.get(db, worker_id)
+    
+    # Calculate hours worked today and this week
+    hours = _session_hours(db, worker_id).get(worker_id, {})
+    
+    return _build_health_summary(worker_id, worker.name, latest_metric, health_rules.get(db, worker_id), hours)
+
 @app.get("/health/dashboard")
 def get_health_dashboard(db: Session = Depends(get_db)):
     """Get health dashboard for all workers (for supervisor)"""
-    workers = db.query(models.Worker).all()
-    worker_summaries = []
-    
-    for worker in workers:
-        try:
-            summary = get_worker_health_summary(worker.id, db)
-            worker_summaries.append(summary.dict())
-        except:
-            # Skip workers with no data
-            pass
+    workers = feature_store.workers(db)
+    
+    # Latest metrics and alert statuses come from memory; hours are one grouped query for the whole roster
+    latest_metrics = latest_vitals.all(db)
+    worker_states = health_rules.all(db)
+    session_hours = _session_hours(db)
+    
+    worker_summaries = [
+        _build_health_summary(
+            worker.id, worker.name, latest_metrics.get(worker.id), worker_states.get(worker.id),
+            session_hours.get(worker.id, {})
+        ).dict()
+        for worker in workers
+    ]
     
     # Calculate overall statistics
     total_workers = len(worker_summaries)
@@ -719,6 +1158,22 @@ def get_health_dashboard(db: Session = Depends(get_db)):
         }
     }
 
+@app.get("/health/alerts/active", response_model=List[schemas.ActiveHealthAlerts])
+def get_active_health_alerts(db: Session = Depends(get_db)):
+    """Workers with active metric alerts, most severe first (evaluated at ingest, no metric scan)"""
+    active = []
+    for state in health_rules.active(db):
+        worker = feature_store.get(db, state.worker_id)
+        active.append(schemas.ActiveHealthAlerts(
+            worker_id=state.worker_id,
+            worker_name=worker.name if worker else "Unknown",
+            health_status=state.health_status,
+            alerts=state.alerts,
+            metric_id=state.metric_id,
+            evaluated_at=state.evaluated_at
+        ))
+    return active
+
 # ==================== WORK SESSION ENDPOINTS ====================
 
 @app.post("/session/clock-in", response_model=schemas.WorkSessionResponse, status_code=status.HTTP_201_CREATED)
@@ -771,6 +1226,13 @@ def clock_out(session_id: int, session_update: schemas.WorkSessionUpdate, db: Se
     
     db.commit()
     db.refresh(session)
+    
+    # Shift length feeds the worker's fatigue estimate
+    try:
+        fatigue_estimator.on_session_closed(db, session)
+    except Exception as e:
+        print(f"[FATIGUE] Failed to update fatigue for worker {session.worker_id}: {e}")
+        db.rollback()
     return session
 
 @app.get("/session/worker/{worker_id}", response_model=List[schemas.WorkSessionResponse])
@@ -793,48 +1255,18 @@ def get_active_session(worker_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="No active session found")
     return session
 
-@app.get("/session/worker/{worker_id}/hours", response_model=schemas.WorkerHoursReport)
-def get_worker_hours_report(worker_id: int, db: Session = Depends(get_db)):
-    """Get detailed hours worked report for a worker"""
-    worker = db.query(models.Worker).filter(models.Worker.id == worker_id).first()
-    if not worker:
-        raise HTTPException(status_code=404, detail="Worker not found")
-    
-    today = datetime.utcnow().date()
-    week_start = today - timedelta(days=today.weekday())
-    month_start = today.replace(day=1)
-    
-    # Query sessions
-    today_sessions = db.query(models.WorkSession).filter(
-        models.WorkSession.worker_id == worker_id,
-        func.date(models.WorkSession.clock_in) == today,
-        models.WorkSession.clock_out != None
-    ).all()
-    
-    week_sessions = db.query(models.WorkSession).filter(
-        models.WorkSession.worker_id == worker_id,
-        func.date(models.WorkSession.clock_in) >= week_start,
-        models.WorkSession.clock_out != None
-    ).all()
-    
-    month_sessions = db.query(models.WorkSession).filter(
-        models.WorkSession.worker_id == worker_id,
-        func.date(models.WorkSession.clock_in) >= month_start,
-        models.WorkSession.clock_out != None
-    ).all()
-    
-    # Calculate hours
-    today_hours = sum(s.total_hours or 0 for s in today_sessions)
-    week_hours = sum(s.total_hours or 0 for s in week_sessions)
-    month_hours = sum(s.total_hours or 0 for s in month_sessions)
+def _build_hours_report(worker_id: int, worker_name: str, hours: dict) -> schemas.WorkerHoursReport:
+    today_hours = hours.get('today', 0)
+    week_hours = hours.get('week', 0)
+    month_hours = hours.get('month', 0)
     
     # Calculate overtime (over 8 hours/day or 40 hours/week)
     overtime_hours = max(0, week_hours - 40)
     
     # Other statistics
-    sessions_today = len(today_sessions)
+    sessions_today = hours.get('sessions_today', 0)
     avg_session = (today_hours / sessions_today) if sessions_today > 0 else 0
-    longest_shift = max([s.total_hours for s in today_sessions], default=0)
+    longest_shift = hours.get('longest_today', 0)
     
     # Determine status
     status_text = "Normal"
@@ -845,7 +1277,7 @@ def get_worker_hours_report(worker_id: int, db: Session = Depends(get_db)):
     
     return schemas.WorkerHoursReport(
         worker_id=worker_id,
-        worker_name=worker.name,
+        worker_name=worker_name,
         today_hours=round(today_hours, 2),
         week_hours=round(week_hours, 2),
         month_hours=round(month_hours, 2),
@@ -856,18 +1288,27 @@ def get_worker_hours_report(worker_id: int, db: Session = Depends(get_db)):
         status=status_text
     )
 
+@app.get("/session/worker/{worker_id}/hours", response_model=schemas.WorkerHoursReport)
+def get_worker_hours_report(worker_id: int, db: Session = Depends(get_db)):
+    """Get detailed hours worked report for a worker"""
+    worker = db.query(models.Worker).filter(models.Worker.id == worker_id).first()
+    if not worker:
+        raise HTTPException(status_code=404, detail="Worker not found")
+    
+    hours = _session_hours(db, worker_id).get(worker_id, {})
+    return _build_hours_report(worker_id, worker.name, hours)
+
 @app.get("/session/all/hours")
 def get_all_workers_hours(db: Session = Depends(get_db)):
     """Get hours worked report for all workers (for supervisor dashboard)"""
-    workers = db.query(models.Worker).all()
-    reports = []
+    workers = feature_store.workers(db)
     
-    for worker in workers:
-        try:
-            report = get_worker_hours_report(worker.id, db)
-            reports.append(report.dict())
-        except:
-            pass
+    # One grouped aggregate for the whole roster
+    session_hours = _session_hours(db)
+    reports = [
+        _build_hours_report(worker.id, worker.name, session_hours.get(worker.id, {})).dict()
+        for worker in workers
+    ]
     
     return {"workers": reports, "total_workers": len(reports)}
 
@@ -917,68 +1358,72 @@ def load_chatbot_model():
 
 # ==================== DYNAMIC ML TRAINING ENDPOINTS ====================
 
-@app.post("/ml/train")
+@app.post("/ml/train", status_code=status.HTTP_202_ACCEPTED)
 def train_ml_model(incremental: bool = True, db: Session = Depends(get_db)):
-    """Train or update ML model with latest data"""
+    """Train or update ML model with latest data (background job, poll /ml/jobs/{job_id})"""
+    if _labeled_assignment_count(db) < 5:
+        raise HTTPException(
+            status_code=400, 
+            detail="Need at least 5 completed assignments to train model"
+        )
+    
+    job = training_jobs.submit("ml-train", incremental=incremental, min_samples=5)
+    return {
+        "success": True,
+        "job_id": job.id,
+        "status_url": f"/ml/jobs/{job.id}",
+        "message": "Model training started"
+    }
+
+@app.get("/ml/jobs")
+def list_training_jobs():
+    """Recent training jobs, newest first"""
+    return [job.to_dict() for job in training_jobs.list()]
+
+@app.get("/ml/jobs/{job_id}")
+def get_training_job(job_id: str):
+    """State, elapsed time and metrics of a training job"""
+    job = training_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Training job not found")
+    return job.to_dict()
+
+@app.get("/ml/models")
+def list_model_versions():
+    """Registered model versions (newest first) with metrics, watermark and feature schema"""
+    return model_registry.list()
+
+@app.get("/ml/models/{version}")
+def get_model_version(version: int):
+    """Metrics, watermark and feature schema of one model version"""
     try:
-        # Get all data
-        workers = db.query(models.Worker).all()
-        roles = db.query(models.Role).all()
-        assignments = db.query(models.Assignment).filter(
-            models.Assignment.success != None
-        ).all()
-        
-        if len(assignments) < 5:
-            raise HTTPException(
-                status_code=400, 
-                detail="Need at least 5 completed assignments to train model"
-            )
-        
-        # Convert to dicts
-        workers_data = [
-            {
-                'id': w.id, 
-                'skills': w.skills, 
-                'experience': w.experience,
-                'performance_score': w.performance_score,
-                'fatigue_level': w.fatigue_level,
-                'age': w.age
-            } for w in workers
-        ]
-        
-        roles_data = [
-            {
-                'id': r.id,
-                'required_skills': r.required_skills,
-                'difficulty_level': r.difficulty_level
-            } for r in roles
-        ]
-        
-        assignments_data = [
-            {
-                'worker_id': a.worker_id,
-                'role_id': a.role_id,
-                'success': a.success
-            } for a in assignments
-        ]
-        
-        # Prepare training data
-        X, y = ml_model.prepare_training_data(assignments_data, workers_data, roles_data)
-        
-        # Train
-        results = ml_model.train(X, y, incremental=incremental)
-        
-        # Save model
-        ml_model.save()
-        
-        return {
-            "success": True,
-            "details": results,
-            "message": f"Model trained successfully with {len(assignments)} assignments"
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Training error: {str(e)}")
+        info = model_registry.info(version)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Model version {version} not found")
+    info['current'] = version == model_registry.pointer()['version']
+    return info
+
+@app.post("/ml/models/rollback")
+def rollback_model():
+    """Serve the previously promoted model version again"""
+    try:
+        pointer = model_registry.rollback()
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Model version {e.args[0]} not found")
+    return {"success": True, "current": pointer['version'], "history": pointer['history']}
+
+@app.post("/ml/models/{version}/promote")
+def promote_model(version: int):
+    """Serve this model version from now on (no restart; rollback returns to the one it replaces)"""
+    try:
+        pointer = model_registry.promote(version)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Model version {version} not found")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"success": True, "current": pointer['version'], "history": pointer['history']}
 
 @app.get("/ml/status")
 def get_ml_status(db: Session = Depends(get_db)):
@@ -987,9 +1432,14 @@ def get_ml_status(db: Session = Depends(get_db)):
         models.Assignment.success != None
     ).count()
     
+    model = ml_model.get()
     return {
-        "model_loaded": ml_model.model is not None,
+        "model_loaded": model.model is not None,
+        "model_version": ml_model.version,
         "training_data_available": assignment_count,
         "can_train": assignment_count >= 5,
-        "skills_tracked": len(ml_model.all_skills) if ml_model.all_skills else 0
+        "skills_tracked": len(model.all_skills) if model.all_skills else 0,
+        "feature_schema": model.feature_schema.to_dict() if model.feature_schema else None,
+        "watermark": model.watermark,
+        "training_jobs_active": training_jobs.active_count()
     }
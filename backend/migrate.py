@@ -0,0 +1,137 @@
+"""
+Repeatable schema migration
+Brings an existing database up to the current models: creates missing tables,
+adds missing columns and creates missing indexes, then backfills derived tables
+(health metric rollups, the task / assignment change log) that are still empty. Safe to run on every deploy.
+
+On PostgreSQL indexes are built with CREATE INDEX CONCURRENTLY, so ingest keeps
+writing to health_metrics / tasks while they build. This is a release step
+(Procfile release:, render.yaml preDeployCommand), not part of the web start,
+so a long index build never holds up or times out a server boot.
+
+Replaces the old one-off migrate_tasks.py / fix_database.py scripts.
+Usage: python migrate.py
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateIndex
+from database import engine, Base, SessionLocal
+import models
+from health_rollups import health_rollups
+import change_log
+
+def _add_missing_columns(inspector, table) -> int:
+    """ALTER TABLE ... ADD COLUMN for model columns the table does not have yet"""
+    existing = {col['name'] for col in inspector.get_columns(table.name)}
+    added = 0
+    
+    for column in table.columns:
+        if column.name in existing:
+            continue
+        
+        column_type = column.type.compile(dialect=engine.dialect)
+        ddl = f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'
+        
+        # Constant defaults are backfilled into existing rows
+        if column.default is not None and column.default.is_scalar:
+            default = column.default.arg
+            literal = str(default).upper() if isinstance(default, bool) else repr(default)
+            ddl += f' DEFAULT {literal}'
+        
+        with engine.begin() as conn:
+            conn.execute(text(ddl))
+        print(f"   + column {table.name}.{column.name} ({column_type})")
+        added += 1
+    
+    return added
+
+def _invalid_indexes() -> set:
+    """Indexes left INVALID by an interrupted CREATE INDEX CONCURRENTLY (PostgreSQL only)"""
+    if engine.dialect.name != 'postgresql':
+        return set()
+    with engine.connect() as conn:
+        return set(conn.execute(text(
+            "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE NOT i.indisvalid"
+        )).scalars())
+
+def _create_missing_indexes(inspector, table, invalid: set) -> int:
+    """CREATE INDEX for model indexes the table does not have yet (or only has as an invalid leftover)"""
+    existing = {index['name'] for index in inspector.get_indexes(table.name)} - invalid
+    created = 0
+    
+    for index in table.indexes:
+        if index.name in existing:
+            continue
+        if engine.dialect.name == 'postgresql':
+            # No write lock on the table; CONCURRENTLY cannot run inside a transaction
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                if index.name in invalid:
+                    conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{index.name}"'))
+                index.dialect_options['postgresql']['concurrently'] = True
+                conn.execute(CreateIndex(index, if_not_exists=True))
+        else:
+            index.create(bind=engine, checkfirst=True)
+        print(f"   + index {index.name}")
+        created += 1
+    
+    return created
+
+def _backfill_rollups() -> int:
+    """Build health_metric_rollups from raw metrics when the rollup table is still empty"""
+    db = SessionLocal()
+    try:
+        if db.query(models.HealthMetricRollup).first() is not None:
+            return 0
+        if db.query(models.HealthMetric.id).first() is None:
+            return 0
+        print("   + backfilling health_metric_rollups")
+        health_rollups.backfill(db)
+        return 1
+    finally:
+        db.close()
+
+def _backfill_change_log() -> int:
+    """Log tasks / assignments the change log has never seen (rows written before it existed or by scripts)"""
+    db = SessionLocal()
+    try:
+        added = change_log.backfill(db)
+        if added:
+            print(f"   + logged {added} existing tasks / assignments in change_log")
+        return 1 if added else 0
+    finally:
+        db.close()
+
+def migrate():
+    print("\n🔧 Migrating database schema...\n")
+    
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    
+    # New tables (with their indexes)
+    missing_tables = [t for t in Base.metadata.sorted_tables if t.name not in existing_tables]
+    if missing_tables:
+        Base.metadata.create_all(bind=engine, tables=missing_tables)
+        for table in missing_tables:
+            print(f"   + table {table.name}")
+    
+    # Columns and indexes on tables that already existed
+    inspector = inspect(engine)
+    invalid = _invalid_indexes()
+    changes = len(missing_tables)
+    for table in Base.metadata.sorted_tables:
+        if table in missing_tables:
+            continue
+        changes += _add_missing_columns(inspector, table)
+        changes += _create_missing_indexes(inspector, table, invalid)
+    
+    changes += _backfill_rollups()
+    changes += _backfill_change_log()
+    
+    if changes:
+        print(f"\n✅ Applied {changes} schema change(s)\n")
+    else:
+        print("✅ Schema is up to date\n")
+    
+    return changes
+
+if __name__ == "__main__":
+    migrate()
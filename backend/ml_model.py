@@ -8,95 +8,97 @@ from sklearn.metrics import mean_squared_error, r2_score
 import xgboost as xgb
 from typing import List, Tuple, Dict
 import json
+from types import SimpleNamespace
+import training_data
 
-MODEL_PATH = "models/fit_model.pkl"
+MODEL_PATH = "models/fit_model.ubj"  # XGBoost native (UBJSON) booster, schema in models/fit_model.meta.json
+LEGACY_MODEL_PATH = "models/fit_model.pkl"  # joblib pickle written by older versions, still loadable
 SCALER_PATH = "models/scaler.pkl"
+MODEL_FORMAT_VERSION = 2  # v2: watermark is a change_log seq (v1 stored a completed_at timestamp)
+
+XGB_PARAMS = dict(
+    n_estimators=100,
+    max_depth=5,
+    learning_rate=0.1,
+    random_state=42,
+    objective='reg:squarederror'
+)
+
+# Worker fields predict_batch fills in when a dict leaves them out or sets them to None
+WORKER_DEFAULTS = {
+    'id': 0, 'name': None, 'age': 25, 'experience': 0.0, 'skills': [], 'fatigue_level': 0.0,
+    'hours_per_day': 0.0, 'hours_per_week': 0.0, 'current_role': None, 'performance_score': 0.5,
+    'created_at': None
+}
+
+def meta_path(model_path: str) -> str:
+    """Sidecar JSON next to a booster file"""
+    return os.path.splitext(model_path)[0] + ".meta.json"
+
+def replace_file(path: str, write):
+    """write(tmp_path) then rename over path, so readers never see a half-written file"""
+    tmp_path = f"{path}.tmp-{os.getpid()}{os.path.splitext(path)[1]}"  # keep the extension, XGBoost picks the format from it
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores, best first
+    Only the winners are sorted; ties keep their input order like a stable sort
+    """
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=int)
+    
+    # k-th largest score splits the winners from the rest
+    kth_score = np.partition(scores, len(scores) - k)[len(scores) - k]
+    above = np.flatnonzero(scores > kth_score)
+    ties = np.flatnonzero(scores == kth_score)[:k - len(above)]
+    winners = np.concatenate([above, ties])
+    
+    order = np.lexsort((winners, -scores[winners]))
+    return winners[order]
 
 class SkillAssignmentModel:
     def __init__(self):
-        self.model = None
+        self.model = None  # xgb.Booster, scored with inplace_predict (no DMatrix, no sklearn wrapper)
         self.feature_names = None
         self.all_skills = set()
-        
-    def _extract_features(self, worker_data: dict, role_data: dict, all_skills: set) -> np.ndarray:
-        """
-        Extract features from worker and role data
-        Features:
-        - Worker experience
-        - Worker fatigue level
-        - Worker performance score
-        - Worker age (normalized)
-        - Role difficulty level
-        - Skill match count
-        - Skill match percentage
-        - One-hot encoded skills
-        """
-        features = []
-        
-        # Basic features
-        features.append(worker_data.get('experience', 0))
-        features.append(worker_data.get('fatigue_level', 0))
-        features.append(worker_data.get('performance_score', 0.5))
-        features.append(worker_data.get('age', 25) / 100.0)  # normalize age
-        features.append(role_data.get('difficulty_level', 0.5))
-        
-        # Skill matching features
-        worker_skills = set(worker_data.get('skills', []))
-        required_skills = set(role_data.get('required_skills', []))
-        
-        skill_match_count = len(worker_skills.intersection(required_skills))
-        skill_match_percentage = skill_match_count / len(required_skills) if required_skills else 0
-        
-        features.append(skill_match_count)
-        features.append(skill_match_percentage)
-        
-        # One-hot encode skills (top skills only to avoid explosion)
-        for skill in sorted(all_skills):
-            features.append(1 if skill in worker_skills else 0)
-        
-        return np.array(features)
+        self.feature_schema = None  # training_data.FeatureSchema the model was trained on
+        self.watermark = None  # change_log seq covering the assignments trained on
     
-    def prepare_training_data(self, assignments_data: List[dict], workers_data: List[dict], 
-                             roles_data: List[dict]) -> Tuple[np.ndarray, np.ndarray]:
+    def _set_schema(self, schema: 'training_data.FeatureSchema'):
+        self.feature_schema = schema
+        self.feature_names = schema.columns
+        self.all_skills = set(schema.skill_columns)
+    
+    def _adopt_skill_columns(self, skill_columns: List[str]):
+        """Schema for a full retrain on these skill columns"""
+        if self.feature_schema is None:
+            self._set_schema(training_data.FeatureSchema(skill_columns))
+        else:
+            self._set_schema(self.feature_schema.successor(skill_columns))
+    
+    def load_training_data(self, db, incremental: bool = False) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Prepare training data from historical assignments
+        Prepare training data straight from the DB (see training_data.py)
+        Full: every labeled assignment, skill columns re-picked (schema version bumps if they change)
+        Incremental (trained model with a watermark required): only assignments changed after
+        the watermark, in the model's own feature schema
         """
-        # Build lookup dictionaries
-        workers_dict = {w['id']: w for w in workers_data}
-        roles_dict = {r['id']: r for r in roles_data}
-        
-        # Collect all skills
-        self.all_skills = set()
-        for worker in workers_data:
-            self.all_skills.update(worker.get('skills', []))
-        for role in roles_data:
-            self.all_skills.update(role.get('required_skills', []))
-        
-        # Limit to top 20 skills to avoid feature explosion
-        skill_counts = {}
-        for worker in workers_data:
-            for skill in worker.get('skills', []):
-                skill_counts[skill] = skill_counts.get(skill, 0) + 1
-        
-        self.all_skills = set(sorted(skill_counts.keys(), key=lambda x: skill_counts[x], reverse=True)[:20])
-        
-        X = []
-        y = []
-        
-        for assignment in assignments_data:
-            worker_id = assignment.get('worker_id')
-            role_id = assignment.get('role_id')
-            success = assignment.get('success')
-            
-            if worker_id in workers_dict and role_id in roles_dict and success is not None:
-                worker = workers_dict[worker_id]
-                role = roles_dict[role_id]
-                
-                features = self._extract_features(worker, role, self.all_skills)
-                X.append(features)
-                y.append(1.0 if success else 0.0)
+        if incremental and self.can_train_incrementally():
+            X, y, _, self.watermark = training_data.load_training_data(
+                db, self.feature_schema.skill_columns, since=self.watermark, incremental=True
+            )
+            return X, y
         
-        return np.array(X), np.array(y)
+        X, y, skill_columns, self.watermark = training_data.load_training_data(db)
+        self._adopt_skill_columns(skill_columns)
+        return X, y
+    
+    def can_train_incrementally(self) -> bool:
+        """False for untrained models and models saved before the change_log watermark"""
+        return self.model is not None and self.feature_schema is not None and self.watermark is not None
     
     def train(self, X: np.ndarray, y: np.ndarray, incremental: bool = False) -> Dict:
         """
@@ -107,8 +109,13 @@ class SkillAssignmentModel:
         
         if incremental and self.model is not None:
             # Incremental training - warm start with existing model
+            n_features = self.model.num_features()
+            if X.shape[1] != n_features:
+                raise ValueError(f"Feature width {X.shape[1]} does not match the model's {n_features} features")
             print("[ML] Incremental training with new data...")
-            self.model.fit(X, y, xgb_model=self.model.get_booster())
+            regressor = xgb.XGBRegressor(**XGB_PARAMS)
+            regressor.fit(X, y, xgb_model=self.model)
+            self.model = regressor.get_booster()
             
             return {
                 'mode': 'incremental',
@@ -120,19 +127,13 @@ class SkillAssignmentModel:
             print("[ML] Full model training...")
             X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
             
-            # Train XGBoost model
-            self.model = xgb.XGBRegressor(
-                n_estimators=100,
-                max_depth=5,
-                learning_rate=0.1,
-                random_state=42,
-                objective='reg:squarederror'
-            )
-            
-            self.model.fit(X_train, y_train)
+            # Train XGBoost model; only the booster is kept
+            regressor = xgb.XGBRegressor(**XGB_PARAMS)
+            regressor.fit(X_train, y_train)
+            self.model = regressor.get_booster()
             
             # Evaluate
-            y_pred = self.model.predict(X_test)
+            y_pred = self.model.inplace_predict(X_test)
             mse = mean_squared_error(y_test, y_pred)
             r2 = r2_score(y_test, y_pred)
             
@@ -144,94 +145,196 @@ class SkillAssignmentModel:
                 'test_samples': len(X_test)
             }
     
-    def predict(self, worker_data: dict, role_data: dict) -> Tuple[float, float]:
+    def predict(self, worker, role) -> Tuple[float, float]:
         """
-        Predict fit score for a worker-role pair
+        Predict fit score for one worker-role pair
         Returns: (fit_score, confidence)
         """
+        fit_scores, confidences = self.predict_batch([worker], role)
+        return float(fit_scores[0]), float(confidences[0])
+    
+    def predict_batch(self, workers: List, role) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Predict fit scores for a list of workers against one role, for callers without a feature store
+        snapshot (scripts, chatbot). workers: Worker rows, CachedWorkers or dicts; role: Role row or dict
+        Builds the same snapshot arrays /predict-fit scores and delegates to score_batch
+        Returns: (fit_scores, confidences) arrays aligned with workers
+        """
+        from feature_store import CachedWorker, WorkerSnapshot  # feature_store does not import this module
+        
+        snapshot = WorkerSnapshot([
+            CachedWorker(SimpleNamespace(**{
+                **WORKER_DEFAULTS, **{k: v for k, v in worker.items() if v is not None}
+            }) if isinstance(worker, dict) else worker)
+            for worker in workers
+        ])
+        role_data = role if isinstance(role, dict) else {
+            'required_skills': role.required_skills, 'difficulty_level': role.difficulty_level
+        }
+        match_count, match_fraction = snapshot.skill_match(role_data.get('required_skills') or [])
+        skill_onehot = snapshot.skill_onehot(self.all_skills) if self.model is not None else None
+        return self.score_batch(snapshot.features, match_count, match_fraction, role_data, skill_onehot)
+    
+    def score_batch(self, base_features: np.ndarray, match_count: np.ndarray, match_fraction: np.ndarray,
+                    role_data: dict, skill_onehot: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score precomputed worker feature columns against one role
+        base_features: (n, 4) matrix (WorkerSnapshot.features)
+        skill_onehot: (n, len(all_skills)) matrix, only needed when a model is trained
+        Returns: (fit_scores, confidences)
+        """
+        fit_scores, confidences = self.score_roles(
+            base_features, match_count[:, None], match_fraction[:, None], [role_data], skill_onehot
+        )
+        return fit_scores[:, 0], confidences[:, 0]
+    
+    def score_roles(self, base_features: np.ndarray, match_counts: np.ndarray, match_fractions: np.ndarray,
+                    roles_data: List[dict], skill_onehot: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score every worker against every role with a single booster call
+        match_counts / match_fractions: (n_workers, n_roles) skill match matrices
+        Returns: (fit_scores, confidences) as (n_workers, n_roles) matrices
+        """
         if self.model is None:
             # Return heuristic-based score if model not trained
-            return self._heuristic_score(worker_data, role_data)
+            return self._heuristic_score(base_features, match_fractions)
         
-        features = self._extract_features(worker_data, role_data, self.all_skills)
-        features = features.reshape(1, -1)
+        n_workers, n_roles = match_fractions.shape
+        if n_workers == 0 or n_roles == 0:
+            return np.zeros((n_workers, n_roles)), np.zeros((n_workers, n_roles))
         
-        fit_score = float(self.model.predict(features)[0])
+        # One block of rows per role, stacked into a single matrix
+        X = np.vstack([
+            np.column_stack([
+                base_features,
+                np.full(n_workers, role_data.get('difficulty_level', 0.5), dtype=float),
+                match_counts[:, j],
+                match_fractions[:, j],
+                skill_onehot
+            ])
+            for j, role_data in enumerate(roles_data)
+        ])
         
         # Clip to [0, 1] range
-        fit_score = max(0.0, min(1.0, fit_score))
+        fit_scores = np.clip(self.model.inplace_predict(X).astype(float), 0.0, 1.0)
+        fit_scores = fit_scores.reshape(n_roles, n_workers).T
         
         # Calculate confidence based on feature quality
-        confidence = self._calculate_confidence(worker_data, role_data)
+        confidences = self._calculate_confidence(base_features, match_fractions)
         
-        return fit_score, confidence
+        return fit_scores, confidences
     
-    def _heuristic_score(self, worker_data: dict, role_data: dict) -> Tuple[float, float]:
+    def _heuristic_score(self, base_features: np.ndarray, match_fractions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Calculate heuristic-based fit score when model is not available
+        Calculate heuristic-based fit scores when model is not available
+        match_fractions: (n_workers, n_roles)
         """
-        worker_skills = set(worker_data.get('skills', []))
-        required_skills = set(role_data.get('required_skills', []))
-        
-        # Skill match component (40%)
-        skill_match = len(worker_skills.intersection(required_skills)) / len(required_skills) if required_skills else 0
-        
-        # Performance component (30%)
-        performance = worker_data.get('performance_score', 0.5)
-        
-        # Fatigue penalty (20%)
-        fatigue_penalty = 1.0 - worker_data.get('fatigue_level', 0)
+        experience = base_features[:, [0]]
+        fatigue = base_features[:, [1]]
+        performance = base_features[:, [2]]
         
-        # Experience component (10%)
-        experience = min(worker_data.get('experience', 0) / 10.0, 1.0)
+        # Skill match (40%), performance (30%), fatigue penalty (20%), experience (10%)
+        fit_scores = (
+            match_fractions * 0.4
+            + performance * 0.3
+            + (1.0 - fatigue) * 0.2
+            + np.minimum(experience / 10.0, 1.0) * 0.1
+        )
         
-        fit_score = (skill_match * 0.4 + performance * 0.3 + fatigue_penalty * 0.2 + experience * 0.1)
+        confidences = np.full(match_fractions.shape, 0.7)  # Lower confidence for heuristic
         
-        confidence = 0.7  # Lower confidence for heuristic
-        
-        return fit_score, confidence
+        return fit_scores, confidences
     
-    def _calculate_confidence(self, worker_data: dict, role_data: dict) -> float:
+    def _calculate_confidence(self, base_features: np.ndarray, match_fractions: np.ndarray) -> np.ndarray:
         """
-        Calculate confidence score based on data quality
+        Calculate confidence scores based on data quality
+        match_fractions: (n_workers, n_roles)
         """
-        confidence = 0.8
-        
-        # Reduce confidence if worker has high fatigue
-        if worker_data.get('fatigue_level', 0) > 0.7:
-            confidence -= 0.1
-        
-        # Reduce confidence if worker is inexperienced
-        if worker_data.get('experience', 0) < 1:
-            confidence -= 0.1
-        
-        # Increase confidence if skills match well
-        worker_skills = set(worker_data.get('skills', []))
-        required_skills = set(role_data.get('required_skills', []))
-        skill_match = len(worker_skills.intersection(required_skills)) / len(required_skills) if required_skills else 0
+        experience = base_features[:, [0]]
+        fatigue = base_features[:, [1]]
         
-        if skill_match > 0.8:
-            confidence += 0.1
+        confidences = (
+            0.8
+            - 0.1 * (fatigue > 0.7)  # high fatigue
+            - 0.1 * (experience < 1)  # inexperienced
+            + 0.1 * (match_fractions > 0.8)  # skills match well
+        )
         
-        return max(0.5, min(1.0, confidence))
+        return np.clip(confidences, 0.5, 1.0)
     
     def save(self, path: str = MODEL_PATH):
-        """Save model to disk"""
+        """
+        Save the booster in XGBoost's native format plus a JSON sidecar with the feature schema
+        Each file is replaced atomically; the sidecar is written last
+        """
         os.makedirs(os.path.dirname(path), exist_ok=True)
-        model_data = {
-            'model': self.model,
-            'all_skills': list(self.all_skills)
+        meta = {
+            'format_version': MODEL_FORMAT_VERSION,
+            'feature_schema': self.feature_schema.to_dict() if self.feature_schema else None,
+            'watermark': self.watermark,
+            'num_features': self.model.num_features()
         }
-        joblib.dump(model_data, path)
-    
-    def load(self, path: str = MODEL_PATH):
-        """Load model from disk"""
-        if os.path.exists(path):
-            model_data = joblib.load(path)
-            self.model = model_data['model']
-            self.all_skills = set(model_data['all_skills'])
+        replace_file(path, self.model.save_model)
+        
+        def write_meta(tmp_path):
+            with open(tmp_path, 'w') as f:
+                json.dump(meta, f, indent=2)
+        replace_file(meta_path(path), write_meta)
+    
+    def load(self, path: str = MODEL_PATH, legacy_path: str = LEGACY_MODEL_PATH):
+        """Load model from disk (native booster + sidecar, else a legacy pickle)"""
+        if os.path.exists(path) and os.path.exists(meta_path(path)):
+            with open(meta_path(path)) as f:
+                meta = json.load(f)
+            if meta['format_version'] > MODEL_FORMAT_VERSION:
+                raise ValueError(f"{path} was saved in model format v{meta['format_version']}, this code reads up to v{MODEL_FORMAT_VERSION}")
+            booster = xgb.Booster(model_file=path)
+            if booster.num_features() != meta['num_features']:
+                raise ValueError(f"{path} does not match its sidecar ({booster.num_features()} != {meta['num_features']} features)")
+            self.model = booster
+            self._set_schema(training_data.FeatureSchema.from_dict(meta['feature_schema']))
+            # A v1 timestamp watermark cannot be mapped to a seq: the next training run is a full retrain
+            self.watermark = meta['watermark'] if meta['format_version'] >= 2 else None
             return True
+        if legacy_path and os.path.exists(legacy_path):
+            return self._load_legacy(legacy_path)
         return False
+    
+    def _load_legacy(self, path: str) -> bool:
+        """Pickled XGBRegressor from older versions; the next save writes the native format"""
+        print(f"[ML] Loading legacy pickled model {path}")
+        model_data = joblib.load(path)
+        self.model = model_data['model'].get_booster()
+        if model_data.get('feature_schema'):
+            self._set_schema(training_data.FeatureSchema.from_dict(model_data['feature_schema']))
+        else:
+            # Saved before feature schemas: its skill columns become schema v1
+            self._set_schema(training_data.FeatureSchema(model_data['all_skills']))
+        self.watermark = None  # pickles predate the change_log watermark
+        return True
+
+class ModelSlot:
+    """
+    The model that serves predictions
+    Training jobs build a new SkillAssignmentModel and swap() it in with one reference
+    assignment; a request that took get() keeps scoring with a consistent model.
+    Other attribute access is forwarded to the current model.
+    """
+    def __init__(self, model: SkillAssignmentModel):
+        self._model = model
+        self.version = None  # model registry version being served
+    
+    def get(self) -> SkillAssignmentModel:
+        return self._model
+    
+    def swap(self, model: SkillAssignmentModel, version: int = None) -> SkillAssignmentModel:
+        """Serve model from now on; returns the previous one"""
+        previous, self._model = self._model, model
+        self.version = version
+        return previous
+    
+    def __getattr__(self, name):
+        return getattr(self._model, name)
 
 # Global model instance
-ml_model = SkillAssignmentModel()
+ml_model = ModelSlot(SkillAssignmentModel())
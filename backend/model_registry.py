@@ -0,0 +1,204 @@
+"""
+Model registry
+Every training run adds a numbered version instead of overwriting one model
+file, so a bad retrain can be rolled back in one request:
+
+    models/registry/
+        v0001/model.ubj          booster (XGBoost native format)
+        v0001/model.meta.json    feature schema + watermark (SkillAssignmentModel.save)
+        v0001/version.json       train() metrics, sample count, parent version, source
+        CURRENT.json             {"version": 3, "history": [2, 1], ...}
+
+A version is written into a temp directory and renamed into place, so it is
+either complete or not there. CURRENT.json is replaced atomically; its history
+is a stack of previously served versions, which rollback pops.
+
+Training workers only publish versions. Promote and rollback run in the serving
+process: the version is loaded first, then the pointer is written and the model
+swapped into ml_model; requests keep scoring with whatever model they already
+took. Other uvicorn workers pick up the new pointer on restart.
+"""
+import json
+import os
+import re
+import shutil
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from ml_model import SkillAssignmentModel, ml_model, replace_file
+from config import MODEL_REGISTRY_DIR, MODEL_REGISTRY_KEEP
+
+MAX_HISTORY = 50
+VERSION_DIR = re.compile(r"^v(\d+)$")
+
+class ModelRegistry:
+    def __init__(self, root: str, keep: int = MODEL_REGISTRY_KEEP, slot=None):
+        self.root = root
+        self.keep = keep
+        self.slot = slot  # ModelSlot that promote / rollback swap into (serving process only)
+        self._lock = threading.Lock()
+    
+    def _version_dir(self, version: int) -> str:
+        return os.path.join(self.root, f"v{version:04d}")
+    
+    def _model_path(self, version: int) -> str:
+        return os.path.join(self._version_dir(version), "model.ubj")
+    
+    def _pointer_path(self) -> str:
+        return os.path.join(self.root, "CURRENT.json")
+    
+    def versions(self) -> List[int]:
+        """Published version numbers, oldest first"""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(int(m.group(1)) for m in map(VERSION_DIR.match, os.listdir(self.root)) if m)
+    
+    def pointer(self) -> Dict:
+        """Contents of CURRENT.json (version None before the first promote)"""
+        try:
+            with open(self._pointer_path()) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'version': None, 'history': [], 'promoted_at': None}
+    
+    def info(self, version: int) -> Dict:
+        """version.json of one version; KeyError if it does not exist"""
+        try:
+            with open(os.path.join(self._version_dir(version), "version.json")) as f:
+                info = json.load(f)
+        except FileNotFoundError:
+            raise KeyError(version)
+        info['version'] = version
+        return info
+    
+    def list(self) -> Dict:
+        """Current version, rollback history and every version (newest first)"""
+        pointer = self.pointer()
+        versions = []
+        for version in reversed(self.versions()):
+            info = self.info(version)
+            info['current'] = version == pointer['version']
+            versions.append(info)
+        return {'current': pointer['version'], 'history': pointer['history'], 'versions': versions}
+    
+    def load_version(self, version: int) -> SkillAssignmentModel:
+        model = SkillAssignmentModel()
+        if not model.load(self._model_path(version), legacy_path=None):
+            raise KeyError(version)
+        return model
+    
+    def current_model(self) -> Tuple[Optional[int], SkillAssignmentModel]:
+        """(version, model) named by CURRENT.json; an empty model when nothing is promoted yet"""
+        version = self.pointer()['version']
+        if version is None:
+            return None, SkillAssignmentModel()
+        return version, self.load_version(version)
+    
+    def publish(self, model: SkillAssignmentModel, metrics: Optional[Dict], training_samples: Optional[int],
+                parent: Optional[int], source: str) -> int:
+        """Write model as the next version (safe from several processes). Returns its number"""
+        os.makedirs(self.root, exist_ok=True)
+        tmp_dir = os.path.join(self.root, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(tmp_dir)
+        try:
+            model.save(os.path.join(tmp_dir, "model.ubj"))
+            with open(os.path.join(tmp_dir, "version.json"), 'w') as f:
+                json.dump({
+                    'created_at': datetime.utcnow().isoformat(),
+                    'source': source,
+                    'parent_version': parent,
+                    'metrics': metrics,
+                    'training_samples': training_samples,
+                    'feature_schema': model.feature_schema.to_dict() if model.feature_schema else None,
+                    'watermark': model.watermark
+                }, f, indent=2)
+            
+            while True:
+                version = max(self.versions(), default=0) + 1
+                try:
+                    os.rename(tmp_dir, self._version_dir(version))  # fails if another process took the number
+                    break
+                except OSError:
+                    if not os.path.exists(self._version_dir(version)):
+                        raise
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        print(f"[REGISTRY] Published model v{version} ({source})")
+        return version
+    
+    def _write_pointer(self, pointer: Dict):
+        def write(tmp_path):
+            with open(tmp_path, 'w') as f:
+                json.dump(pointer, f, indent=2)
+        replace_file(self._pointer_path(), write)
+    
+    def _activate(self, version: int, history: List[int]) -> Dict:
+        """Load version, point CURRENT.json at it and swap it into the slot (hold self._lock)"""
+        model = self.load_version(version)
+        pointer = {'version': version, 'history': history[:MAX_HISTORY], 'promoted_at': datetime.utcnow().isoformat()}
+        self._write_pointer(pointer)
+        if self.slot is not None:
+            self.slot.swap(model, version)
+        return pointer
+    
+    def promote(self, version: int) -> Dict:
+        """Serve version from now on; the version it replaces goes on the rollback history"""
+        with self._lock:
+            pointer = self.pointer()
+            if pointer['version'] == version:
+                return pointer
+            history = [v for v in pointer['history'] if v != version]
+            if pointer['version'] is not None:
+                history = [pointer['version']] + history
+            pointer = self._activate(version, history)
+        print(f"[REGISTRY] Promoted model v{version}")
+        return pointer
+    
+    def rollback(self) -> Dict:
+        """Serve the previously promoted version again; ValueError when there is none"""
+        with self._lock:
+            pointer = self.pointer()
+            if not pointer['history']:
+                raise ValueError("No earlier model version to roll back to")
+            version = pointer['history'][0]
+            pointer = self._activate(version, pointer['history'][1:])
+        print(f"[REGISTRY] Rolled back to model v{version}")
+        return pointer
+    
+    def prune(self) -> List[int]:
+        """Delete versions beyond the newest self.keep (never the current one); the rollback history forgets them"""
+        if self.keep <= 0:
+            return []
+        with self._lock:
+            pointer = self.pointer()
+            stale = [v for v in self.versions()[:-self.keep] if v != pointer['version']]
+            for version in stale:
+                shutil.rmtree(self._version_dir(version), ignore_errors=True)
+            if set(stale) & set(pointer['history']):
+                pointer['history'] = [v for v in pointer['history'] if v not in stale]
+                self._write_pointer(pointer)
+        if stale:
+            print(f"[REGISTRY] Pruned model versions {stale}")
+        return stale
+    
+    def load_current(self) -> Optional[int]:
+        """
+        Startup: serve the version CURRENT.json names. With an empty registry, a model
+        file from before the registry (models/fit_model.ubj or .pkl) is imported as v1
+        """
+        version = self.pointer()['version']
+        if version is not None:
+            self.slot.swap(self.load_version(version), version)
+            return version
+        
+        model = SkillAssignmentModel()
+        if not model.load():
+            return None
+        version = self.publish(model, metrics=None, training_samples=None, parent=None, source='import')
+        self.promote(version)
+        return version
+
+# Global model registry (promotes into the serving model)
+model_registry = ModelRegistry(MODEL_REGISTRY_DIR, slot=ml_model)
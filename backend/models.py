@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, JSON, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Float, JSON, DateTime, Boolean, Index, text
 from sqlalchemy.sql import func
 from database import Base
 
@@ -44,6 +44,10 @@ class Assignment(Base):
     completed_at = Column(DateTime(timezone=True), nullable=True)
     feedback = Column(String, nullable=True)
     task_id = Column(Integer, nullable=True)  # linked task for this assignment
+    
+    __table_args__ = (
+        Index('ix_assignments_success', 'success'),  # labeled rows for training
+    )
 
 class Task(Base):
     __tablename__ = "tasks"
@@ -60,6 +64,26 @@ class Task(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     completed_at = Column(DateTime(timezone=True), nullable=True)
+    
+    __table_args__ = (
+        Index('ix_tasks_worker_status_created', 'worker_id', 'status', 'created_at'),  # worker task lists / notifications
+    )
+
+class ChangeLog(Base):
+    __tablename__ = "change_log"
+    
+    seq = Column(Integer, primary_key=True, autoincrement=True)  # monotonic delta-sync cursor
+    entity = Column(String, nullable=False)  # task, assignment
+    entity_id = Column(Integer, nullable=False)
+    worker_id = Column(Integer, nullable=True)  # owner, for per-worker feeds
+    op = Column(String, nullable=False)  # insert, update, delete
+    changed_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index('ix_change_log_entity_seq', 'entity', 'seq'),  # supervisor feeds
+        Index('ix_change_log_entity_worker_seq', 'entity', 'worker_id', 'seq'),  # per-worker feeds
+        {'sqlite_autoincrement': True},  # never reuse a seq
+    )
 
 class HealthMetric(Base):
     __tablename__ = "health_metrics"
@@ -79,6 +103,67 @@ class HealthMetric(Base):
     device_id = Column(String, nullable=True)  # wearable device identifier
     recorded_at = Column(DateTime(timezone=True), server_default=func.now())
     
+    __table_args__ = (
+        Index('ix_health_metrics_worker_recorded', 'worker_id', 'recorded_at'),  # latest / recent metrics per worker
+    )
+
+class HealthMetricRollup(Base):
+    __tablename__ = "health_metric_rollups"
+    
+    worker_id = Column(Integer, primary_key=True)
+    bucket = Column(String, primary_key=True)  # 1m, 1h, 1d
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    sample_count = Column(Integer, default=0)  # health metric rows in the bucket
+    
+    # min / max / sum / count of non-null readings (mean = sum / count)
+    heart_rate_min = Column(Float, nullable=True)
+    heart_rate_max = Column(Float, nullable=True)
+    heart_rate_sum = Column(Float, default=0.0)
+    heart_rate_count = Column(Integer, default=0)
+    oxygen_level_min = Column(Float, nullable=True)
+    oxygen_level_max = Column(Float, nullable=True)
+    oxygen_level_sum = Column(Float, default=0.0)
+    oxygen_level_count = Column(Integer, default=0)
+    stress_level_min = Column(Float, nullable=True)
+    stress_level_max = Column(Float, nullable=True)
+    stress_level_sum = Column(Float, default=0.0)
+    stress_level_count = Column(Integer, default=0)
+    fatigue_score_min = Column(Float, nullable=True)
+    fatigue_score_max = Column(Float, nullable=True)
+    fatigue_score_sum = Column(Float, default=0.0)
+    fatigue_score_count = Column(Integer, default=0)
+    body_temperature_min = Column(Float, nullable=True)
+    body_temperature_max = Column(Float, nullable=True)
+    body_temperature_sum = Column(Float, default=0.0)
+    body_temperature_count = Column(Integer, default=0)
+    
+    # Cumulative counters: value of the latest sample in the bucket
+    steps_count_last = Column(Integer, nullable=True)
+    calories_burned_last = Column(Float, nullable=True)
+    last_recorded_at = Column(DateTime(timezone=True), nullable=True)
+
+class WorkerHealthStatus(Base):
+    __tablename__ = "worker_health_status"
+    
+    worker_id = Column(Integer, primary_key=True)
+    health_status = Column(String, default="Good")  # Good, Warning, Critical
+    alerts = Column(JSON, default=list)  # active alerts: rule, severity, message, since
+    rule_state = Column(JSON, default=dict)  # rule name -> breach start (ISO) for sustained windows
+    metric_id = Column(Integer, nullable=True)  # last evaluated health metric
+    evaluated_at = Column(DateTime(timezone=True), nullable=True)  # recorded_at of that metric
+
+class WorkerFatigueState(Base):
+    __tablename__ = "worker_fatigue_state"
+    
+    worker_id = Column(Integer, primary_key=True)
+    heart_rate = Column(Float, nullable=True)  # exponentially weighted bpm
+    stress_level = Column(Float, nullable=True)  # exponentially weighted 0-100
+    shift_hours = Column(Float, nullable=True)  # exponentially weighted hours per closed session
+    metric_at = Column(DateTime(timezone=True), nullable=True)  # recorded_at of the last folded metric
+    session_at = Column(DateTime(timezone=True), nullable=True)  # clock_out of the last folded session
+    fatigue_level = Column(Float, nullable=True)  # last value written back to workers.fatigue_level
+    sample_count = Column(Integer, default=0)  # health metrics folded so far
+
 class WorkSession(Base):
     __tablename__ = "work_sessions"
     
@@ -93,3 +178,12 @@ class WorkSession(Base):
     recorded_by = Column(String, default="Wearable Device")  # device or manual
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    __table_args__ = (
+        Index('ix_work_sessions_worker_clock_in', 'worker_id', 'clock_in'),  # hours ranges per worker
+        Index(
+            'ix_work_sessions_open', 'worker_id',  # active session lookup (partial: open sessions only)
+            postgresql_where=text('clock_out IS NULL'),
+            sqlite_where=text('clock_out IS NULL')
+        ),
+    )
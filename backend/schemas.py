@@ -97,10 +97,23 @@ class AssignmentResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class AssignmentChange(BaseModel):
+    seq: int  # change_log position of the latest change
+    id: int
+    op: str  # upsert, delete (tombstone)
+    assignment: Optional[AssignmentResponse] = None  # current row, None for deletes
+
+class AssignmentChangesResponse(BaseModel):
+    changes: List[AssignmentChange]
+    cursor: int  # pass as since= on the next call
+    has_more: bool  # more changes after cursor, call again right away
+    reset: bool  # cursor is unknown to the server, drop local state and sync from 0
+
 # Prediction Schemas
 class PredictFitRequest(BaseModel):
     role_id: int
     top_n: int = Field(default=3, ge=1, le=10)
+    min_skill_match: Optional[int] = Field(default=None, ge=1)  # only score workers with >= this many required skills
 
 class WorkerRecommendation(BaseModel):
     worker_id: int
@@ -119,6 +132,34 @@ class PredictFitResponse(BaseModel):
     role_name: str
     recommendations: List[WorkerRecommendation]
 
+# Assignment Optimization Schemas
+class OptimizeAssignmentRequest(BaseModel):
+    role_ids: Optional[List[int]] = None  # defaults to every role
+    max_fatigue: float = Field(default=0.7, ge=0, le=1)  # workers at or above are rested
+    max_hours_per_day: float = Field(default=8.5, ge=0, le=24)
+    max_hours_per_week: float = Field(default=52.0, ge=0, le=168)
+    min_fit_score: float = Field(default=0.0, ge=0, le=1)
+    create_assignments: bool = False  # persist the plan as assignments
+
+class OptimizedAssignment(BaseModel):
+    role_id: int
+    role_name: str
+    worker_id: int
+    worker_name: str
+    fit_score: float
+    confidence: float
+    skill_match_percentage: float
+    fatigue_level: float
+    hours_per_day: float
+    hours_per_week: float
+    assignment_id: Optional[int] = None
+
+class OptimizeAssignmentResponse(BaseModel):
+    assignments: List[OptimizedAssignment]
+    unassigned_role_ids: List[int]
+    eligible_workers: int
+    total_fit_score: float
+
 # Analytics Schemas
 class AnalyticsOverview(BaseModel):
     total_workers: int
@@ -186,6 +227,18 @@ class TaskResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class TaskChange(BaseModel):
+    seq: int  # change_log position of the latest change
+    id: int
+    op: str  # upsert, delete (tombstone)
+    task: Optional[TaskResponse] = None  # current row, None for deletes
+
+class TaskChangesResponse(BaseModel):
+    changes: List[TaskChange]
+    cursor: int  # pass as since= on the next call
+    has_more: bool  # more changes after cursor, call again right away
+    reset: bool  # cursor is unknown to the server, drop local state and sync from 0
+
 # Health Metric Schemas
 class HealthMetricCreate(BaseModel):
     worker_id: int
@@ -220,6 +273,45 @@ class HealthMetricResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class HealthMetricBulkResult(BaseModel):
+    index: int  # position in the request array
+    worker_id: int
+    status: str  # created, queued (buffered mode), rejected
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class HealthMetricBulkResponse(BaseModel):
+    received: int
+    inserted: int  # queued rows in buffered mode
+    rejected: int
+    elapsed_ms: float
+    rows_per_second: float
+    results: List[HealthMetricBulkResult]
+
+class VitalStats(BaseModel):
+    min: Optional[float]
+    max: Optional[float]
+    mean: Optional[float]
+    count: int
+
+class HealthSeriesPoint(BaseModel):
+    bucket_start: datetime
+    samples: int
+    heart_rate: VitalStats
+    oxygen_level: VitalStats
+    stress_level: VitalStats
+    fatigue_score: VitalStats
+    body_temperature: VitalStats
+    steps_count: Optional[int]  # latest reading in the bucket
+    calories_burned: Optional[float]  # latest reading in the bucket
+
+class HealthSeriesResponse(BaseModel):
+    worker_id: int
+    bucket: str  # 1m, 1h, 1d
+    start: datetime
+    end: datetime
+    points: List[HealthSeriesPoint]
+
 class WorkerHealthSummary(BaseModel):
     worker_id: int
     worker_name: str
@@ -234,6 +326,20 @@ class WorkerHealthSummary(BaseModel):
     alerts: List[str]  # Health alerts
     last_updated: datetime
 
+class HealthAlert(BaseModel):
+    rule: str
+    severity: str  # Warning, Critical
+    message: str
+    since: datetime  # first sample of the ongoing breach
+
+class ActiveHealthAlerts(BaseModel):
+    worker_id: int
+    worker_name: str
+    health_status: str
+    alerts: List[HealthAlert]
+    metric_id: Optional[int]
+    evaluated_at: Optional[datetime]
+
 # Work Session Schemas
 class WorkSessionCreate(BaseModel):
     worker_id: int
@@ -0,0 +1,129 @@
+"""
+Skill vocabulary and bitset helpers
+Skill strings are interned to small integer ids so worker and role skill sets
+become integer bitmasks; match counts are then a single AND + popcount.
+"""
+import threading
+import numpy as np
+from typing import Dict, Iterable, List, Optional
+
+class SkillVocabulary:
+    """Process-wide skill string <-> integer id mapping (ids never change)"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = {}
+        self._skills = []
+    
+    def __len__(self) -> int:
+        return len(self._skills)
+    
+    def intern(self, skill: str) -> int:
+        """Id of a skill, assigning the next free id to new skills"""
+        skill_id = self._ids.get(skill)
+        if skill_id is None:
+            with self._lock:
+                skill_id = self._ids.get(skill)
+                if skill_id is None:
+                    skill_id = len(self._skills)
+                    self._skills.append(skill)
+                    self._ids[skill] = skill_id
+        return skill_id
+    
+    def id(self, skill: str) -> Optional[int]:
+        """Id of a known skill, or None"""
+        return self._ids.get(skill)
+    
+    def skill(self, skill_id: int) -> str:
+        return self._skills[skill_id]
+    
+    def mask(self, skills: Iterable[str]) -> int:
+        """Integer bitmask with one bit per skill"""
+        mask = 0
+        for skill in skills or []:
+            mask |= 1 << self.intern(skill)
+        return mask
+    
+    def ids(self, skills: Iterable[str]) -> np.ndarray:
+        """Sorted, de-duplicated skill ids"""
+        return np.array(sorted({self.intern(skill) for skill in skills or []}), dtype=int)
+    
+    def skills_in(self, mask: int) -> List[str]:
+        """Skill names of every bit set in a mask (in id order)"""
+        return [self._skills[skill_id] for skill_id in mask_ids(mask)]
+    
+    def search(self, text: str) -> List[int]:
+        """Ids of skills whose name contains text (case-insensitive)"""
+        text = text.lower()
+        return [skill_id for skill_id, skill in enumerate(list(self._skills)) if text in skill.lower()]
+
+class SkillInvertedIndex:
+    """Skill id -> sorted array of worker ids holding that skill"""
+    def __init__(self):
+        self._postings = {}
+    
+    def build(self, worker_masks: Dict[int, int]):
+        """Rebuild from {worker_id: skill_mask}"""
+        postings = {}
+        for worker_id in sorted(worker_masks):
+            for skill_id in mask_ids(worker_masks[worker_id]):
+                postings.setdefault(skill_id, []).append(worker_id)
+        self._postings = {skill_id: np.array(ids, dtype=int) for skill_id, ids in postings.items()}
+    
+    def update(self, worker_id: int, old_mask: int, new_mask: int):
+        """Move a worker between postings after its skills changed (0 = absent)"""
+        for skill_id in mask_ids(old_mask & ~new_mask):
+            ids = self._postings.get(skill_id)
+            if ids is not None:
+                self._postings[skill_id] = ids[ids != worker_id]
+        for skill_id in mask_ids(new_mask & ~old_mask):
+            ids = self._postings.get(skill_id, np.zeros(0, dtype=int))
+            pos = np.searchsorted(ids, worker_id)
+            if pos == len(ids) or ids[pos] != worker_id:
+                self._postings[skill_id] = np.insert(ids, pos, worker_id)
+    
+    def workers_with(self, skill_ids: Iterable[int]) -> np.ndarray:
+        """Sorted ids of workers holding any of the skills"""
+        arrays = [self._postings[skill_id] for skill_id in skill_ids if skill_id in self._postings]
+        if not arrays:
+            return np.zeros(0, dtype=int)
+        return np.unique(np.concatenate(arrays))
+    
+    def candidates(self, skill_ids: Iterable[int], min_match: int) -> np.ndarray:
+        """Sorted ids of workers holding at least min_match of the skills"""
+        arrays = [self._postings[skill_id] for skill_id in set(skill_ids) if skill_id in self._postings]
+        if not arrays:
+            return np.zeros(0, dtype=int)
+        ids, counts = np.unique(np.concatenate(arrays), return_counts=True)
+        return ids[counts >= min_match]
+
+def mask_ids(mask: int) -> List[int]:
+    """Skill ids of every bit set in a mask (ascending)"""
+    skill_ids = []
+    while mask:
+        low_bit = mask & -mask
+        skill_ids.append(low_bit.bit_length() - 1)
+        mask ^= low_bit
+    return skill_ids
+
+def match_count(worker_mask: int, required_mask: int) -> int:
+    """Number of required skills the worker has"""
+    return (worker_mask & required_mask).bit_count()
+
+def match_fraction(worker_mask: int, required_mask: int) -> float:
+    """Share (0-1) of required skills the worker has; 0 when nothing is required"""
+    required_count = required_mask.bit_count()
+    return match_count(worker_mask, required_mask) / required_count if required_count else 0
+
+def mask_matrix(masks: List[int], width: int = None) -> np.ndarray:
+    """Unpack integer masks into an (n, width) bool matrix (column = skill id)"""
+    if width is None:
+        width = max((mask.bit_length() for mask in masks), default=0)
+    n_bytes = max(1, (width + 7) // 8)
+    packed = np.frombuffer(
+        b''.join(mask.to_bytes(n_bytes, 'little') for mask in masks),
+        dtype=np.uint8
+    ).reshape(len(masks), n_bytes)
+    return np.unpackbits(packed, axis=1, count=width, bitorder='little').astype(bool)
+
+# Global skill vocabulary
+skill_vocab = SkillVocabulary()
@@ -0,0 +1,92 @@
+"""
+Regression tests for the health history endpoints (/health/worker/{id}, /health/worker/{id}/series)
+Runs in-process against a throwaway SQLite database: python test_health_history.py
+"""
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+# Point the app at a throwaway database before it is imported
+TMP_DIR = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TMP_DIR, 'health_history_test.db')}"
+os.environ["USE_SQLITE_FALLBACK"] = "false"
+os.environ["HEALTH_ARCHIVE_DIR"] = os.path.join(TMP_DIR, "archive")
+
+from fastapi.testclient import TestClient
+import models
+from database import SessionLocal
+from health_archive import health_archive, retention_cutoff
+from main import app
+
+client = TestClient(app)
+
+def _add_worker(name):
+    return client.post("/worker/add", json={
+        "name": name, "age": 30, "experience": 3, "skills": ["Welding"]
+    }).json()
+
+def test_series_accepts_timezone_aware_from_without_to():
+    worker = _add_worker("Series Worker")
+    response = client.post("/health/metric", json={"worker_id": worker["id"], "heart_rate": 88})
+    assert response.status_code == 201
+    
+    since = (datetime.utcnow() - timedelta(hours=2)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    response = client.get(f"/health/worker/{worker['id']}/series", params={"bucket": "1h", "from": since})
+    assert response.status_code == 200, response.text
+    points = response.json()["points"]
+    assert [p["heart_rate"]["max"] for p in points] == [88]
+    
+    # Aware 'from' with naive 'to' and the other way round
+    until = (datetime.utcnow() + timedelta(hours=1)).isoformat()
+    response = client.get(f"/health/worker/{worker['id']}/series", params={"from": since, "to": until})
+    assert response.status_code == 200, response.text
+    response = client.get(f"/health/worker/{worker['id']}/series", params={
+        "from": (datetime.utcnow() - timedelta(hours=2)).isoformat(), "to": since.replace("Z", "+00:00")
+    })
+    assert response.status_code == 400
+
+def test_history_reads_archive_only_for_old_ranges():
+    worker = _add_worker("Archive Worker")
+    old = retention_cutoff() - timedelta(days=10)
+    db = SessionLocal()
+    try:
+        db.add_all(
+            models.HealthMetric(worker_id=worker["id"], heart_rate=60 + i, recorded_at=old + timedelta(hours=i))
+            for i in range(3)
+        )
+        db.commit()
+        client.post("/health/metric", json={"worker_id": worker["id"], "heart_rate": 90})
+        # The three old rows go to the archive, the recent one stays in the DB
+        assert health_archive.run(db)["archived"] == 3
+    finally:
+        db.close()
+    
+    reads = []
+    read = health_archive.read
+    health_archive.read = lambda *args: reads.append(args) or read(*args)
+    try:
+        # Default "latest N" request: DB only, even though it returns fewer rows than limit
+        response = client.get(f"/health/worker/{worker['id']}", params={"limit": 10})
+        assert response.status_code == 200
+        assert [m["heart_rate"] for m in response.json()] == [90]
+        assert reads == []
+        
+        # A range that starts after the retention cutoff cannot contain archived rows
+        response = client.get(f"/health/worker/{worker['id']}", params={"from": retention_cutoff().isoformat()})
+        assert response.status_code == 200
+        assert reads == []
+        
+        # A historical range is the union of DB and archive, newest first
+        since = (old - timedelta(days=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        response = client.get(f"/health/worker/{worker['id']}", params={"from": since, "limit": 10})
+        assert response.status_code == 200
+        assert [m["heart_rate"] for m in response.json()] == [90, 62, 61, 60]
+        assert len(reads) == 1
+    finally:
+        health_archive.read = read
+
+if __name__ == "__main__":
+    test_series_accepts_timezone_aware_from_without_to()
+    print("✓ Series endpoint accepts timezone-aware bounds")
+    test_history_reads_archive_only_for_old_ranges()
+    print("✓ Health history reads the archive only for ranges past retention")
@@ -0,0 +1,70 @@
+"""
+Query-count regression test for /task/worker/{id}/notifications
+The endpoint must issue the same number of SQL statements no matter how many tasks a worker has.
+Runs in-process against a throwaway SQLite database: python test_notification_queries.py
+"""
+import os
+import tempfile
+
+# Point the app at a throwaway database before it is imported
+DB_PATH = os.path.join(tempfile.mkdtemp(), "notifications_test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["USE_SQLITE_FALLBACK"] = "false"
+
+from sqlalchemy import event
+from fastapi.testclient import TestClient
+from database import engine
+from main import app
+
+client = TestClient(app)
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+    
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+    
+    def __enter__(self):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self)
+        return self
+    
+    def __exit__(self, *exc):
+        event.remove(engine, "before_cursor_execute", self)
+
+def _notification_query_count(worker_id):
+    with QueryCounter() as counter:
+        response = client.get(f"/task/worker/{worker_id}/notifications")
+    assert response.status_code == 200
+    return counter.count, response.json()
+
+def test_notifications_query_count_is_constant():
+    worker = client.post("/worker/add", json={
+        "name": "Query Count Worker", "age": 30, "experience": 3, "skills": ["Welding"]
+    }).json()
+    roles = [
+        client.post("/role/add", json={
+            "name": f"Query Count Role {i}", "required_skills": ["Welding"], "difficulty_level": 0.5
+        }).json()
+        for i in range(3)
+    ]
+    
+    client.post("/task/create", json={"worker_id": worker["id"], "title": "Task 0", "role_id": roles[0]["id"]})
+    queries_one_task, body = _notification_query_count(worker["id"])
+    assert body["count"] == 1
+    
+    for i in range(1, 12):
+        role_id = roles[i % 3]["id"] if i % 4 else None
+        client.post("/task/create", json={"worker_id": worker["id"], "title": f"Task {i}", "role_id": role_id})
+    queries_many_tasks, body = _notification_query_count(worker["id"])
+    
+    assert body["count"] == 12
+    assert {n["worker_name"] for n in body["notifications"]} == {"Query Count Worker"}
+    assert "No specific role" in {n["role_name"] for n in body["notifications"]}
+    assert queries_many_tasks == queries_one_task, (queries_one_task, queries_many_tasks)
+    assert queries_many_tasks <= 2
+
+if __name__ == "__main__":
+    test_notifications_query_count_is_constant()
+    print("✓ Notifications endpoint uses a constant number of queries")
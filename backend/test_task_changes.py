@@ -0,0 +1,57 @@
+"""
+Delta sync test for /task/changes
+A task reassigned to another worker must show up as a tombstone in the previous
+owner's feed and as an upsert in the new owner's feed.
+Runs in-process against a throwaway SQLite database: python test_task_changes.py
+"""
+import os
+import tempfile
+
+# Point the app at a throwaway database before it is imported
+DB_PATH = os.path.join(tempfile.mkdtemp(), "task_changes_test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["USE_SQLITE_FALLBACK"] = "false"
+
+from fastapi.testclient import TestClient
+import models
+from database import SessionLocal
+from main import app
+
+client = TestClient(app)
+
+def _feed(worker_id, since=0):
+    response = client.get("/task/changes", params={"worker_id": worker_id, "since": since})
+    assert response.status_code == 200
+    return response.json()
+
+def test_reassigned_task_is_deleted_from_previous_owner_feed():
+    old_owner, new_owner = [
+        client.post("/worker/add", json={"name": name, "age": 30, "experience": 3, "skills": ["Welding"]}).json()
+        for name in ("Old Owner", "New Owner")
+    ]
+    task = client.post("/task/create", json={"worker_id": old_owner["id"], "title": "Reassigned task"}).json()
+    
+    feed = _feed(old_owner["id"])
+    assert [(c["id"], c["op"]) for c in feed["changes"]] == [(task["id"], "upsert")]
+    old_cursor = feed["cursor"]
+    new_cursor = _feed(new_owner["id"])["cursor"]
+    
+    db = SessionLocal()
+    try:
+        db.query(models.Task).filter(models.Task.id == task["id"]).one().worker_id = new_owner["id"]
+        db.commit()
+    finally:
+        db.close()
+    
+    feed = _feed(old_owner["id"], old_cursor)
+    assert [(c["id"], c["op"], c["task"]) for c in feed["changes"]] == [(task["id"], "delete", None)]
+    feed = _feed(new_owner["id"], new_cursor)
+    assert [(c["id"], c["op"]) for c in feed["changes"]] == [(task["id"], "upsert")]
+    assert feed["changes"][0]["task"]["worker_id"] == new_owner["id"]
+    
+    # A full resync of the previous owner no longer lists the task either
+    assert [c["op"] for c in _feed(old_owner["id"])["changes"]] == ["delete"]
+
+if __name__ == "__main__":
+    test_reassigned_task_is_deleted_from_previous_owner_feed()
+    print("✓ Reassigned tasks are tombstoned in the previous owner's feed")
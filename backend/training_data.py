@@ -0,0 +1,174 @@
+"""
+Training set loader
+Builds the XGBoost training matrix straight from SQL instead of materializing
+every Worker, Role and Assignment as ORM objects and walking them row by row.
+
+One joined query fetches only (worker_id, role_id, success) for every labeled
+assignment, read from the DBAPI cursor straight into a NumPy record array.
+Worker and role columns (and skill lists, parsed into bit matrices) are loaded
+once per entity, not once per assignment; every feature column is then
+gathered for all rows with array operations. Column layout is FeatureSchema's
+(BASE_COLUMNS, then the one-hot skills), the same one SkillAssignmentModel.score_roles
+builds from the WorkerSnapshot arrays at prediction time.
+
+The layout is pinned by a FeatureSchema saved with the model: incremental
+updates reuse the trained skill columns instead of re-picking the current top
+skills, and only read labeled assignments changed after the model's watermark.
+The watermark is a change_log seq, not a timestamp: seq order is commit order,
+so assignments completed in the same instant as the watermark, or committed
+late with an earlier completed_at, are still read by the next run. A labeled
+assignment edited after it was trained on is read again with its current label.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+import models
+from skill_index import skill_vocab, mask_matrix
+
+MAX_SKILL_COLUMNS = 20  # one-hot only the most common worker skills
+LABELED_DTYPE = np.dtype([('worker_id', '<i8'), ('role_id', '<i8'), ('success', '<i8')])
+BASE_COLUMNS = (
+    'experience', 'fatigue_level', 'performance_score', 'age', 'difficulty_level',
+    'skill_match_count', 'skill_match_fraction'
+)
+
+class FeatureSchema:
+    """Feature matrix layout a model was trained on (saved with the model)"""
+    def __init__(self, skill_columns: Sequence[str], version: int = 1):
+        self.skill_columns = sorted(skill_columns)
+        self.version = version
+    
+    @property
+    def columns(self) -> List[str]:
+        return list(BASE_COLUMNS) + [f"skill:{skill}" for skill in self.skill_columns]
+    
+    def successor(self, skill_columns: Sequence[str]) -> 'FeatureSchema':
+        """Schema for a full retrain: same version while the skill columns stay the same"""
+        if sorted(skill_columns) == self.skill_columns:
+            return self
+        return FeatureSchema(skill_columns, self.version + 1)
+    
+    def to_dict(self) -> Dict:
+        return {'version': self.version, 'skill_columns': self.skill_columns, 'columns': self.columns}
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'FeatureSchema':
+        schema = cls(data['skill_columns'], data['version'])
+        if data.get('columns', schema.columns) != schema.columns:
+            raise ValueError(f"Feature schema v{schema.version} does not match this code's column layout")
+        return schema
+
+def top_skills(skill_lists: Sequence[List[str]], k: int = MAX_SKILL_COLUMNS) -> List[str]:
+    """The k skills held by most workers (ties keep first-seen order)"""
+    skill_counts = {}
+    for skills in skill_lists:
+        for skill in skills or []:
+            skill_counts[skill] = skill_counts.get(skill, 0) + 1
+    return sorted(skill_counts, key=lambda skill: skill_counts[skill], reverse=True)[:k]
+
+def labeling_watermark(db: Session) -> Optional[int]:
+    """Latest change_log seq of the assignments (None before any assignment write was logged)"""
+    return db.query(func.max(models.ChangeLog.seq)).filter(models.ChangeLog.entity == 'assignment').scalar()
+
+def _changed_assignments(after: int, until: Optional[int] = None):
+    """Ids of assignments with a change_log row in (after, until]"""
+    query = select(models.ChangeLog.entity_id).where(
+        models.ChangeLog.entity == 'assignment', models.ChangeLog.seq > after
+    )
+    if until is not None:
+        query = query.where(models.ChangeLog.seq <= until)
+    return query
+
+def labeled_assignments(db: Session, since: Optional[int] = None,
+                        until: Optional[int] = None, incremental: bool = False) -> np.ndarray:
+    """
+    (worker_id, role_id, success) of the labeled assignments whose worker and role exist, by id
+    until: leave out rows changed after this change_log seq (the next run reads them)
+    incremental: only rows changed after since (every logged row when since is None)
+    """
+    Worker, Role, Assignment = models.Worker, models.Role, models.Assignment
+    query = (
+        select(Assignment.worker_id, Assignment.role_id, Assignment.success)
+        .join(Worker, Worker.id == Assignment.worker_id)
+        .join(Role, Role.id == Assignment.role_id)
+        .where(Assignment.success.isnot(None))
+        .order_by(Assignment.id)
+    )
+    if incremental:
+        query = query.where(Assignment.id.in_(_changed_assignments(since or 0, until)))
+    if until is not None:
+        query = query.where(Assignment.id.notin_(_changed_assignments(until)))
+    result = db.connection().execute(query)
+    try:
+        # Plain DBAPI tuples: no Row objects for what can be millions of rows
+        return np.fromiter(result.cursor, dtype=LABELED_DTYPE)
+    finally:
+        result.close()
+
+def load_training_data(db: Session, skill_columns: Optional[List[str]] = None, since: Optional[int] = None,
+                       incremental: bool = False) -> Tuple[np.ndarray, np.ndarray, List[str], Optional[int]]:
+    """
+    Feature matrix X and labels y for the labeled assignments (assignment id order)
+    skill_columns: one-hot skills; defaults to the top MAX_SKILL_COLUMNS worker skills
+    incremental: only assignments changed after since (the previous run's watermark)
+    Returns: (X, y, sorted skill columns, watermark covering the rows read)
+    """
+    # Rows changed after the watermark are left for the next run, so none is read twice or skipped
+    watermark = labeling_watermark(db)
+    if incremental and (watermark is None or (since is not None and watermark <= since)):
+        return np.zeros((0, 7 + len(skill_columns or []))), np.zeros(0), sorted(skill_columns or []), since
+    
+    Worker, Role = models.Worker, models.Role
+    workers = db.execute(
+        select(
+            Worker.id,
+            Worker.skills,
+            func.coalesce(Worker.experience, 0),
+            func.coalesce(Worker.fatigue_level, 0),
+            func.coalesce(Worker.performance_score, 0.5),
+            func.coalesce(Worker.age, 25) / 100.0,  # normalize age
+        ).order_by(Worker.id)
+    ).all()
+    roles = db.execute(
+        select(Role.id, Role.required_skills, func.coalesce(Role.difficulty_level, 0.5)).order_by(Role.id)
+    ).all()
+    if skill_columns is None:
+        skill_columns = top_skills([w.skills for w in workers])
+    skill_columns = sorted(skill_columns)
+    skill_ids = np.array([skill_vocab.intern(skill) for skill in skill_columns], dtype=int)
+    
+    # Skill lists are parsed once per worker / role, rows only gather from them
+    worker_ids = np.array([w[0] for w in workers], dtype=int)
+    worker_features = np.array([w[2:] for w in workers], dtype=float).reshape(-1, 4)
+    role_ids = np.array([r[0] for r in roles], dtype=int)
+    role_difficulty = np.array([r[2] for r in roles], dtype=float)
+    worker_masks = [skill_vocab.mask(w.skills) for w in workers]
+    role_masks = [skill_vocab.mask(r.required_skills) for r in roles]
+    worker_bits = mask_matrix(worker_masks, len(skill_vocab))
+    role_bits = mask_matrix(role_masks, len(skill_vocab))
+    
+    labeled = labeled_assignments(db, since, watermark, incremental)
+    worker_rows = np.searchsorted(worker_ids, labeled['worker_id'])
+    role_rows = np.searchsorted(role_ids, labeled['role_id'])
+    
+    # Match counts per distinct (worker, role) pair, then spread over the rows
+    n_roles = max(len(roles), 1)
+    pairs, pair_of_row = np.unique(worker_rows * n_roles + role_rows, return_inverse=True)
+    pair_workers, pair_roles = np.divmod(pairs, n_roles)
+    pair_counts = np.count_nonzero(worker_bits[pair_workers] & role_bits[pair_roles], axis=1).astype(float)
+    required_counts = role_bits.sum(axis=1).astype(float)[pair_roles]
+    pair_fractions = np.divide(
+        pair_counts, required_counts,
+        out=np.zeros_like(pair_counts), where=required_counts > 0
+    )
+    
+    X = np.empty((len(labeled), 7 + len(skill_columns)))
+    X[:, 0:4] = worker_features[worker_rows]
+    X[:, 4] = role_difficulty[role_rows]
+    X[:, 5] = pair_counts[pair_of_row]
+    X[:, 6] = pair_fractions[pair_of_row]
+    X[:, 7:] = worker_bits[:, skill_ids][worker_rows]
+    
+    y = (labeled['success'] != 0).astype(float)
+    return X, y, skill_columns, watermark
@@ -0,0 +1,174 @@
+"""
+Background model training
+/train-model and /ml/train submit a job instead of running XGBoost inside the
+request thread. Jobs run in a process pool of spawned workers
+(ML_TRAINING_WORKERS, default 1, so jobs run one after another): the worker
+opens its own DB session, builds the training set, trains from the current
+registry version, and publishes the result as a new version (model_registry).
+
+When a job succeeds the serving process promotes the new version
+(ML_AUTO_PROMOTE), which loads it and swaps it into ml_model in one step;
+predictions never wait on training and never see a half trained model. Job
+status is kept in memory (last MAX_JOBS jobs) and is served by /ml/jobs/{id}.
+Only the process that submitted a job swaps the model; other uvicorn workers
+pick it up on restart.
+"""
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+from ml_model import SkillAssignmentModel
+from model_registry import ModelRegistry, model_registry
+from config import ML_TRAINING_WORKERS, ML_AUTO_PROMOTE
+
+MAX_JOBS = 50
+
+def run_training(kind: str, incremental: bool, min_samples: int, registry_dir: str) -> Dict:
+    """Job body (runs in a pool worker): load data, train, publish a registry version. Returns metrics"""
+    from database import SessionLocal
+    
+    started = time.perf_counter()
+    registry = ModelRegistry(registry_dir)
+    try:
+        # Incremental base, and the schema version a full retrain continues from
+        parent, model = registry.current_model()
+    except (KeyError, ValueError) as e:
+        if incremental:
+            raise
+        print(f"[TRAIN] Ignoring the current model for a full retrain: {e!r}")
+        parent, model = None, SkillAssignmentModel()
+    incremental = incremental and model.can_train_incrementally()
+    
+    db = SessionLocal()
+    try:
+        X, y = model.load_training_data(db, incremental=incremental)
+    finally:
+        db.close()
+    
+    version = None
+    if incremental and len(y) == 0:
+        metrics = {'mode': 'incremental', 'new_samples': 0, 'message': 'No assignments labeled since the last training run'}
+    else:
+        if not incremental and len(y) < min_samples:
+            raise ValueError(f"Need at least {min_samples} labeled assignments to train model, found {len(y)}")
+        metrics = model.train(X, y, incremental=incremental)
+        version = registry.publish(model, metrics, len(y), parent, source=kind)
+    return {
+        'metrics': metrics,
+        'training_samples': len(y),
+        'version': version,
+        'parent_version': parent,
+        'feature_schema_version': model.feature_schema.version,
+        'watermark': model.watermark,
+        'train_seconds': round(time.perf_counter() - started, 3)
+    }
+
+class TrainingJob:
+    __slots__ = ('id', 'kind', 'incremental', 'state', 'submitted_at', 'finished_at', 'result', 'promoted',
+                 'error', 'future')
+    
+    def __init__(self, kind: str, incremental: bool):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.incremental = incremental
+        self.state = 'queued'
+        self.submitted_at = datetime.utcnow()
+        self.finished_at = None
+        self.result = None
+        self.promoted = False
+        self.error = None
+        self.future = None
+    
+    def to_dict(self) -> Dict:
+        state = self.state
+        if state == 'queued' and self.future is not None and self.future.running():
+            state = 'running'
+        elapsed = ((self.finished_at or datetime.utcnow()) - self.submitted_at).total_seconds()
+        return {
+            'job_id': self.id,
+            'kind': self.kind,
+            'incremental': self.incremental,
+            'state': state,
+            'submitted_at': self.submitted_at.isoformat(),
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'elapsed_seconds': round(elapsed, 3),
+            'metrics': self.result['metrics'] if self.result else None,
+            'training_samples': self.result['training_samples'] if self.result else None,
+            'version': self.result['version'] if self.result else None,
+            'promoted': self.promoted,
+            'feature_schema_version': self.result['feature_schema_version'] if self.result else None,
+            'watermark': self.result['watermark'] if self.result else None,
+            'error': self.error
+        }
+
+class TrainingJobs:
+    def __init__(self, max_workers: int, registry: ModelRegistry, auto_promote: bool = True):
+        self.max_workers = max_workers
+        self.registry = registry
+        self.auto_promote = auto_promote
+        self._lock = threading.Lock()
+        self._executor = None  # created on first submit
+        self._jobs = {}  # job id -> TrainingJob, oldest first
+    
+    def submit(self, kind: str, incremental: bool, min_samples: int) -> TrainingJob:
+        """Queue a training job; returns immediately"""
+        job = TrainingJob(kind, incremental)
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn")  # no forked copies of the server's threads
+                )
+            self._jobs[job.id] = job
+            while len(self._jobs) > MAX_JOBS:
+                del self._jobs[next(iter(self._jobs))]
+            job.future = self._executor.submit(run_training, kind, incremental, min_samples, self.registry.root)
+        print(f"[TRAIN] Job {job.id} queued ({kind}, incremental={incremental})")
+        job.future.add_done_callback(lambda future: self._finished(job, future))
+        return job
+    
+    def _finished(self, job: TrainingJob, future: Future):
+        """Done callback (pool thread): promote the new version, then publish the job result"""
+        try:
+            result = future.result()
+            if result['version'] is not None:
+                if self.auto_promote:
+                    self.registry.promote(result['version'])
+                    job.promoted = True
+                self.registry.prune()
+        except Exception as e:
+            job.error = str(e) or type(e).__name__
+            job.finished_at = datetime.utcnow()
+            job.state = 'failed'
+            print(f"[TRAIN] Job {job.id} failed: {job.error}")
+        else:
+            job.result = result
+            job.finished_at = datetime.utcnow()
+            job.state = 'succeeded'
+            print(f"[TRAIN] Job {job.id} done in {result['train_seconds']}s "
+                  f"({result['training_samples']} samples, feature schema v{result['feature_schema_version']}, "
+                  f"model v{result['version']}{' promoted' if job.promoted else ''})")
+    
+    def get(self, job_id: str) -> Optional[TrainingJob]:
+        return self._jobs.get(job_id)
+    
+    def list(self) -> List[TrainingJob]:
+        """Known jobs, newest first"""
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+    
+    def active_count(self) -> int:
+        return sum(1 for job in self.list() if job.state == 'queued')
+    
+    def shutdown(self):
+        """Stop the pool; queued jobs are cancelled, a running one is abandoned"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+# Global training job runner
+training_jobs = TrainingJobs(ML_TRAINING_WORKERS, model_registry, auto_promote=ML_AUTO_PROMOTE)
@@ -0,0 +1,97 @@
+"""
+Latest-vitals cache
+Keeps the most recent health metric of every worker in memory so current-vitals
+reads (latest, summary, dashboard) never touch the health_metrics table.
+
+Warmed from the DB at startup and updated by the health ingest pipeline. Like the
+feature store it is per-process: rows written directly to the DB (populate_*.py)
+or by another uvicorn worker need a restart or invalidate().
+"""
+import threading
+from typing import Dict, List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+import models
+
+METRIC_FIELDS = tuple(models.HealthMetric.__table__.columns.keys())
+
+class CachedHealthMetric:
+    """Detached copy of a HealthMetric row (same attribute names as models.HealthMetric)"""
+    __slots__ = METRIC_FIELDS
+    
+    def __init__(self, metric):
+        get = metric.get if isinstance(metric, dict) else lambda field: getattr(metric, field)
+        for field in METRIC_FIELDS:
+            setattr(self, field, get(field))
+    
+    def sort_key(self):
+        return (self.recorded_at, self.id)
+
+class LatestVitalsCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latest = None  # worker_id -> CachedHealthMetric, None until loaded
+    
+    def load(self, db: Session):
+        """(Re)load the latest metric of every worker in one query (window function)"""
+        ranked = db.query(
+            models.HealthMetric.id.label('id'),
+            func.row_number().over(
+                partition_by=models.HealthMetric.worker_id,
+                order_by=(models.HealthMetric.recorded_at.desc(), models.HealthMetric.id.desc())
+            ).label('rank')
+        ).subquery()
+        
+        metrics = db.query(models.HealthMetric).join(
+            ranked, ranked.c.id == models.HealthMetric.id
+        ).filter(ranked.c.rank == 1).all()
+        loaded = {m.worker_id: CachedHealthMetric(m) for m in metrics}
+        
+        with self._lock:
+            # Keep anything ingested while the query ran
+            for worker_id, cached in (self._latest or {}).items():
+                current = loaded.get(worker_id)
+                if current is None or cached.sort_key() > current.sort_key():
+                    loaded[worker_id] = cached
+            self._latest = loaded
+        print(f"[VITALS] Loaded latest vitals for {len(loaded)} workers")
+    
+    def invalidate(self):
+        """Drop everything; the next read reloads from the DB"""
+        with self._lock:
+            self._latest = None
+    
+    def on_ingest(self, db: Session, stored: List[Dict]):
+        """Health ingest listener: keep the newest row per worker"""
+        with self._lock:
+            if self._latest is None:
+                return  # not loaded yet, the first read will see the new rows
+            # In place: O(batch), not O(workers); readers go through the lock
+            for row in stored:
+                metric = CachedHealthMetric(row)
+                current = self._latest.get(metric.worker_id)
+                if current is None or metric.sort_key() > current.sort_key():
+                    self._latest[metric.worker_id] = metric
+    
+    def remove(self, worker_id: int):
+        """Forget a deleted worker"""
+        with self._lock:
+            if self._latest is not None:
+                self._latest.pop(worker_id, None)
+    
+    def get(self, db: Session, worker_id: int) -> Optional[CachedHealthMetric]:
+        """Latest metric of a worker, or None"""
+        if self._latest is None:
+            self.load(db)
+        with self._lock:
+            return self._latest.get(worker_id)
+    
+    def all(self, db: Session) -> Dict[int, CachedHealthMetric]:
+        """Latest metric of every worker with data, keyed by worker_id (a copy)"""
+        if self._latest is None:
+            self.load(db)
+        with self._lock:
+            return dict(self._latest)
+
+# Global latest-vitals cache
+latest_vitals = LatestVitalsCache()
@@ -31,6 +31,10 @@ export const roleAPI = {
 export const predictionAPI = {
   predictFit: (roleId, topN = 3) => api.post('/predict-fit', { role_id: roleId, top_n: topN }),
   trainModel: () => api.post('/train-model'),
+  getTrainingJob: (jobId) => api.get(`/ml/jobs/${jobId}`),
+  listModelVersions: () => api.get('/ml/models'),
+  promoteModel: (version) => api.post(`/ml/models/${version}/promote`),
+  rollbackModel: () => api.post('/ml/models/rollback'),
 };
 
 // Assignment APIs
@@ -0,0 +1,60 @@
+import config from '../config';
+
+const { API_BASE_URL } = config;
+
+// Server push for task / assignment changes (backend: /ws/worker/{id}, /ws/supervisor).
+// subscribeToEvents calls onEvent for every change event. While the socket is down it
+// reconnects with backoff and calls onEvent({ type: 'resync' }) every FALLBACK_POLL_MS,
+// plus once after reconnecting, so screens reload anything they may have missed.
+const FALLBACK_POLL_MS = 30000;
+const MAX_RETRY_MS = 30000;
+
+export function subscribeToEvents(path, onEvent) {
+  const url = API_BASE_URL.replace(/^http/, 'ws') + path;
+  let socket = null;
+  let closed = false;
+  let connectedBefore = false;
+  let retryDelay = 1000;
+  let retryTimer = null;
+  let pollTimer = null;
+
+  const stopPolling = () => {
+    clearInterval(pollTimer);
+    pollTimer = null;
+  };
+
+  const connect = () => {
+    socket = new WebSocket(url);
+    socket.onopen = () => {
+      retryDelay = 1000;
+      stopPolling();
+      if (connectedBefore) {
+        onEvent({ type: 'resync' });
+      }
+      connectedBefore = true;
+    };
+    socket.onmessage = (message) => {
+      const event = JSON.parse(message.data);
+      if (event.type !== 'ping' && event.type !== 'subscribed') {
+        onEvent(event);
+      }
+    };
+    socket.onclose = () => {
+      if (closed) return;
+      if (!pollTimer) {
+        pollTimer = setInterval(() => onEvent({ type: 'resync' }), FALLBACK_POLL_MS);
+      }
+      retryTimer = setTimeout(connect, retryDelay);
+      retryDelay = Math.min(retryDelay * 2, MAX_RETRY_MS);
+    };
+    socket.onerror = () => socket.close();
+  };
+
+  connect();
+  return () => {
+    closed = true;
+    clearTimeout(retryTimer);
+    stopPolling();
+    if (socket) socket.close();
+  };
+}
@@ -4,6 +4,7 @@ import { Card, Title, Paragraph, Chip, ActivityIndicator, Text, Badge, Divider }
 import { MaterialCommunityIcons } from '@expo/vector-icons';
 import axios from 'axios';
 import config from '../config';
+import { subscribeToEvents } from '../api/events';
 
 export default function NotificationsScreen() {
   const [notifications, setNotifications] = useState([]);
@@ -31,12 +32,14 @@ export default function NotificationsScreen() {
   useEffect(() => {
     console.log('[MOBILE APP] NotificationsScreen loaded for Rajesh Kumar');
     loadNotifications();
-    // Auto-refresh every 2 seconds for instant updates from supervisor
-    const interval = setInterval(() => {
-      console.log('[MOBILE APP] Checking for new notifications...');
-      loadNotifications();
-    }, 2000);
-    return () => clearInterval(interval);
+    // Instant updates from supervisor: reload when the server pushes a task change
+    const unsubscribe = subscribeToEvents(`/ws/worker/${workerId}`, (event) => {
+      if (event.type.startsWith('task.') || event.type === 'resync') {
+        console.log(`[MOBILE APP] ${event.type} received, reloading notifications...`);
+        loadNotifications();
+      }
+    });
+    return unsubscribe;
   }, []);
 
   const onRefresh = () => {
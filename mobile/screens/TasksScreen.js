@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useMemo } from 'react';
 import {
   View,
   Text,
@@ -10,6 +10,8 @@ import {
 } from 'react-native';
 import axios from 'axios';
 import config from '../config';
+import { subscribeToEvents } from '../api/events';
+import { createDeltaSync } from '../api/sync';
 
 export default function TasksScreen({ route }) {
   const [tasks, setTasks] = useState([]);
@@ -18,40 +20,46 @@ export default function TasksScreen({ route }) {
   const [showNewTaskAlert, setShowNewTaskAlert] = useState(false);
   // Rajesh Kumar's Worker ID
   const workerId = route.params?.workerId || 1; // Worker ID 1 = Rajesh Kumar
+  // Only tasks changed since the last load are downloaded
+  const syncTasks = useMemo(
+    () => createDeltaSync('/task/changes', 'task', { worker_id: workerId }),
+    [workerId]
+  );
 
   useEffect(() => {
     console.log('[MOBILE APP] TasksScreen loaded for Rajesh Kumar (Worker ID: 1)');
     loadTasks();
-    // Auto-refresh every 2 seconds for instant updates
-    const interval = setInterval(() => {
-      console.log('[MOBILE APP] Auto-checking for new tasks...');
-      loadTasks();
-    }, 2000);
-    return () => clearInterval(interval);
+    // Reload only when the server pushes a change for this worker (no polling)
+    const unsubscribe = subscribeToEvents(`/ws/worker/${workerId}`, (event) => {
+      if (event.type.startsWith('task.') || event.type === 'resync') {
+        console.log(`[MOBILE APP] ${event.type} received, reloading tasks...`);
+        loadTasks();
+      }
+    });
+    return unsubscribe;
   }, [workerId]);
 
   const loadTasks = async () => {
     try {
-      const response = await axios.get(
-        `${config.API_BASE_URL}/task/worker/${workerId}`
-      );
+      const rows = await syncTasks();
+      const data = rows.sort((a, b) => new Date(b.created_at) - new Date(a.created_at));
       
-      console.log(`[MOBILE APP] ✅ Tasks loaded: ${response.data.length} tasks for Rajesh Kumar`);
+      console.log(`[MOBILE APP] ✅ Tasks loaded: ${data.length} tasks for Rajesh Kumar`);
       
       // Check if new tasks were added
-      if (previousTaskCount > 0 && response.data.length > previousTaskCount) {
-        const newTasksCount = response.data.length - previousTaskCount;
+      if (previousTaskCount > 0 && data.length > previousTaskCount) {
+        const newTasksCount = data.length - previousTaskCount;
         console.log(`[MOBILE APP] 🎉🎉🎉 ${newTasksCount} NEW TASK(S) ASSIGNED FROM SUPERVISOR!`);
-        console.log(`[MOBILE APP] New task title: ${response.data[0].title}`);
+        console.log(`[MOBILE APP] New task title: ${data[0].title}`);
         setShowNewTaskAlert(true);
         setTimeout(() => setShowNewTaskAlert(false), 5000);
       }
       
-      setPreviousTaskCount(response.data.length);
-      setTasks(response.data);
+      setPreviousTaskCount(data.length);
+      setTasks(data);
       
-      if (response.data.length > 0 && tasks.length === 0) {
-        console.log(`[MOBILE APP] Current tasks: ${response.data.length}`);
+      if (data.length > 0 && tasks.length === 0) {
+        console.log(`[MOBILE APP] Current tasks: ${data.length}`);
       }
     } catch (error) {
       console.error('[MOBILE APP] ❌ Error loading tasks:', error.message);
@@ -232,7 +240,7 @@ export default function TasksScreen({ route }) {
             {completedTasks.length} completed
           </Text>
           <Text style={[styles.headerSubtitle, { fontSize: 11, marginTop: 5, color: '#81c784', fontWeight: 'bold' }]}>
-            ⚡ Auto-updates every 2 seconds - Tasks from supervisor appear instantly!
+            ⚡ Live updates - Tasks from supervisor appear instantly!
           </Text>
         </View>
 
@@ -25,6 +25,10 @@ export const roleAPI = {
 export const predictionAPI = {
   predictFit: (roleId, topN = 5) => api.post('/predict-fit', { role_id: roleId, top_n: topN }),
   trainModel: () => api.post('/train-model'),
+  getTrainingJob: (jobId) => api.get(`/ml/jobs/${jobId}`),
+  listModelVersions: () => api.get('/ml/models'),
+  promoteModel: (version) => api.post(`/ml/models/${version}/promote`),
+  rollbackModel: () => api.post('/ml/models/rollback'),
 };
 
 export const assignmentAPI = {
@@ -53,8 +53,18 @@ export default function Analytics() {
     setTraining(true);
     setTrainResult(null);
     try {
-      const response = await predictionAPI.trainModel();
-      setTrainResult(response.data);
+      // Training runs as a background job on the server; poll it until it finishes
+      const { data: submitted } = await predictionAPI.trainModel();
+      let job;
+      do {
+        await new Promise((resolve) => setTimeout(resolve, 2000));
+        job = (await predictionAPI.getTrainingJob(submitted.job_id)).data;
+      } while (job.state === 'queued' || job.state === 'running');
+      
+      if (job.state !== 'succeeded') {
+        throw new Error(job.error || 'Training job failed');
+      }
+      setTrainResult(job);
       alert('Model trained successfully!');
     } catch (error) {
       console.error('Error training model:', error);
@@ -18,8 +18,12 @@ import {
 } from '@mui/material';
 import { CheckCircle } from '@mui/icons-material';
 import { assignmentAPI } from '../api';
-import axios from 'axios';
-import { API_BASE_URL } from '../config';
+import { subscribeToEvents } from '../events';
+import { createDeltaSync } from '../sync';
+
+// Only rows changed since the last load are downloaded
+const syncAssignments = createDeltaSync('/assignment/changes', 'assignment');
+const syncTasks = createDeltaSync('/task/changes', 'task');
 
 export default function Assignments() {
   const [assignments, setAssignments] = useState([]);
@@ -34,24 +38,24 @@ export default function Assignments() {
     loadAssignments();
     loadCompletedTasks();
     
-    // Auto-refresh every 3 seconds to see worker task completions
-    const interval = setInterval(() => {
+    // Worker task completions and new assignments are pushed by the server
+    const unsubscribe = subscribeToEvents('/ws/supervisor', () => {
       loadAssignments(); // Refresh assignments to update status
       loadCompletedTasks();
-    }, 3000);
+    });
     
-    return () => clearInterval(interval);
+    return unsubscribe;
   }, []);
 
   const loadAssignments = async () => {
     try {
-      const [assignmentsRes, tasksRes] = await Promise.all([
-        assignmentAPI.getAll(),
-        axios.get(`${API_BASE_URL}/task/all`)
+      const [assignmentRows, tasksData] = await Promise.all([
+        syncAssignments(),
+        syncTasks()
       ]);
       
-      const assignmentsData = assignmentsRes.data;
-      const tasksData = tasksRes.data;
+      // Copies: the enhancement below must not leak into the synced rows
+      const assignmentsData = assignmentRows.sort((a, b) => a.id - b.id).map(a => ({ ...a }));
       
       // Enhance assignments with task status
       const enhancedAssignments = assignmentsData.map(assignment => {
@@ -79,8 +83,7 @@ export default function Assignments() {
 
   const loadCompletedTasks = async () => {
     try {
-      const response = await axios.get(`${API_BASE_URL}/task/all`);
-      const tasks = response.data;
+      const tasks = await syncTasks();
       
       // Filter only completed tasks
       const completed = tasks.filter(t => t.status === 'completed');
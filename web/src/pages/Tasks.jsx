@@ -21,6 +21,11 @@ import {
 import { Add, Assignment } from '@mui/icons-material';
 import axios from 'axios';
 import { API_BASE_URL } from '../config';
+import { subscribeToEvents } from '../events';
+import { createDeltaSync } from '../sync';
+
+// Only tasks changed since the last load are downloaded
+const syncTasks = createDeltaSync('/task/changes', 'task');
 
 export default function Tasks() {
   const [tasks, setTasks] = useState([]);
@@ -42,18 +47,20 @@ export default function Tasks() {
     loadWorkers();
     loadRoles();
     
-    // Auto-refresh tasks every 3 seconds to see worker updates
-    const interval = setInterval(() => {
-      loadTasks();
-    }, 3000);
+    // Worker updates are pushed by the server; reload only when a task changes
+    const unsubscribe = subscribeToEvents('/ws/supervisor', (event) => {
+      if (event.type.startsWith('task.') || event.type === 'resync') {
+        loadTasks();
+      }
+    });
     
-    return () => clearInterval(interval);
+    return unsubscribe;
   }, []);
 
   const loadTasks = async () => {
     try {
-      const response = await axios.get(`${API_BASE_URL}/task/all`);
-      setTasks(response.data);
+      const rows = await syncTasks();
+      setTasks(rows.sort((a, b) => new Date(b.created_at) - new Date(a.created_at)));
     } catch (error) {
       console.error('Error loading tasks:', error);
     }
@@ -156,9 +163,9 @@ export default function Tasks() {
       await loadTasks();
       
       // Show success message
-      const successMsg = `✅ TASK ASSIGNED!\n\nTask: ${response.data.title}\nWorker: ${workerName} (ID: ${response.data.worker_id})\nTask ID: ${response.data.id}\n\n✨ The mobile app will show this within 2 seconds!`;
+      const successMsg = `✅ TASK ASSIGNED!\n\nTask: ${response.data.title}\nWorker: ${workerName} (ID: ${response.data.worker_id})\nTask ID: ${response.data.id}\n\n✨ The mobile app will show this instantly!`;
       
-      setSuccessMessage(`✅ Task "${response.data.title}" assigned to ${workerName}! Mobile app will update within 2 seconds.`);
+      setSuccessMessage(`✅ Task "${response.data.title}" assigned to ${workerName}! Mobile app will update instantly.`);
       setTimeout(() => setSuccessMessage(''), 8000);
       
       console.log('[SUPERVISOR] Showing success alert...');
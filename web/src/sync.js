@@ -0,0 +1,60 @@
+import axios from 'axios';
+import { API_BASE_URL } from './config';
+
+// Delta sync against /task/changes and /assignment/changes.
+// createDeltaSync keeps a cursor and the synced rows by id; each call of the returned
+// function fetches only what changed since the previous call (tombstones remove rows)
+// and resolves to the current rows. Calls made while a sync is running are folded
+// into one follow-up sync.
+export function createDeltaSync(path, key, params = {}) {
+  let cursor = 0;
+  const items = new Map();
+  let running = null;
+  let again = false;
+
+  const fetchChanges = async () => {
+    let hasMore = true;
+    while (hasMore) {
+      const response = await axios.get(`${API_BASE_URL}${path}`, {
+        params: { ...params, since: cursor },
+      });
+      const { changes, reset } = response.data;
+      if (reset) {
+        // The server does not know our cursor (e.g. database recreated): start over
+        items.clear();
+        cursor = 0;
+        continue;
+      }
+      for (const change of changes) {
+        if (change.op === 'delete') {
+          items.delete(change.id);
+        } else {
+          items.set(change.id, change[key]);
+        }
+      }
+      cursor = response.data.cursor;
+      hasMore = response.data.has_more;
+    }
+  };
+
+  const sync = async () => {
+    if (running) {
+      again = true;
+      return running;
+    }
+    running = (async () => {
+      try {
+        do {
+          again = false;
+          await fetchChanges();
+        } while (again);
+        return Array.from(items.values());
+      } finally {
+        running = null;
+      }
+    })();
+    return running;
+  };
+
+  return sync;
+}